@@ -63,6 +63,58 @@ TIME_SLOTS = [
     '14:00', '15:00', '16:00', '17:00', '18:00', '19:00'
 ]
 
+# Campus day start; in legacy data (old rows, the imported timetable)
+# un-suffixed times before this hour such as '01:00' are afternoon times
+CAMPUS_DAY_START_HOUR = 8
+
+# End of the campus day, used as the upper edge of utilization reports
+CAMPUS_DAY_END_HOUR = 20
+
+# Granularity of the room occupancy bitmaps (minutes per bit); ranges that
+# do not fall on slot boundaries are rounded outwards
+SLOT_MINUTES = 5
+
+# Alternative slot/room suggestions on booking conflicts
+SUGGESTION_BUDGET_MS = 50
+SUGGESTION_DAYS_AHEAD = 7
+
+# Upper bound on the dates one recurring booking request can expand to
+RECURRENCE_MAX_OCCURRENCES = 52
+
+# Start-time grid and slot size used by the timetable solver
+SOLVER_SLOT_MINUTES = 30
+
+# Search states per request the exact batch allocator may keep for one
+# cluster of overlapping requests before falling back to augmenting paths
+ALLOCATION_MAX_STATES = 20000
+
+# Auto-approval of new booking requests (see scheduling.approval).
+# Rules are tried in order and the first one whose conditions all hold
+# decides: 'approve', 'reject' or 'pending' (leave for an admin).
+# Conditions: role, department, room_type, building, weekdays (0=Monday),
+# min_hours/max_hours, min_days_ahead/max_days_ahead,
+# min_capacity/max_capacity. role, department, room_type and building
+# take one value or a list. Requests that conflict are never created, so
+# every rule implies "no conflict". Past-dated requests are always left
+# for review. No rules ship enabled; for example:
+#     {'name': 'teacher-theory-short', 'decision': 'approve',
+#      'role': 2, 'room_type': 'Theory', 'max_hours': 2},
+AUTO_APPROVAL_RULES = [
+]
+
+# Scheduled reports (see reports.scheduler). 'every' is 'hour', 'day' or
+# 'week' (Mondays); 'at' is the time of day for daily and weekly
+# schedules. 'report' is 'daily_summary' or a job in reports.jobs.
+# Each run writes the full report and a delta of what changed since the
+# schedule's previous run.
+REPORT_SCHEDULES = [
+    {'name': 'daily-summary', 'report': 'daily_summary', 'every': 'day', 'at': '06:00'},
+    {'name': 'weekly-booking-statistics', 'report': 'booking_statistics', 'every': 'week', 'at': '07:00'},
+]
+
+# How often the admin dashboard checks for due scheduled reports
+REPORT_SCHEDULER_POLL_MINUTES = 5
+
 # Department Codes
 DEPARTMENTS = [
     'CSE', 'BBA', 'EEE', 'CIVIL', 'ARCH', 'ADMIN'
@@ -4,14 +4,29 @@ Database Setup and Management Module
 
 import sqlite3
 import os
+from urllib.request import pathname2url
+from contextlib import contextmanager
 from datetime import datetime
 import hashlib
-from config import DB_PATH, COLORS
+import config
+from config import COLORS
+
+# Seconds a writer waits for a competing transaction before giving up
+BUSY_TIMEOUT = 10
+
+# Tables whose inserts, updates and deletes are journaled in change_log
+TRACKED_TABLES = ('users', 'classrooms', 'bookings', 'schedules', 'semesters', 'holidays')
 
 class DatabaseManager:
-    def __init__(self, db_path=DB_PATH):
-        self.db_path = db_path
-        self.ensure_db_exists()
+    # Paths whose schema has been created/migrated in this process
+    _initialized_paths = set()
+    
+    def __init__(self, db_path=None):
+        # Looked up per call, so pointing config.DB_PATH elsewhere (a scratch
+        # database) takes effect even after this module is imported
+        self.db_path = db_path or config.DB_PATH
+        if self.db_path not in DatabaseManager._initialized_paths:
+            self.ensure_db_exists()
     
     def get_connection(self):
         """Get database connection"""
@@ -104,6 +119,10 @@ class DatabaseManager:
                     reason TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    date_ord INTEGER,
+                    start_min INTEGER,
+                    end_min INTEGER,
+                    series_id INTEGER,
                     FOREIGN KEY (user_id) REFERENCES users(id),
                     FOREIGN KEY (classroom_id) REFERENCES classrooms(id),
                     FOREIGN KEY (created_by) REFERENCES users(id),
@@ -124,11 +143,92 @@ class DatabaseManager:
                     semester TEXT,
                     status INTEGER DEFAULT 1,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    weekday INTEGER,
+                    start_min INTEGER,
+                    end_min INTEGER,
                     FOREIGN KEY (teacher_id) REFERENCES users(id),
                     FOREIGN KEY (classroom_id) REFERENCES classrooms(id)
                 )
             ''')
             
+            # Semester calendar
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS semesters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    start_date DATE NOT NULL,
+                    end_date DATE NOT NULL,
+                    start_ord INTEGER NOT NULL,
+                    end_ord INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Holidays; semester_id NULL applies to every semester
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS holidays (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    holiday_date DATE NOT NULL,
+                    date_ord INTEGER NOT NULL,
+                    name TEXT,
+                    semester_id INTEGER,
+                    FOREIGN KEY (semester_id) REFERENCES semesters(id)
+                )
+            ''')
+            
+            # Dated occurrences of weekly schedules, derived from schedules,
+            # semesters and holidays (see scheduling.occurrences)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS schedule_occurrences (
+                    schedule_id INTEGER NOT NULL,
+                    date_ord INTEGER NOT NULL,
+                    classroom_id INTEGER NOT NULL,
+                    teacher_id INTEGER,
+                    start_min INTEGER NOT NULL,
+                    end_min INTEGER NOT NULL,
+                    PRIMARY KEY (schedule_id, date_ord),
+                    FOREIGN KEY (schedule_id) REFERENCES schedules(id)
+                )
+            ''')
+            
+            # Recurring booking series
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS booking_series (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    classroom_id INTEGER NOT NULL,
+                    rule TEXT,
+                    created_by INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(id),
+                    FOREIGN KEY (classroom_id) REFERENCES classrooms(id)
+                )
+            ''')
+            
+            # Waitlist for taken room/time ranges: 1=Waiting, 2=Promoted, 0=Withdrawn
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS waitlist (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    classroom_id INTEGER NOT NULL,
+                    course_name TEXT,
+                    booking_date DATE NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT NOT NULL,
+                    description TEXT,
+                    date_ord INTEGER NOT NULL,
+                    start_min INTEGER NOT NULL,
+                    end_min INTEGER NOT NULL,
+                    status INTEGER DEFAULT 1,
+                    booking_id INTEGER,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    promoted_at TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(id),
+                    FOREIGN KEY (classroom_id) REFERENCES classrooms(id),
+                    FOREIGN KEY (booking_id) REFERENCES bookings(id)
+                )
+            ''')
+            
             # Reports table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS reports (
@@ -156,9 +256,190 @@ class DatabaseManager:
                 )
             ''')
             
+            # Change journal, written by triggers on TRACKED_TABLES; seq only
+            # ever grows, so MAX(seq) per table is that table's version
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS change_log (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    row_id INTEGER,
+                    op TEXT NOT NULL,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Scheduled report runs; every change_log entry up to to_seq is
+            # covered, and the next run of the schedule starts from there
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS report_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    schedule TEXT NOT NULL,
+                    report TEXT NOT NULL,
+                    from_seq INTEGER NOT NULL,
+                    to_seq INTEGER NOT NULL,
+                    changes INTEGER DEFAULT 0,
+                    status TEXT NOT NULL,
+                    full_files TEXT,
+                    delta_file TEXT,
+                    error TEXT,
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            
+            # Bookings and booked minutes per day, room and status, kept up
+            # to date incrementally from change_log (see reports.scheduler)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_summary (
+                    date_ord INTEGER NOT NULL,
+                    classroom_id INTEGER NOT NULL,
+                    status INTEGER NOT NULL,
+                    bookings INTEGER NOT NULL,
+                    minutes INTEGER NOT NULL,
+                    PRIMARY KEY (date_ord, classroom_id, status)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Date each booking was counted on, to find the old day of a
+            # booking that moved or was deleted
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_summary_rows (
+                    booking_id INTEGER PRIMARY KEY,
+                    date_ord INTEGER
+                )
+            ''')
+            
+            # Days recomputed per change_log sequence, for delta outputs
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_summary_days (
+                    seq INTEGER NOT NULL,
+                    date_ord INTEGER NOT NULL,
+                    PRIMARY KEY (seq, date_ord)
+                ) WITHOUT ROWID
+            ''')
+            
+            # Change sequence incrementally maintained report tables are at;
+            # base_seq is where they were last built from scratch
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS report_state (
+                    name TEXT PRIMARY KEY,
+                    base_seq INTEGER NOT NULL,
+                    seq INTEGER NOT NULL
+                )
+            ''')
+            
             conn.commit()
+            self.migrate_schema(conn)
             self.insert_default_data(conn)
             conn.close()
+            DatabaseManager._initialized_paths.add(self.db_path)
+    
+    def migrate_schema(self, conn):
+        """Bring an existing database up to the current schema"""
+        cursor = conn.cursor()
+        
+        # Integer time columns (minutes since midnight / ordinal days)
+        new_columns = {
+            'bookings': [('date_ord', 'INTEGER'), ('start_min', 'INTEGER'), ('end_min', 'INTEGER'),
+                         ('series_id', 'INTEGER')],
+            'schedules': [('weekday', 'INTEGER'), ('start_min', 'INTEGER'), ('end_min', 'INTEGER')],
+        }
+        for table, columns in new_columns.items():
+            cursor.execute(f'PRAGMA table_info({table})')
+            existing = {row[1] for row in cursor.fetchall()}
+            for column, column_type in columns:
+                if column not in existing:
+                    cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+        
+        self.backfill_time_columns(conn)
+        
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bookings_room_date '
+                       'ON bookings (classroom_id, date_ord, start_min)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_schedules_room_day '
+                       'ON schedules (classroom_id, weekday, start_min)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_schedules_teacher_day '
+                       'ON schedules (teacher_id, weekday, start_min)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bookings_series '
+                       'ON bookings (series_id)')
+        # Covers the date-range scans of the trend and demand reports;
+        # supersedes the narrower (date_ord, status) index
+        cursor.execute('DROP INDEX IF EXISTS idx_bookings_date')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_bookings_date_cover '
+                       'ON bookings (date_ord, status, classroom_id, start_min, end_min)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_occurrences_room_date '
+                       'ON schedule_occurrences (classroom_id, date_ord, start_min)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_occurrences_teacher_date '
+                       'ON schedule_occurrences (teacher_id, date_ord)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_holidays_date '
+                       'ON holidays (date_ord)')
+        # Only waiting entries are indexed; promotion reads them in FIFO order
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_waitlist_room_date '
+                       'ON waitlist (classroom_id, date_ord, id) WHERE status = 1')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_waitlist_user '
+                       'ON waitlist (user_id, status)')
+        # One waiting entry per user and slot; older duplicates keep their place
+        cursor.execute('''
+            UPDATE waitlist SET status = 0
+            WHERE status = 1 AND id NOT IN (
+                SELECT MIN(id) FROM waitlist WHERE status = 1
+                GROUP BY user_id, classroom_id, date_ord, start_min, end_min
+            )
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_waitlist_unique_wait '
+                       'ON waitlist (user_id, classroom_id, date_ord, start_min, end_min) WHERE status = 1')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_change_log_table '
+                       'ON change_log (table_name, seq)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_report_runs_schedule '
+                       'ON report_runs (schedule, id)')
+        
+        for table in TRACKED_TABLES:
+            for op, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{op.lower()}_log
+                    AFTER {op} ON {table}
+                    BEGIN
+                        INSERT INTO change_log (table_name, row_id, op)
+                        VALUES ('{table}', {row}.id, '{op.lower()}');
+                    END
+                ''')
+        conn.commit()
+    
+    def backfill_time_columns(self, conn):
+        """Fill integer time columns and canonicalise time strings"""
+        from utils.time_utils import parse_time, format_minutes, date_to_ordinal, weekday_index
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, booking_date, start_time, end_time FROM bookings
+            WHERE date_ord IS NULL OR start_min IS NULL OR end_min IS NULL
+        ''')
+        for booking_id, booking_date, start_time, end_time in cursor.fetchall():
+            try:
+                start_min, end_min = parse_time(start_time, legacy=True), parse_time(end_time, legacy=True)
+                cursor.execute('''
+                    UPDATE bookings
+                    SET date_ord = ?, start_min = ?, end_min = ?, start_time = ?, end_time = ?
+                    WHERE id = ?
+                ''', (date_to_ordinal(booking_date), start_min, end_min,
+                      format_minutes(start_min), format_minutes(end_min), booking_id))
+            except ValueError as e:
+                print(f"Skipping booking {booking_id} time migration: {e}")
+        
+        cursor.execute('''
+            SELECT id, day_of_week, start_time, end_time FROM schedules
+            WHERE weekday IS NULL OR start_min IS NULL OR end_min IS NULL
+        ''')
+        for schedule_id, day_of_week, start_time, end_time in cursor.fetchall():
+            try:
+                start_min, end_min = parse_time(start_time, legacy=True), parse_time(end_time, legacy=True)
+                cursor.execute('''
+                    UPDATE schedules
+                    SET weekday = ?, start_min = ?, end_min = ?, start_time = ?, end_time = ?
+                    WHERE id = ?
+                ''', (weekday_index(day_of_week), start_min, end_min,
+                      format_minutes(start_min), format_minutes(end_min), schedule_id))
+            except ValueError as e:
+                print(f"Skipping schedule {schedule_id} time migration: {e}")
     
     def insert_default_data(self, conn):
         """Insert default data if tables are empty"""
@@ -208,6 +489,28 @@ class DatabaseManager:
         
         conn.commit()
     
+    @contextmanager
+    def transaction(self):
+        """
+        Run a block inside a ``BEGIN IMMEDIATE`` transaction.
+        
+        The write lock is taken up front, so a check-then-insert in the
+        block cannot interleave with another writer. Commits on success and
+        rolls back if the block raises.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+    
     def execute_query(self, query, params=()):
         """Execute a query and return results"""
         try:
@@ -248,5 +551,27 @@ class DatabaseManager:
         return backup_path
 
 
-# Initialize database
-db_manager = DatabaseManager()
+class ReadOnlyDatabase:
+    """
+    Read-only connection with the ``execute_query`` interface of DatabaseManager.
+    
+    For report workers: opening it never creates or migrates the schema,
+    and SQLite rejects any write through it.
+    """
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config.DB_PATH
+        self.conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro",
+                                    uri=True, timeout=BUSY_TIMEOUT)
+        self.conn.row_factory = sqlite3.Row
+    
+    def execute_query(self, query, params=()):
+        """Execute a query and return results"""
+        try:
+            return self.conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database query error: {e}")
+            return None
+    
+    def close(self):
+        self.conn.close()
@@ -5,21 +5,45 @@ Admin Dashboard Module
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTabWidget, QTableWidget, QTableWidgetItem,
                              QDialog, QMessageBox, QComboBox, QLineEdit, QSpinBox,
-                             QDateEdit, QTimeEdit, QTextEdit, QHeaderView, QMenuBar, QMenu, QScrollArea)
-from PyQt5.QtCore import Qt, QDate, QTime
+                             QDateEdit, QTimeEdit, QTextEdit, QHeaderView, QMenuBar, QMenu, QScrollArea,
+                             QAbstractItemView, QInputDialog, QProgressDialog)
+from PyQt5.QtCore import Qt, QDate, QTime, QTimer
 from PyQt5.QtGui import QFont, QIcon, QColor, QPixmap
 from models.user import User
 from models.classroom import Classroom
 from models.booking import Booking
 from models.schedule import Schedule
+from models.query import BookingQuery
+from models.waitlist import Waitlist
+from models.semester import Semester
 from gui.styles import MODERN_STYLESHEET, TITLE_STYLE
-from gui.dialogs import AddUserDialog, AddClassroomDialog, AddScheduleDialog, EditUserDialog
+from gui.dialogs import (AddUserDialog, AddClassroomDialog, AddScheduleDialog, EditUserDialog,
+                         SemesterDialog, HolidayDialog)
 from gui.dialogs_edit import EditClassroomDialog, EditBookingDialog, EditScheduleDialog
 from database.db_setup import DatabaseManager
+from scheduling.interval_index import interval_index
+from scheduling.occurrences import ScheduleCalendar
+from utils.time_utils import parse_time, weekday_index
+from scheduling.allocation import BatchAllocator
+from scheduling.availability import availability
+from scheduling.availability_matrix import AvailabilityMatrix
 from utils.qrcode_generator import QRCodeGenerator
+from utils.email_notification import EmailNotificationService
 from utils.visualization import MatplotlibCanvas, VisualizationHelper
+from reports.utilization import UtilizationCube
+from reports.trends import bucket_bookings
+from reports.forecast import forecast_demand
+from reports.generator import ReportGenerator
+from reports.cache import report_cache
+from reports.jobs import REPORT_JOBS, ReportJobRunner, DEFAULT_OUTPUT as REPORTS_OUTPUT_DIR
+from reports.export import EXPORT_FORMATS, export_tables
+from reports.scheduler import ReportScheduler
+from gui.workers import ReportJobThread, ExportThread, ScheduledReportThread
+from config import REPORT_SCHEDULER_POLL_MINUTES
 from datetime import datetime
 import math
+import os
+from functools import partial
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 
@@ -29,6 +53,11 @@ class AdminDashboard(QMainWindow):
         self.current_user = user
         self.db = DatabaseManager()
         self.init_ui()
+        
+        # Scheduled reports (config.REPORT_SCHEDULES) run while an admin is signed in
+        self.report_scheduler_timer = QTimer(self)
+        self.report_scheduler_timer.timeout.connect(self.run_scheduled_reports)
+        self.report_scheduler_timer.start(REPORT_SCHEDULER_POLL_MINUTES * 60 * 1000)
     
     def init_ui(self):
         """Initialize the admin dashboard"""
@@ -427,17 +456,16 @@ class AdminDashboard(QMainWindow):
         layout.addWidget(title)
         
         # Today's bookings
-        today_bookings = len([b for b in Booking.get_all_bookings() 
-                             if b.booking_date == datetime.now().strftime('%Y-%m-%d')])
+        today_bookings = BookingQuery().on_date(datetime.now().strftime('%Y-%m-%d')).count()
         
         stat1 = self.create_mini_stat("Today's Bookings", today_bookings, "#06B6D4")
         layout.addWidget(stat1)
         
         # Approval rate
-        all_bookings = Booking.get_all_bookings()
-        if all_bookings:
-            approved_count = len([b for b in all_bookings if b.status == 1])  # status 1 = Approved
-            approval_rate = int((approved_count / len(all_bookings)) * 100)
+        total_count = BookingQuery().count()
+        if total_count:
+            approved_count = BookingQuery().statuses(1).count()  # status 1 = Approved
+            approval_rate = int((approved_count / total_count) * 100)
         else:
             approval_rate = 0
             
@@ -501,14 +529,9 @@ class AdminDashboard(QMainWindow):
         layout.addWidget(title)
         
         # Get booking status data
-        bookings = Booking.get_all_bookings()
+        by_status = ReportGenerator().get_summary()['by_status']
         status_map = {0: 'Cancelled', 1: 'Approved', 2: 'Pending', 3: 'Rejected'}
-        status_counts = {'Approved': 0, 'Pending': 0, 'Rejected': 0, 'Cancelled': 0}
-        
-        for booking in bookings:
-            status_text = status_map.get(booking.status, 'Unknown')
-            if status_text in status_counts:
-                status_counts[status_text] += 1
+        status_counts = {status_map[status]: by_status.get(status, 0) for status in (1, 2, 3, 0)}
         
         # Create matplotlib chart
         from matplotlib.figure import Figure
@@ -565,15 +588,11 @@ class AdminDashboard(QMainWindow):
         layout.addWidget(title)
         
         # Get classroom booking counts
-        from models.classroom import Classroom
-        classrooms = Classroom.get_all_classrooms()
-        bookings = Booking.get_all_bookings()
-        
+        summary = ReportGenerator().get_summary()
         classroom_counts = {}
-        for classroom in classrooms:
-            count = len([b for b in bookings if b.classroom_id == classroom.id])
-            if classroom.room_number:
-                classroom_counts[classroom.room_number] = count
+        for room_id, room_number, _ in summary['rooms']:
+            if room_number:
+                classroom_counts[room_number] = summary['by_room_all'].get(room_id, 0)
         
         # Get top 6
         sorted_rooms = sorted(classroom_counts.items(), key=lambda x: x[1], reverse=True)[:6]
@@ -633,22 +652,12 @@ class AdminDashboard(QMainWindow):
         title.setStyleSheet("color: #06B6D4; margin-bottom: 10px;")
         layout.addWidget(title)
         
-        # Get bookings for last 7 days
+        # Count bookings per day for the last 7 days
         from datetime import timedelta
-        bookings = Booking.get_all_bookings()
-        
-        # Create date range for last 7 days
         today = datetime.now().date()
-        dates = [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(6, -1, -1)]
-        date_labels = [(today - timedelta(days=i)).strftime('Sun' if (today - timedelta(days=i)).weekday() == 6 else 'Mon' if (today - timedelta(days=i)).weekday() == 0 else '%a') for i in range(6, -1, -1)]
-        
-        # Count bookings per day
-        daily_counts = {date: 0 for date in dates}
-        for booking in bookings:
-            if booking.booking_date in daily_counts:
-                daily_counts[booking.booking_date] += 1
-        
-        counts = [daily_counts[date] for date in dates]
+        trend = bucket_bookings(today - timedelta(days=6), today, by='day')
+        date_labels = [datetime.strptime(day, '%Y-%m-%d').strftime('%a') for day in trend.labels]
+        counts = trend.counts.tolist()
         
         # Create matplotlib line chart
         from matplotlib.figure import Figure
@@ -707,12 +716,15 @@ class AdminDashboard(QMainWindow):
         
         # Get upcoming bookings (today and future)
         today = datetime.now().strftime('%Y-%m-%d')
-        all_bookings = Booking.get_all_bookings()
-        upcoming = [b for b in all_bookings if b.booking_date >= today and b.status == 1]  # status 1 = Approved
-        upcoming.sort(key=lambda x: (x.booking_date, x.start_time))
-        
-        if upcoming[:4]:  # Show first 4
-            for booking in upcoming[:4]:
+        upcoming = (BookingQuery()
+                    .date_range(start=today)
+                    .statuses(1)  # status 1 = Approved
+                    .order_by('booking_date', 'start_time')
+                    .limit(4)  # Show first 4
+                    .all())
+        
+        if upcoming:
+            for booking in upcoming:
                 # Load user and classroom
                 from models.user import User
                 from models.classroom import Classroom
@@ -843,6 +855,22 @@ class AdminDashboard(QMainWindow):
         self.booking_filter.addItems(["All", "Pending", "Approved", "Rejected", "Cancelled"])
         self.booking_filter.currentIndexChanged.connect(self.refresh_bookings_table)
         filter_layout.addWidget(self.booking_filter)
+        
+        allocate_btn = QPushButton("Allocate Pending")
+        allocate_btn.setToolTip("Assign rooms to all pending requests for the next two weeks")
+        allocate_btn.clicked.connect(self.allocate_pending_bookings)
+        filter_layout.addWidget(allocate_btn)
+        
+        free_slots_btn = QPushButton("Find Free Slots")
+        free_slots_btn.setToolTip("Rooms free for a given length of time on weekdays in the next three weeks")
+        free_slots_btn.clicked.connect(self.find_free_slots)
+        filter_layout.addWidget(free_slots_btn)
+        
+        # Bulk actions on the selected rows
+        for label, status in (("Approve Selected", 1), ("Reject Selected", 3), ("Cancel Selected", 0)):
+            bulk_btn = QPushButton(label)
+            bulk_btn.clicked.connect(lambda checked, s=status: self.bulk_update_bookings(s))
+            filter_layout.addWidget(bulk_btn)
         filter_layout.addStretch()
         
         header_layout.addLayout(filter_layout)
@@ -854,6 +882,8 @@ class AdminDashboard(QMainWindow):
         self.bookings_table.setHorizontalHeaderLabels(["ID", "User", "Room", "Date", "Start", "End", "Status", "View", "Edit", "Delete"])
         self.bookings_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.bookings_table.setAlternatingRowColors(True)
+        self.bookings_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.bookings_table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.refresh_bookings_table()
         
         layout.addWidget(self.bookings_table)
@@ -877,6 +907,11 @@ class AdminDashboard(QMainWindow):
         add_btn.clicked.connect(self.add_schedule)
         header_layout.addWidget(add_btn)
         
+        semesters_btn = QPushButton("Semesters")
+        semesters_btn.setToolTip("Semester dates and holidays that decide when classes meet")
+        semesters_btn.clicked.connect(self.manage_semesters)
+        header_layout.addWidget(semesters_btn)
+        
         layout.addLayout(header_layout)
         
         # Schedules table
@@ -923,6 +958,8 @@ class AdminDashboard(QMainWindow):
             ("Booking Statistics", self.report_booking_stats),
             ("Teacher Schedule Report", self.report_teacher_schedule),
             ("Export All Data", self.export_data),
+            ("Report Pack (All)", self.generate_report_pack),
+            ("Scheduled Reports", self.show_scheduled_reports),
         ]
         
         for report_name, callback in reports:
@@ -952,10 +989,13 @@ class AdminDashboard(QMainWindow):
         stats_layout.setSpacing(15)
         
         # Get data for stats
-        total_bookings = len(Booking.get_all_bookings())
-        total_classrooms = len(Classroom.get_all_classrooms())
-        total_users = len(User.get_all_users())
-        total_schedules = len(Schedule.get_all_schedules())
+        report_gen = ReportGenerator()
+        totals = report_gen.get_totals()
+        by_status = report_gen.get_summary()['by_status']
+        total_bookings = totals['bookings']
+        total_classrooms = totals['classrooms']
+        total_users = totals['users']
+        total_schedules = totals['schedules']
         
         stats = [
             ("📅 Total Bookings", str(total_bookings), "#06B6D4"),
@@ -984,6 +1024,9 @@ class AdminDashboard(QMainWindow):
         
         scroll_layout.addLayout(charts_layout)
         
+        # Demand forecast per room type
+        scroll_layout.addWidget(self.create_demand_forecast_chart())
+        
         # Report summary section
         summary_title = QLabel("📋 Report Summary")
         summary_title.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -1053,8 +1096,8 @@ class AdminDashboard(QMainWindow):
         peak_title.setStyleSheet("color: #06B6D4;")
         peak_layout.addWidget(peak_title)
         
-        approved_count = len([b for b in Booking.get_all_bookings() if b.status == 1])
-        pending_count = len([b for b in Booking.get_all_bookings() if b.status == 2])
+        approved_count = by_status.get(1, 0)
+        pending_count = by_status.get(2, 0)
         approval_rate = (approved_count / total_bookings * 100) if total_bookings > 0 else 0
         
         stats_text = [
@@ -1095,12 +1138,12 @@ class AdminDashboard(QMainWindow):
             util_label.setStyleSheet("color: #10B981; font-size: 10px; font-weight: bold;")
             util_layout.addWidget(util_label)
         
-        peak_percentage = (len([b for b in Booking.get_all_bookings() if b.status == 1]) / total_bookings * 100) if total_bookings > 0 else 0
+        peak_percentage = (approved_count / total_bookings * 100) if total_bookings > 0 else 0
         peak_label = QLabel(f"Approval Rate: {peak_percentage:.1f}%")
         peak_label.setStyleSheet("color: #06B6D4; font-size: 10px;")
         util_layout.addWidget(peak_label)
         
-        capacity_sum = sum([c.capacity for c in Classroom.get_all_classrooms()])
+        capacity_sum = totals['capacity']
         capacity_label = QLabel(f"Total Capacity: {capacity_sum}")
         capacity_label.setStyleSheet("color: #F59E0B; font-size: 10px;")
         util_layout.addWidget(capacity_label)
@@ -1353,6 +1396,7 @@ class AdminDashboard(QMainWindow):
             try:
                 db = DatabaseManager()
                 db.execute_update("DELETE FROM classrooms WHERE id = ?", (classroom.id,))
+                availability.rooms_changed()
                 QMessageBox.information(self, "Success", "Classroom deleted successfully!")
                 self.refresh_classrooms_table()
             except Exception as e:
@@ -1382,8 +1426,11 @@ class AdminDashboard(QMainWindow):
         
         if reply == QMessageBox.Yes:
             try:
-                db = DatabaseManager()
-                db.execute_update("DELETE FROM bookings WHERE id = ?", (booking.id,))
+                with DatabaseManager().transaction() as conn:
+                    conn.execute("DELETE FROM bookings WHERE id = ?", (booking.id,))
+                    promoted = Waitlist.promote(booking.classroom_id, booking.booking_date, conn)
+                interval_index.remove_booking(booking.id)
+                Waitlist.notify_promoted(promoted)
                 QMessageBox.information(self, "Success", "Booking deleted successfully!")
                 self.refresh_bookings_table()
             except Exception as e:
@@ -1413,8 +1460,14 @@ class AdminDashboard(QMainWindow):
         
         if reply == QMessageBox.Yes:
             try:
-                db = DatabaseManager()
-                db.execute_update("DELETE FROM schedules WHERE id = ?", (schedule.id,))
+                with DatabaseManager().transaction() as conn:
+                    conn.execute("DELETE FROM schedules WHERE id = ?", (schedule.id,))
+                    ScheduleCalendar.refresh_schedule(schedule.id, conn)
+                    promoted = Waitlist.promote_weekly(
+                        schedule.classroom_id, weekday_index(schedule.day_of_week),
+                        parse_time(schedule.start_time), parse_time(schedule.end_time), conn)
+                interval_index.schedule_changed(schedule.id)
+                Waitlist.notify_promoted(promoted)
                 QMessageBox.information(self, "Success", "Schedule deleted successfully!")
                 self.refresh_schedules_table()
             except Exception as e:
@@ -1503,8 +1556,6 @@ class AdminDashboard(QMainWindow):
             layout.addWidget(title)
             
             # Get data
-            bookings = Booking.get_all_bookings()
-            classrooms = Classroom.get_all_classrooms()
             users = User.get_all_users()
             schedules = Schedule.get_all_schedules()
             teachers = [u for u in users if u.role == 2]
@@ -1513,19 +1564,26 @@ class AdminDashboard(QMainWindow):
             tabs = QTabWidget()
             
             # Booking Status Tab
-            status_data = VisualizationHelper.get_booking_status_data(bookings)
+            status_data = VisualizationHelper.get_booking_status_counts(ReportGenerator().get_summary())
             canvas1 = MatplotlibCanvas(width=8, height=5, dpi=80)
             canvas1.plot_booking_status_pie(status_data)
             tabs.addTab(canvas1, "Booking Status")
             
             # Room Utilization Tab
-            room_data = VisualizationHelper.get_room_utilization(classrooms, bookings)
+            cube = UtilizationCube.build()
+            room_data = VisualizationHelper.get_room_utilization(cube)
             canvas2 = MatplotlibCanvas(width=8, height=5, dpi=80)
             canvas2.plot_room_utilization(room_data)
             tabs.addTab(canvas2, "Room Utilization")
             
+            # Seat-hour utilization by weekday and hour
+            heatmap_canvas = MatplotlibCanvas(width=8, height=5, dpi=80)
+            heatmap_canvas.plot_utilization_heatmap(cube.heatmap(weighted=True)[:5], cube.hours,
+                                                    f"Seat-Hour Utilization ({cube.describe_window()})")
+            tabs.addTab(heatmap_canvas, "Utilization Heatmap")
+            
             # Bookings by Day Tab
-            day_data = VisualizationHelper.get_bookings_by_day(bookings)
+            day_data = VisualizationHelper.get_bookings_by_day()
             canvas3 = MatplotlibCanvas(width=8, height=5, dpi=80)
             canvas3.plot_bookings_by_day(day_data)
             tabs.addTab(canvas3, "Bookings by Day")
@@ -1539,6 +1597,12 @@ class AdminDashboard(QMainWindow):
             
             layout.addWidget(tabs)
             
+            cache_stats = report_cache.stats()
+            cache_label = QLabel(f"Report cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                                 f"({cache_stats['hit_rate'] * 100:.0f}% hit rate, {cache_stats['entries']} entries)")
+            cache_label.setStyleSheet("color: #94A3B8; font-size: 10px;")
+            layout.addWidget(cache_label)
+            
             # Close button
             close_btn = QPushButton("Close")
             close_btn.setMinimumHeight(40)
@@ -1565,6 +1629,140 @@ class AdminDashboard(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             self.refresh_schedules_table()
     
+    def manage_semesters(self):
+        """Show the semester calendar and edit semesters and holidays"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Semesters & Holidays")
+        dialog.setGeometry(200, 200, 700, 560)
+        
+        layout = QVBoxLayout()
+        
+        title = QLabel("Semester Calendar")
+        title.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        layout.addWidget(title)
+        info = QLabel("Classes of a semester in the calendar only meet between its dates and not on its holidays. "
+                      "Schedules whose semester is not listed meet every week.")
+        info.setWordWrap(True)
+        layout.addWidget(info)
+        
+        semesters_table = QTableWidget()
+        semesters_table.setColumnCount(4)
+        semesters_table.setHorizontalHeaderLabels(["Name", "Start", "End", "Holidays"])
+        semesters_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        semesters_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        semesters_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        semesters_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(semesters_table)
+        
+        semester_buttons = QHBoxLayout()
+        add_semester_btn = QPushButton("+ Add Semester")
+        edit_semester_btn = QPushButton("Edit Dates")
+        semester_buttons.addWidget(add_semester_btn)
+        semester_buttons.addWidget(edit_semester_btn)
+        semester_buttons.addStretch()
+        layout.addLayout(semester_buttons)
+        
+        holidays_label = QLabel("Holidays")
+        holidays_label.setFont(QFont("Segoe UI", 11, QFont.Bold))
+        layout.addWidget(holidays_label)
+        
+        holidays_table = QTableWidget()
+        holidays_table.setColumnCount(2)
+        holidays_table.setHorizontalHeaderLabels(["Date", "Name"])
+        holidays_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        holidays_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        holidays_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        holidays_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(holidays_table)
+        
+        holiday_buttons = QHBoxLayout()
+        add_holiday_btn = QPushButton("+ Add Holiday")
+        remove_holiday_btn = QPushButton("Remove Holiday")
+        holiday_buttons.addWidget(add_holiday_btn)
+        holiday_buttons.addWidget(remove_holiday_btn)
+        holiday_buttons.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.accept)
+        holiday_buttons.addWidget(close_btn)
+        layout.addLayout(holiday_buttons)
+        
+        semesters = []
+        
+        def selected_semester():
+            row = semesters_table.currentRow()
+            return semesters[row] if 0 <= row < len(semesters) else None
+        
+        def refresh_holidays():
+            semester = selected_semester()
+            holidays = semester.get_holidays() if semester else []
+            holidays_table.setRowCount(len(holidays))
+            for row, (holiday_id, holiday_date, name) in enumerate(holidays):
+                date_item = QTableWidgetItem(holiday_date)
+                date_item.setData(Qt.UserRole, holiday_id)
+                holidays_table.setItem(row, 0, date_item)
+                holidays_table.setItem(row, 1, QTableWidgetItem(name or ""))
+        
+        def refresh_semesters(select_name=None):
+            semesters[:] = Semester.get_all_semesters()
+            semesters_table.setRowCount(len(semesters))
+            for row, semester in enumerate(semesters):
+                semesters_table.setItem(row, 0, QTableWidgetItem(semester.name))
+                semesters_table.setItem(row, 1, QTableWidgetItem(semester.start_date))
+                semesters_table.setItem(row, 2, QTableWidgetItem(semester.end_date))
+                semesters_table.setItem(row, 3, QTableWidgetItem(str(len(semester.get_holidays()))))
+            names = [semester.name for semester in semesters]
+            if semesters:
+                semesters_table.selectRow(names.index(select_name) if select_name in names else 0)
+            refresh_holidays()
+        
+        def add_semester():
+            if SemesterDialog(parent=dialog).exec_() == QDialog.Accepted:
+                refresh_semesters()
+        
+        def edit_semester():
+            semester = selected_semester()
+            if not semester:
+                QMessageBox.warning(dialog, "No Semester", "Please select a semester first.")
+                return
+            if SemesterDialog(semester, dialog).exec_() == QDialog.Accepted:
+                refresh_semesters(semester.name)
+        
+        def add_holiday():
+            semester = selected_semester()
+            if not semester:
+                QMessageBox.warning(dialog, "No Semester", "Please select a semester first.")
+                return
+            if HolidayDialog(semester, dialog).exec_() == QDialog.Accepted:
+                refresh_semesters(semester.name)
+        
+        def remove_holiday():
+            semester = selected_semester()
+            row = holidays_table.currentRow()
+            if not semester or row < 0:
+                QMessageBox.warning(dialog, "No Holiday", "Please select a holiday first.")
+                return
+            date_item = holidays_table.item(row, 0)
+            reply = QMessageBox.question(dialog, "Confirm Remove",
+                                         f"Remove the holiday on {date_item.text()}?\n"
+                                         "Classes on that date will meet again.",
+                                         QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+            if semester.remove_holiday(date_item.data(Qt.UserRole)):
+                refresh_semesters(semester.name)
+            else:
+                QMessageBox.critical(dialog, "Error", "Failed to remove holiday.")
+        
+        semesters_table.itemSelectionChanged.connect(refresh_holidays)
+        add_semester_btn.clicked.connect(add_semester)
+        edit_semester_btn.clicked.connect(edit_semester)
+        add_holiday_btn.clicked.connect(add_holiday)
+        remove_holiday_btn.clicked.connect(remove_holiday)
+        refresh_semesters()
+        
+        dialog.setLayout(layout)
+        dialog.exec_()
+    
     def view_booking(self, booking):
         """View booking details"""
         user = User.get_user_by_id(booking.user_id)
@@ -1589,12 +1787,119 @@ class AdminDashboard(QMainWindow):
             reply = QMessageBox.question(self, "Booking Details", message + "\n\nApprove this booking?",
                                         QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
             if reply == QMessageBox.Yes:
-                booking.approve(self.current_user.id)
-                QMessageBox.information(self, "Success", "Booking approved!")
+                changed, skipped = Booking.transition_many([booking.id], 1, self.current_user.id)
+                if changed:
+                    QMessageBox.information(self, "Success", "Booking approved!")
+                else:
+                    QMessageBox.warning(self, "Not Approved",
+                                        f"Booking could not be approved: {skipped.get(booking.id)}")
                 self.refresh_bookings_table()
         else:
             QMessageBox.information(self, "Booking Details", message)
     
+    def find_free_slots(self):
+        """List free room slots of a given length over the next three weekday weeks"""
+        duration, ok = QInputDialog.getInt(self, "Find Free Slots", "Length (minutes):", 90, 30, 600, 30)
+        if not ok:
+            return
+        capacity, ok = QInputDialog.getInt(self, "Find Free Slots", "Minimum capacity (0 for any):", 0, 0, 1000)
+        if not ok:
+            return
+        
+        matrix = AvailabilityMatrix.build(days=21, min_capacity=capacity or None)
+        slots = matrix.find_gaps(duration, min_capacity=capacity or None, limit=40)
+        if not slots:
+            QMessageBox.information(self, "Find Free Slots", "No room is free for that long in the next three weeks.")
+            return
+        lines = [f"• {slot.date}  {slot.start_time}-{slot.end_time}  Room {slot.room_number} "
+                 f"(capacity {slot.capacity})" for slot in slots]
+        QMessageBox.information(self, "Find Free Slots",
+                                f"Free for at least {duration} minutes (first {len(slots)}):\n\n" + "\n".join(lines))
+    
+    def allocate_pending_bookings(self):
+        """Plan rooms for every pending request and approve the plan at once"""
+        plan = BatchAllocator().plan()
+        if not plan.assignments:
+            QMessageBox.information(self, "Allocate Pending", "No pending bookings can be allocated.")
+            return
+        
+        rooms = {c.id: c.room_number for c in Classroom.get_all_classrooms()}
+        lines = []
+        for a in plan.assignments:
+            b = a.booking
+            room = rooms.get(a.classroom_id, a.classroom_id)
+            moved = f" (moved from {rooms.get(b.classroom_id, b.classroom_id)})" if a.moved else ""
+            lines.append(f"• #{b.id} {b.course_name or ''}: {b.booking_date} {b.start_time}-{b.end_time} "
+                         f"→ {room}{moved}")
+        for b in plan.unassigned:
+            lines.append(f"• #{b.id} {b.course_name or ''}: {b.booking_date} {b.start_time}-{b.end_time} "
+                         f"→ no free room, stays pending")
+        
+        if not plan.exact:
+            lines.append("\nSome days had too many overlapping requests to search every "
+                         "arrangement; their rooms were planned by a quicker method.")
+        
+        reply = QMessageBox.question(
+            self, "Allocate Pending",
+            f"{len(plan.assignments)} of {len(plan.assignments) + len(plan.unassigned)} pending "
+            f"bookings can be approved:\n\n" + "\n".join(lines) + "\n\nApprove this plan?",
+            QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        success, message = plan.approve(self.current_user.id)
+        if not success:
+            QMessageBox.critical(self, "Error", f"Plan could not be applied:\n{message}")
+            return
+        
+        updates = []
+        for a in plan.assignments:
+            booking = Booking.get_booking_by_id(a.booking.id)
+            if booking:
+                updates.append((booking, User.get_user_by_id(booking.user_id)))
+        EmailNotificationService.send_async(EmailNotificationService.send_status_updates, updates)
+        
+        QMessageBox.information(self, "Success", message)
+        self.refresh_bookings_table()
+    
+    def bulk_update_bookings(self, new_status):
+        """Approve, reject or cancel every selected booking at once"""
+        booking_ids = sorted({int(self.bookings_table.item(index.row(), 0).text())
+                              for index in self.bookings_table.selectionModel().selectedRows()})
+        if not booking_ids:
+            QMessageBox.warning(self, "No Selection", "Select one or more bookings first.")
+            return
+        
+        action = {1: "Approve", 3: "Reject", 0: "Cancel"}[new_status]
+        reason = None
+        if new_status in (0, 3):
+            reason, ok = QInputDialog.getText(self, f"{action} Bookings", "Reason:")
+            if not ok:
+                return
+        else:
+            reply = QMessageBox.question(self, "Approve Bookings",
+                                         f"Approve {len(booking_ids)} selected bookings?",
+                                         QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+        
+        changed, skipped = Booking.transition_many(booking_ids, new_status, self.current_user.id, reason)
+        
+        # Hand the emails to a background thread, one per user
+        users = {}
+        for booking in changed:
+            if booking.user_id not in users:
+                users[booking.user_id] = User.get_user_by_id(booking.user_id)
+        EmailNotificationService.send_async(EmailNotificationService.send_status_updates,
+                                            [(b, users[b.user_id]) for b in changed], reason or "")
+        
+        message = f"{action}: {len(changed)} of {len(booking_ids)} bookings updated."
+        if skipped:
+            message += "\n\nSkipped:\n" + "\n".join(f"• #{booking_id}: {why}"
+                                                     for booking_id, why in sorted(skipped.items()))
+        QMessageBox.information(self, f"{action} Bookings", message)
+        self.refresh_bookings_table()
+    
     def refresh_data(self):
         """Refresh all data"""
         self.refresh_users_table()
@@ -1746,70 +2051,7 @@ Total Schedules: {self.count_schedules()}"""
     def generate_report(self):
         """Generate comprehensive report"""
         try:
-            from reports.usage_report import ReportGenerator
-            import os
-            from datetime import datetime
-            
-            report_gen = ReportGenerator()
-            
-            # Create reports directory if it doesn't exist
-            reports_dir = os.path.join(os.path.dirname(__file__), '..', 'reports_output')
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
-            
-            # Generate report with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_file = os.path.join(reports_dir, f"comprehensive_report_{timestamp}.txt")
-            
-            with open(report_file, 'w') as f:
-                f.write("="*80 + "\n")
-                f.write("FATIMA JINNAH WOMEN UNIVERSITY\n")
-                f.write("Smart Campus Resource Management System - Comprehensive Report\n")
-                f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("="*80 + "\n\n")
-                
-                # Booking Statistics
-                f.write("1. BOOKING STATISTICS\n")
-                f.write("-" * 80 + "\n")
-                stats = report_gen.get_booking_stats()
-                f.write(f"Total Bookings: {stats['total']}\n")
-                f.write(f"Approved: {stats['approved']}\n")
-                f.write(f"Pending: {stats['pending']}\n")
-                f.write(f"Rejected: {stats['rejected']}\n")
-                f.write(f"Cancelled: {stats['cancelled']}\n\n")
-                
-                # Resource Usage
-                f.write("2. CLASSROOM RESOURCE USAGE\n")
-                f.write("-" * 80 + "\n")
-                usage = report_gen.get_resource_usage()
-                for classroom, count in usage.items():
-                    f.write(f"{classroom}: {count} bookings\n")
-                f.write("\n")
-                
-                # Classroom Information
-                f.write("3. CLASSROOM INFORMATION\n")
-                f.write("-" * 80 + "\n")
-                classrooms = Classroom.get_all_classrooms()
-                for classroom in classrooms:
-                    f.write(f"Room {classroom.room_number}:\n")
-                    f.write(f"  Type: {classroom.room_type}\n")
-                    f.write(f"  Building: {classroom.building}\n")
-                    f.write(f"  Floor: {classroom.floor}\n")
-                    f.write(f"  Capacity: {classroom.capacity}\n\n")
-                
-                # Teacher Information
-                f.write("4. TEACHER INFORMATION\n")
-                f.write("-" * 80 + "\n")
-                db = DatabaseManager()
-                teachers = db.execute_query('SELECT id, fullname, email, phone FROM users WHERE role = 2')
-                for teacher in teachers:
-                    f.write(f"{teacher[1]}:\n")
-                    f.write(f"  Email: {teacher[2]}\n")
-                    f.write(f"  Phone: {teacher[3]}\n\n")
-                
-                f.write("="*80 + "\n")
-                f.write("End of Report\n")
-                f.write("="*80 + "\n")
+            report_file = self.run_report_job('comprehensive')[0]
             
             # Show success message with file location
             QMessageBox.information(self, "Report Generated", 
@@ -1874,13 +2116,9 @@ Total Schedules: {self.count_schedules()}"""
         
         try:
             # Get booking data
-            bookings = Booking.get_all_bookings()
+            by_status = ReportGenerator().get_summary()['by_status']
             status_map = {0: 'Cancelled', 1: 'Approved', 2: 'Pending', 3: 'Rejected'}
-            status_counts = {status: 0 for status in status_map.values()}
-            
-            for booking in bookings:
-                status_text = status_map.get(booking.status, 'Unknown')
-                status_counts[status_text] += 1
+            status_counts = {text: by_status.get(status, 0) for status, text in status_map.items()}
             
             # Create figure
             fig = plt.Figure(figsize=(5, 3), dpi=100, facecolor='#0F172A')
@@ -1986,216 +2224,227 @@ Total Schedules: {self.count_schedules()}"""
         
         return container
     
-    def report_resource_usage(self):
-        """Generate resource usage report"""
+    def create_demand_forecast_chart(self):
+        """Create forecast chart of weekly room-hours requested per room type"""
+        container = QWidget()
+        container.setMinimumHeight(340)
+        container.setStyleSheet("background: #0F172A; border-radius: 8px; border: 1px solid #334155;")
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(15, 15, 15, 15)
+        layout.setSpacing(10)
+        
+        chart_title = QLabel("🔮 Demand Forecast (room-hours per week, 90% band)")
+        chart_title.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        chart_title.setStyleSheet("color: #06B6D4;")
+        layout.addWidget(chart_title)
+        
         try:
-            import os
-            
-            # Create reports directory in the same folder as the app
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            reports_dir = os.path.join(base_dir, 'reports_output')
-            
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_file = os.path.join(reports_dir, f"resource_usage_report_{timestamp}.txt")
+            forecast = forecast_demand(weeks_ahead=4, history_weeks=12)
+            history = forecast.history.weekly.sum(axis=(2, 3))
+            expected, lower, upper = forecast.weekly_totals()
+            past_labels = [datetime.strptime(day, '%Y-%m-%d').strftime('%d %b')
+                           for day in forecast.history.week_starts()]
+            future_labels = [datetime.strptime(day, '%Y-%m-%d').strftime('%d %b')
+                             for day in forecast.week_starts]
+            
+            fig = plt.Figure(figsize=(10, 3.2), dpi=100, facecolor='#0F172A')
+            ax = fig.add_subplot(111)
             
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write("="*80 + "\n")
-                f.write("FATIMA JINNAH WOMEN UNIVERSITY\n")
-                f.write("Classroom Resource Usage Report\n")
-                f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("="*80 + "\n\n")
-                
-                from reports.usage_report import ReportGenerator
-                report_gen = ReportGenerator()
-                usage = report_gen.get_resource_usage()
-                
-                f.write("CLASSROOM RESOURCE USAGE STATISTICS\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"{'Classroom':<20} {'Bookings':<15}\n")
-                f.write("-" * 80 + "\n")
-                
-                total_bookings = 0
-                for classroom, count in sorted(usage.items()):
-                    f.write(f"{classroom:<20} {count:<15}\n")
-                    total_bookings += count
+            if forecast.room_types:
+                colors = ['#06B6D4', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6']
+                past = range(len(past_labels))
+                # Forecast lines start from the last observed week
+                future = range(len(past_labels) - 1, len(past_labels) + len(future_labels))
+                for i, room_type in enumerate(forecast.room_types):
+                    color = colors[i % len(colors)]
+                    last = history[i, -1]
+                    ax.plot(past, history[i], color=color, linewidth=2, marker='o', markersize=4,
+                            label=room_type)
+                    ax.plot(future, [last] + expected[i].tolist(), color=color, linewidth=2, linestyle='--')
+                    ax.fill_between(future, [last] + lower[i].tolist(), [last] + upper[i].tolist(),
+                                    color=color, alpha=0.15)
                 
-                f.write("-" * 80 + "\n")
-                f.write(f"{'TOTAL':<20} {total_bookings:<15}\n")
-                f.write("="*80 + "\n")
+                ax.axvline(len(past_labels) - 0.5, color='#475569', linestyle=':', linewidth=1)
+                ax.set_xticks(range(len(past_labels) + len(future_labels)))
+                ax.set_xticklabels(past_labels + future_labels, rotation=45, ha='right')
+                ax.set_ylabel('Room-hours', color='#E2E8F0', fontsize=10, fontweight='bold')
+                ax.tick_params(axis='both', colors='#E2E8F0', labelsize=9)
+                ax.spines['left'].set_color('#334155')
+                ax.spines['bottom'].set_color('#334155')
+                ax.spines['top'].set_visible(False)
+                ax.spines['right'].set_visible(False)
+                ax.grid(axis='y', color='#1E293B', linestyle='--', alpha=0.5)
+                ax.set_ylim(bottom=0)
+                ax.legend(loc='upper left', facecolor='#0F172A', edgecolor='#334155', labelcolor='#E2E8F0',
+                          fontsize=9, ncol=len(forecast.room_types))
+            else:
+                ax.text(0.5, 0.5, 'No Data', ha='center', va='center', color='#94A3B8', fontsize=12)
+            
+            fig.tight_layout()
+            canvas = FigureCanvasQTAgg(fig)
+            layout.addWidget(canvas)
             
-            QMessageBox.information(self, "Report Generated", 
-                                  f"✓ Report saved successfully!\n\n"
-                                  f"File: resource_usage_report_{timestamp}.txt\n\n"
-                                  f"Location:\n{reports_dir}")
+        except Exception as e:
+            error_label = QLabel(f"Chart Error: {str(e)}")
+            error_label.setStyleSheet("color: #EF4444;")
+            layout.addWidget(error_label)
+        
+        return container
+    
+    def run_report_job(self, name):
+        """Run one report job (see reports.jobs) here and return the files it wrote"""
+        reports_dir = REPORTS_OUTPUT_DIR
+        if not os.path.exists(reports_dir):
+            os.makedirs(reports_dir)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return REPORT_JOBS[name][1](DatabaseManager(), reports_dir, timestamp)
+    
+    def show_report_saved(self, report_file):
+        QMessageBox.information(self, "Report Generated", 
+                              f"✓ Report saved successfully!\n\n"
+                              f"File: {os.path.basename(report_file)}\n\n"
+                              f"Location:\n{os.path.dirname(report_file)}")
+    
+    def report_resource_usage(self):
+        """Generate resource usage report"""
+        try:
+            self.show_report_saved(self.run_report_job('resource_usage')[0])
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to generate report:\n{str(e)}")
     
     def report_booking_stats(self):
         """Generate booking statistics report"""
         try:
-            import os
-            
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            reports_dir = os.path.join(base_dir, 'reports_output')
-            
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_file = os.path.join(reports_dir, f"booking_statistics_{timestamp}.txt")
-            
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write("="*80 + "\n")
-                f.write("FATIMA JINNAH WOMEN UNIVERSITY\n")
-                f.write("Booking Statistics Report\n")
-                f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("="*80 + "\n\n")
-                
-                from reports.usage_report import ReportGenerator
-                report_gen = ReportGenerator()
-                stats = report_gen.get_booking_stats()
-                
-                f.write("BOOKING STATISTICS\n")
-                f.write("-" * 80 + "\n")
-                f.write(f"Total Bookings:    {stats['total']}\n")
-                f.write(f"Approved:          {stats['approved']}\n")
-                f.write(f"Pending:           {stats['pending']}\n")
-                f.write(f"Rejected:          {stats['rejected']}\n")
-                f.write(f"Cancelled:         {stats['cancelled']}\n")
-                f.write("-" * 80 + "\n")
-                
-                if stats['total'] > 0:
-                    f.write(f"\nApproval Rate:     {(stats['approved']/stats['total']*100):.1f}%\n")
-                    f.write(f"Pending Rate:      {(stats['pending']/stats['total']*100):.1f}%\n")
-                
-                f.write("="*80 + "\n")
-            
-            QMessageBox.information(self, "Report Generated", 
-                                  f"✓ Report saved successfully!\n\n"
-                                  f"File: booking_statistics_{timestamp}.txt\n\n"
-                                  f"Location:\n{reports_dir}")
+            self.show_report_saved(self.run_report_job('booking_statistics')[0])
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to generate report:\n{str(e)}")
     
     def report_teacher_schedule(self):
         """Generate teacher schedule report"""
         try:
-            import os
-            
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            reports_dir = os.path.join(base_dir, 'reports_output')
-            
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_file = os.path.join(reports_dir, f"teacher_schedule_{timestamp}.txt")
-            
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write("="*80 + "\n")
-                f.write("FATIMA JINNAH WOMEN UNIVERSITY\n")
-                f.write("Teacher Schedule Report\n")
-                f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("="*80 + "\n\n")
-                
-                db = DatabaseManager()
-                teachers = db.execute_query('SELECT id, fullname FROM users WHERE role = 2 ORDER BY fullname')
-                
-                f.write("TEACHER SCHEDULES\n")
-                f.write("-" * 80 + "\n\n")
-                
-                for teacher in teachers:
-                    teacher_id = teacher[0]
-                    teacher_name = teacher[1]
-                    
-                    f.write(f"Teacher: {teacher_name}\n")
-                    f.write("-" * 60 + "\n")
-                    
-                    schedules = db.execute_query(
-                        'SELECT s.course_name, s.day_of_week, s.start_time, s.end_time, c.room_number FROM schedules s '
-                        'JOIN classrooms c ON s.classroom_id = c.id WHERE s.teacher_id = ? ORDER BY s.day_of_week, s.start_time',
-                        (teacher_id,)
-                    )
-                    
-                    if schedules:
-                        for schedule in schedules:
-                            course = schedule[0]
-                            day = schedule[1]
-                            start = schedule[2]
-                            end = schedule[3]
-                            room = schedule[4]
-                            f.write(f"  {day:<12} {start}-{end}  {room:<8}  {course}\n")
-                    else:
-                        f.write("  No schedules assigned\n")
-                    
-                    f.write("\n")
-                
-                f.write("="*80 + "\n")
-            
-            QMessageBox.information(self, "Report Generated", 
-                                  f"✓ Report saved successfully!\n\n"
-                                  f"File: teacher_schedule_{timestamp}.txt\n\n"
-                                  f"Location:\n{reports_dir}")
+            self.show_report_saved(self.run_report_job('teacher_schedule')[0])
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to generate report:\n{str(e)}")
     
     def export_data(self):
-        """Export all data to CSV files"""
-        try:
-            import os
-            import csv
-            
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            reports_dir = os.path.join(base_dir, 'reports_output')
-            
-            if not os.path.exists(reports_dir):
-                os.makedirs(reports_dir)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            db = DatabaseManager()
-            
-            # Export Classrooms
-            classrooms_file = os.path.join(reports_dir, f"classrooms_{timestamp}.csv")
-            with open(classrooms_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Room Number', 'Type', 'Building', 'Floor', 'Capacity'])
-                classrooms = Classroom.get_all_classrooms()
-                for c in classrooms:
-                    writer.writerow([c.room_number, c.room_type, c.building, c.floor, c.capacity])
-            
-            # Export Teachers
-            teachers_file = os.path.join(reports_dir, f"teachers_{timestamp}.csv")
-            with open(teachers_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Full Name', 'Username', 'Email', 'Phone', 'Department'])
-                teachers = db.execute_query('SELECT fullname, username, email, phone, department FROM users WHERE role = 2')
-                for t in teachers:
-                    writer.writerow(t)
-            
-            # Export Schedules
-            schedules_file = os.path.join(reports_dir, f"schedules_{timestamp}.csv")
-            with open(schedules_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Course', 'Teacher', 'Classroom', 'Day', 'Start Time', 'End Time', 'Semester'])
-                schedules = db.execute_query(
-                    'SELECT s.course_name, u.fullname, c.room_number, s.day_of_week, s.start_time, s.end_time, s.semester '
-                    'FROM schedules s JOIN users u ON s.teacher_id = u.id JOIN classrooms c ON s.classroom_id = c.id'
-                )
-                for s in schedules:
-                    writer.writerow(s)
-            
-            QMessageBox.information(self, "Data Exported", 
-                                  f"✓ All data exported successfully!\n\n"
-                                  f"Files created:\n"
-                                  f"- classrooms_{timestamp}.csv\n"
-                                  f"- teachers_{timestamp}.csv\n"
-                                  f"- schedules_{timestamp}.csv\n\n"
-                                  f"Location:\n{reports_dir}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export data:\n{str(e)}")
+        """Export all data, streamed off the UI thread"""
+        if getattr(self, 'export_thread', None) and self.export_thread.isRunning():
+            QMessageBox.information(self, "Export", "An export is already running.")
+            return
+        fmt, ok = QInputDialog.getItem(self, "Export All Data", "File format:", list(EXPORT_FORMATS), 0, False)
+        if not ok:
+            return
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        export = partial(export_tables, ['bookings', 'classrooms', 'teachers', 'schedules'],
+                         REPORTS_OUTPUT_DIR, timestamp, fmt, DatabaseManager().db_path)
+        progress = QProgressDialog("Exporting data...", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Export All Data")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        
+        def on_progress(done, total):
+            progress.setValue(int(done * 100 / total) if total else 100)
+            progress.setLabelText(f"Exported {done:,} of {total:,} rows")
+        
+        def on_finished(files, error, cancelled):
+            progress.close()
+            if cancelled:
+                QMessageBox.information(self, "Export", "Export cancelled; no files were kept.")
+            elif error:
+                QMessageBox.critical(self, "Error", f"Failed to export data:\n{error}")
+            else:
+                QMessageBox.information(self, "Data Exported", 
+                                      f"✓ All data exported successfully!\n\n"
+                                      f"Files created:\n"
+                                      + "".join(f"- {os.path.basename(path)}\n" for path in files) +
+                                      f"\nLocation:\n{REPORTS_OUTPUT_DIR}")
+        
+        self.export_thread = ExportThread(export, self)
+        self.export_thread.progress.connect(on_progress)
+        self.export_thread.completed.connect(on_finished)
+        progress.canceled.connect(self.export_thread.cancel)
+        self.export_thread.start()
+    
+    def generate_report_pack(self):
+        """Run every report in parallel worker processes with a progress dialog"""
+        if getattr(self, 'report_pack_thread', None) and self.report_pack_thread.isRunning():
+            QMessageBox.information(self, "Report Pack", "A report pack is already being generated.")
+            return
+        
+        runner = ReportJobRunner(output_dir=REPORTS_OUTPUT_DIR, db_path=DatabaseManager().db_path)
+        progress = QProgressDialog("Generating reports...", "Cancel", 0, len(runner.jobs), self)
+        progress.setWindowTitle("Report Pack")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setValue(0)
+        
+        def on_progress(done, total, entry):
+            progress.setValue(done)
+            progress.setLabelText(f"Finished {entry['title']} ({done}/{total})")
+        
+        def on_finished(manifest, error):
+            progress.close()
+            if error:
+                QMessageBox.critical(self, "Error", f"Failed to generate report pack:\n{error}")
+                return
+            lines = []
+            for entry in manifest['jobs']:
+                if entry.get('error'):
+                    lines.append(f"✗ {entry['title']}: {entry['error']}")
+                elif entry.get('cancelled'):
+                    lines.append(f"– {entry['title']}: cancelled")
+                else:
+                    lines.append(f"✓ {entry['title']}: {', '.join(entry['files'])}")
+            QMessageBox.information(self, "Report Pack",
+                                    "\n".join(lines) +
+                                    f"\n\n{manifest['workers']} workers, {manifest['seconds']:.1f}s\n"
+                                    f"Manifest:\n{manifest['path']}")
+        
+        self.report_pack_thread = ReportJobThread(runner, self)
+        self.report_pack_thread.progress.connect(on_progress)
+        self.report_pack_thread.completed.connect(on_finished)
+        progress.canceled.connect(self.report_pack_thread.cancel)
+        self.report_pack_thread.start()
+    
+    def run_scheduled_reports(self, notify=False):
+        """Run the due scheduled reports in the background"""
+        if getattr(self, 'scheduled_report_thread', None) and self.scheduled_report_thread.isRunning():
+            if notify:
+                QMessageBox.information(self, "Scheduled Reports", "Scheduled reports are already running.")
+            return
+        
+        def on_finished(runs, error):
+            if not notify:
+                return
+            if error:
+                QMessageBox.critical(self, "Error", f"Failed to run scheduled reports:\n{error}")
+                return
+            self.show_report_runs(runs)
+        
+        scheduler = ReportScheduler(output_dir=REPORTS_OUTPUT_DIR, db_path=DatabaseManager().db_path)
+        self.scheduled_report_thread = ScheduledReportThread(scheduler, self)
+        self.scheduled_report_thread.completed.connect(on_finished)
+        self.scheduled_report_thread.start()
+    
+    def show_scheduled_reports(self):
+        """Run whatever is due now and show the latest scheduled runs"""
+        self.run_scheduled_reports(notify=True)
+    
+    def show_report_runs(self, runs):
+        lines = []
+        for run in runs or ReportScheduler(output_dir=REPORTS_OUTPUT_DIR).history(limit=10):
+            if run['status'] == 'failed':
+                lines.append(f"✗ {run['schedule']} ({run['started_at']}): {run['error']}")
+                continue
+            delta = os.path.basename(run['delta_file']) if run['delta_file'] else "no delta"
+            lines.append(f"✓ {run['schedule']} ({run['started_at']}): {run['status']}, "
+                         f"{run['changes']} changes\n    {', '.join(os.path.basename(path) for path in run['full_files'])}"
+                         f"; {delta}")
+        heading = "Ran now:" if runs else "Nothing due. Latest runs:"
+        QMessageBox.information(self, "Scheduled Reports",
+                                heading + "\n\n" + ("\n".join(lines) or "No scheduled runs yet.") +
+                                f"\n\nLocation:\n{os.path.join(REPORTS_OUTPUT_DIR, 'scheduled')}")
     
     def show_about(self):
         """Show about dialog"""
@@ -2261,6 +2510,7 @@ Total Schedules: {self.count_schedules()}"""
 <li><b>Edit Booking:</b> Modify booking details and status</li>
 <li><b>Delete Booking:</b> Cancel bookings</li>
 <li><b>Approve/Reject:</b> Manage booking approval status</li>
+<li><b>Find Free Slots:</b> List rooms free for a given length of time on weekdays in the next three weeks</li>
 </ul>
 
 <h3>Schedules Tab</h3>
@@ -2269,6 +2519,7 @@ Total Schedules: {self.count_schedules()}"""
 <li><b>Add Schedule:</b> Create new class schedules</li>
 <li><b>Edit Schedule:</b> Update schedule timings and details</li>
 <li><b>Delete Schedule:</b> Remove schedules</li>
+<li><b>Semesters:</b> Set semester dates and holidays; classes only meet on the dates they cover</li>
 </ul>
 
 <h3>Reports Tab</h3>
@@ -3,12 +3,15 @@ Dialog Forms for Admin Dashboard
 """
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-                             QPushButton, QMessageBox, QComboBox, QSpinBox, QTimeEdit)
-from PyQt5.QtCore import Qt, QTime
+                             QPushButton, QMessageBox, QComboBox, QSpinBox, QTimeEdit,
+                             QDateEdit, QCheckBox)
+from PyQt5.QtCore import Qt, QTime, QDate
 from PyQt5.QtGui import QFont
 from models.user import User
 from models.classroom import Classroom
 from models.schedule import Schedule
+from models.semester import Semester
+from scheduling.conflicts import ConflictEngine
 from database.db_setup import DatabaseManager
 from config import DEPARTMENTS
 from utils.validation import FormValidator
@@ -740,6 +743,12 @@ class AddScheduleDialog(QDialog):
             return
         
         try:
+            conflicts = ConflictEngine.schedule_conflicts(teacher_id, classroom_id, day, start_time, end_time)
+            if conflicts:
+                details = "\n".join(f"• {c.describe()}" for c in conflicts)
+                QMessageBox.warning(self, "Conflict", f"This slot clashes with:\n\n{details}")
+                return
+            
             schedule = Schedule(
                 teacher_id=teacher_id,
                 classroom_id=classroom_id,
@@ -757,3 +766,302 @@ class AddScheduleDialog(QDialog):
                 QMessageBox.critical(self, "Error", "Failed to add schedule.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error adding schedule: {str(e)}")
+
+
+class SemesterDialog(QDialog):
+    """Dialog for adding a semester or changing its dates"""
+    
+    def __init__(self, semester=None, parent=None):
+        super().__init__(parent)
+        self.semester = semester
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the user interface"""
+        title_text = "Edit Semester" if self.semester else "Add New Semester"
+        self.setWindowTitle(title_text)
+        self.setGeometry(100, 100, 400, 350)
+        self.setModal(True)
+        
+        # Apply dark theme styling
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #1E293B;
+            }
+            QLabel {
+                color: #E2E8F0;
+                font-size: 11px;
+            }
+            QComboBox, QDateEdit {
+                background-color: #0F172A;
+                color: #FFFFFF;
+                border: 2px solid #334155;
+                border-radius: 4px;
+                padding: 8px;
+                font-size: 12px;
+            }
+            QComboBox:focus, QDateEdit:focus {
+                border: 2px solid #06B6D4;
+            }
+            QComboBox::drop-down, QDateEdit::drop-down {
+                border: none;
+                background-color: #334155;
+            }
+            QPushButton {
+                color: white;
+                border: none;
+                border-radius: 4px;
+                padding: 10px 20px;
+                font-weight: bold;
+                font-size: 11px;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        # Title
+        title = QLabel(title_text)
+        title.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        title.setStyleSheet("color: #06B6D4; font-size: 14px; margin-bottom: 10px;")
+        layout.addWidget(title)
+        
+        # Name: offer the semesters schedules already refer to
+        layout.addWidget(QLabel("Semester Name:"))
+        self.name_combo = QComboBox()
+        self.name_combo.setEditable(True)
+        self.name_combo.setMinimumHeight(35)
+        if self.semester:
+            self.name_combo.addItem(self.semester.name)
+            # Schedules refer to semesters by name, so the name stays fixed
+            self.name_combo.setEnabled(False)
+        else:
+            self.load_semester_names()
+        layout.addWidget(self.name_combo)
+        
+        # Dates
+        layout.addWidget(QLabel("Start Date:"))
+        self.start_date = QDateEdit()
+        self.start_date.setCalendarPopup(True)
+        self.start_date.setDisplayFormat("yyyy-MM-dd")
+        self.start_date.setMinimumHeight(35)
+        layout.addWidget(self.start_date)
+        
+        layout.addWidget(QLabel("End Date:"))
+        self.end_date = QDateEdit()
+        self.end_date.setCalendarPopup(True)
+        self.end_date.setDisplayFormat("yyyy-MM-dd")
+        self.end_date.setMinimumHeight(35)
+        layout.addWidget(self.end_date)
+        
+        if self.semester:
+            self.start_date.setDate(QDate.fromString(self.semester.start_date, "yyyy-MM-dd"))
+            self.end_date.setDate(QDate.fromString(self.semester.end_date, "yyyy-MM-dd"))
+        else:
+            self.start_date.setDate(QDate.currentDate())
+            self.end_date.setDate(QDate.currentDate().addDays(16 * 7))
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        save_button = QPushButton("Save")
+        save_button.setMinimumHeight(40)
+        save_button.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #06B6D4, stop:1 #0891B2);
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0891B2, stop:1 #0E7490);
+            }
+        """)
+        save_button.clicked.connect(self.save_semester)
+        button_layout.addWidget(save_button)
+        
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setMinimumHeight(40)
+        cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: #475569;
+            }
+            QPushButton:hover {
+                background-color: #64748B;
+            }
+        """)
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def load_semester_names(self):
+        """Fill the name box with schedule semesters not yet in the calendar"""
+        try:
+            db = DatabaseManager()
+            results = db.execute_query('''
+                SELECT DISTINCT semester FROM schedules
+                WHERE semester IS NOT NULL AND semester != ''
+                AND semester NOT IN (SELECT name FROM semesters)
+                ORDER BY semester
+            ''')
+            for row in results or []:
+                self.name_combo.addItem(row[0])
+        except Exception as e:
+            print(f"Error loading semester names: {e}")
+    
+    def save_semester(self):
+        """Save the semester and regenerate its class dates"""
+        name = self.name_combo.currentText().strip()
+        start_date = self.start_date.date().toString("yyyy-MM-dd")
+        end_date = self.end_date.date().toString("yyyy-MM-dd")
+        
+        if not name:
+            QMessageBox.warning(self, "Validation Error", "Please enter a semester name!")
+            return
+        if self.end_date.date() < self.start_date.date():
+            QMessageBox.warning(self, "Validation Error", "The semester must end after it starts!")
+            return
+        
+        try:
+            if self.semester:
+                self.semester.start_date = start_date
+                self.semester.end_date = end_date
+                saved = self.semester.update()
+            else:
+                if Semester.get_semester_by_name(name):
+                    QMessageBox.warning(self, "Validation Error", f"Semester '{name}' already exists!")
+                    return
+                saved = Semester(name=name, start_date=start_date, end_date=end_date).create()
+            
+            if saved:
+                QMessageBox.information(self, "Success", "Semester saved successfully!")
+                self.accept()
+            else:
+                QMessageBox.critical(self, "Error", "Failed to save semester.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error saving semester: {str(e)}")
+
+
+class HolidayDialog(QDialog):
+    """Dialog for adding a holiday to a semester"""
+    
+    def __init__(self, semester, parent=None):
+        super().__init__(parent)
+        self.semester = semester
+        self.init_ui()
+    
+    def init_ui(self):
+        """Initialize the user interface"""
+        self.setWindowTitle("Add Holiday")
+        self.setGeometry(100, 100, 400, 320)
+        self.setModal(True)
+        
+        # Apply dark theme styling
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #1E293B;
+            }
+            QLabel, QCheckBox {
+                color: #E2E8F0;
+                font-size: 11px;
+            }
+            QLineEdit, QDateEdit {
+                background-color: #0F172A;
+                color: #FFFFFF;
+                border: 2px solid #334155;
+                border-radius: 4px;
+                padding: 8px;
+                font-size: 12px;
+            }
+            QLineEdit:focus, QDateEdit:focus {
+                border: 2px solid #06B6D4;
+            }
+            QDateEdit::drop-down {
+                border: none;
+                background-color: #334155;
+            }
+            QPushButton {
+                color: white;
+                border: none;
+                border-radius: 4px;
+                padding: 10px 20px;
+                font-weight: bold;
+                font-size: 11px;
+            }
+        """)
+        
+        layout = QVBoxLayout()
+        layout.setSpacing(15)
+        layout.setContentsMargins(20, 20, 20, 20)
+        
+        # Title
+        title = QLabel(f"Add Holiday - {self.semester.name}")
+        title.setFont(QFont("Segoe UI", 14, QFont.Bold))
+        title.setStyleSheet("color: #06B6D4; font-size: 14px; margin-bottom: 10px;")
+        layout.addWidget(title)
+        
+        # Date, limited to the semester
+        layout.addWidget(QLabel("Date:"))
+        self.holiday_date = QDateEdit()
+        self.holiday_date.setCalendarPopup(True)
+        self.holiday_date.setDisplayFormat("yyyy-MM-dd")
+        self.holiday_date.setMinimumHeight(35)
+        self.holiday_date.setMinimumDate(QDate.fromString(self.semester.start_date, "yyyy-MM-dd"))
+        self.holiday_date.setMaximumDate(QDate.fromString(self.semester.end_date, "yyyy-MM-dd"))
+        layout.addWidget(self.holiday_date)
+        
+        # Name
+        layout.addWidget(QLabel("Name:"))
+        self.name_input = QLineEdit()
+        self.name_input.setPlaceholderText("e.g., Quaid Day")
+        self.name_input.setMinimumHeight(35)
+        layout.addWidget(self.name_input)
+        
+        self.all_semesters_check = QCheckBox("Applies to all semesters")
+        layout.addWidget(self.all_semesters_check)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        
+        save_button = QPushButton("Save")
+        save_button.setMinimumHeight(40)
+        save_button.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #06B6D4, stop:1 #0891B2);
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0891B2, stop:1 #0E7490);
+            }
+        """)
+        save_button.clicked.connect(self.save_holiday)
+        button_layout.addWidget(save_button)
+        
+        cancel_button = QPushButton("Cancel")
+        cancel_button.setMinimumHeight(40)
+        cancel_button.setStyleSheet("""
+            QPushButton {
+                background-color: #475569;
+            }
+            QPushButton:hover {
+                background-color: #64748B;
+            }
+        """)
+        cancel_button.clicked.connect(self.reject)
+        button_layout.addWidget(cancel_button)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def save_holiday(self):
+        """Save the holiday and drop the classes on that date"""
+        holiday_date = self.holiday_date.date().toString("yyyy-MM-dd")
+        name = self.name_input.text().strip() or None
+        
+        try:
+            if self.semester.add_holiday(holiday_date, name, self.all_semesters_check.isChecked()):
+                QMessageBox.information(self, "Success", "Holiday added successfully!")
+                self.accept()
+            else:
+                QMessageBox.critical(self, "Error", "Failed to add holiday.")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error adding holiday: {str(e)}")
@@ -3,15 +3,22 @@ Edit Dialog Classes for Admin Dashboard
 """
 
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-                             QPushButton, QMessageBox, QComboBox, QSpinBox, QTimeEdit)
+                             QPushButton, QMessageBox, QComboBox, QSpinBox, QTimeEdit,
+                             QInputDialog)
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QTime, QDate
 from database.db_setup import DatabaseManager
+from config import BOOKING_STATUS
 from models.user import User
 from models.classroom import Classroom
 from models.booking import Booking
 from models.schedule import Schedule
+from models.waitlist import Waitlist
 from utils.email_notification import EmailNotificationService
+from utils.time_utils import parse_time
+from scheduling.interval_index import interval_index
+from scheduling.conflicts import ConflictEngine
+from scheduling.availability import availability
 
 
 class EditClassroomDialog(QDialog):
@@ -200,6 +207,7 @@ class EditClassroomDialog(QDialog):
                 WHERE id = ?
             '''
             db.execute_update(query, (room_number, room_type, capacity, building, floor, status, self.classroom.id))
+            availability.rooms_changed()
             
             QMessageBox.information(self, "Success", "Classroom updated successfully!")
             self.accept()
@@ -217,6 +225,7 @@ class EditBookingDialog(QDialog):
         try:
             super().__init__(parent)
             self.booking = booking
+            self.acting_user = getattr(parent, 'current_user', None)
             self.init_ui()
         except Exception as e:
             print(f"EditBookingDialog init error: {e}")
@@ -310,17 +319,15 @@ class EditBookingDialog(QDialog):
             self.end_time.setMinimumHeight(35)
             layout.addWidget(self.end_time)
             
-            # Status
+            # Status: the current one plus the moves Booking.TRANSITIONS allows;
+            # only admins approve or reject
             layout.addWidget(QLabel("Status:"))
             self.status_combo = QComboBox()
-            self.status_combo.addItem("Pending", 2)
-            self.status_combo.addItem("Approved", 1)
-            self.status_combo.addItem("Rejected", 3)
-            self.status_combo.addItem("Cancelled", 0)
-            status_value = self.booking.status if self.booking.status else 2
-            status_index = self.status_combo.findData(status_value)
-            if status_index >= 0:
-                self.status_combo.setCurrentIndex(status_index)
+            self.status_combo.addItem(BOOKING_STATUS.get(self.booking.status, "Unknown"), self.booking.status)
+            is_admin = self.acting_user is not None and self.acting_user.role == 1
+            for status, allowed_from in Booking.TRANSITIONS.items():
+                if self.booking.status in allowed_from and (is_admin or status == 0):
+                    self.status_combo.addItem(BOOKING_STATUS[status], status)
             self.status_combo.setMinimumHeight(35)
             layout.addWidget(self.status_combo)
             
@@ -368,35 +375,65 @@ class EditBookingDialog(QDialog):
             start_time = self.start_time.time().toString("HH:mm")
             end_time = self.end_time.time().toString("HH:mm")
             new_status = self.status_combo.currentData()
-            old_status = self.booking.status
+            start_min, end_min = parse_time(start_time), parse_time(end_time)
             
             if not course_name:
                 QMessageBox.warning(self, "Validation Error", "Course name is required!")
                 return
+            if end_min <= start_min:
+                QMessageBox.warning(self, "Validation Error", "End time must be after start time!")
+                return
             
-            db = DatabaseManager()
-            query = '''
-                UPDATE bookings 
-                SET course_name = ?, start_time = ?, end_time = ?, status = ?
-                WHERE id = ?
-            '''
-            db.execute_update(query, (course_name, start_time, end_time, new_status, self.booking.id))
-            
-            # Send email notification if status changed
-            if new_status != old_status:
+            reason = None
+            if new_status != self.booking.status and new_status in (0, 3):
+                action = "Cancel" if new_status == 0 else "Reject"
+                reason, ok = QInputDialog.getText(self, f"{action} Booking", "Reason:")
+                if not ok:
+                    return
+            
+            # Check and write the new details under one write lock, and hand
+            # any freed time to the waitlist in the same transaction
+            conflicts, promoted = [], []
+            with DatabaseManager().transaction() as conn:
+                row = conn.execute('SELECT status FROM bookings WHERE id = ?', (self.booking.id,)).fetchone()
+                # Only active bookings occupy the room
+                if row is not None and row[0] in (1, 2):
+                    conflicts = ConflictEngine.booking_conflicts(
+                        self.booking.classroom_id, self.booking.booking_date, start_min, end_min,
+                        exclude_booking_id=self.booking.id, conn=conn)
+                if row is not None and not conflicts:
+                    conn.execute('''
+                        UPDATE bookings 
+                        SET course_name = ?, start_time = ?, end_time = ?, start_min = ?, end_min = ?
+                        WHERE id = ?
+                    ''', (course_name, start_time, end_time, start_min, end_min, self.booking.id))
+                    promoted = Waitlist.promote(self.booking.classroom_id, self.booking.booking_date, conn)
+            if row is None:
+                QMessageBox.warning(self, "Not Found", "This booking no longer exists.")
+                return
+            if conflicts:
+                details = "\n".join(f"• {c.describe()}" for c in conflicts)
+                QMessageBox.warning(self, "Conflict", f"The new time clashes with:\n\n{details}")
+                return
+            interval_index.booking_changed(self.booking.id)
+            Waitlist.notify_promoted(promoted)
+            self.booking.course_name = course_name
+            self.booking.start_time, self.booking.end_time = start_time, end_time
+            
+            # Status changes go through the checked transitions and grouped emails
+            if new_status != self.booking.status:
+                acted_by = self.acting_user.id if self.acting_user else None
+                changed, skipped = Booking.transition_many([self.booking.id], new_status, acted_by, reason)
+                if not changed:
+                    QMessageBox.warning(self, "Status Not Changed",
+                                        f"Details saved, but the status could not be changed: "
+                                        f"{skipped.get(self.booking.id)}")
+                    self.accept()
+                    return
+                self.booking = changed[0]
                 user = User.get_user_by_id(self.booking.user_id)
-                if user:
-                    # Update booking details for email
-                    self.booking.start_time = start_time
-                    self.booking.end_time = end_time
-                    self.booking.course_name = course_name
-                    
-                    if new_status == 1:  # Approved
-                        EmailNotificationService.send_approval_email(self.booking, user)
-                    elif new_status == 3:  # Rejected
-                        EmailNotificationService.send_rejection_email(self.booking, user)
-                    elif new_status == 0:  # Cancelled
-                        EmailNotificationService.send_cancellation_email(self.booking, user)
+                EmailNotificationService.send_async(EmailNotificationService.send_status_updates,
+                                                    [(self.booking, user)], reason or "")
             
             QMessageBox.information(self, "Success", "Booking updated successfully!")
             self.accept()
@@ -592,13 +629,25 @@ class EditScheduleDialog(QDialog):
                 QMessageBox.warning(self, "Validation Error", "Course name and semester are required!")
                 return
             
-            db = DatabaseManager()
-            query = '''
-                UPDATE schedules 
-                SET course_name = ?, day_of_week = ?, start_time = ?, end_time = ?, semester = ?, status = ?
-                WHERE id = ?
-            '''
-            db.execute_update(query, (course_name, day, start_time, end_time, semester, status, self.schedule.id))
+            if status == 1:
+                conflicts = ConflictEngine.schedule_conflicts(
+                    self.schedule.teacher_id, self.schedule.classroom_id, day, start_time, end_time,
+                    exclude_schedule_id=self.schedule.id)
+                if conflicts:
+                    details = "\n".join(f"• {c.describe()}" for c in conflicts)
+                    QMessageBox.warning(self, "Conflict", f"The new time clashes with:\n\n{details}")
+                    return
+            
+            # The model writes the change and hands a freed slot to the waitlist
+            self.schedule.course_name = course_name
+            self.schedule.day_of_week = day
+            self.schedule.start_time = start_time
+            self.schedule.end_time = end_time
+            self.schedule.semester = semester
+            self.schedule.status = status
+            if not self.schedule.update():
+                QMessageBox.critical(self, "Error", "Failed to update schedule.")
+                return
             
             QMessageBox.information(self, "Success", "Schedule updated successfully!")
             self.accept()
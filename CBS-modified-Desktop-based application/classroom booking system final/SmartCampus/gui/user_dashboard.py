@@ -12,13 +12,20 @@ from models.user import User
 from models.classroom import Classroom
 from models.booking import Booking
 from models.schedule import Schedule
+from models.waitlist import Waitlist
 from gui.styles import MODERN_STYLESHEET
 from gui.dialogs_edit import EditBookingDialog
 from utils.validation import FormValidator, Validator
 from utils.email_notification import EmailNotificationService
 from database.db_setup import DatabaseManager
+from scheduling.suggestions import suggest_alternatives
+from scheduling.recurrence import RecurrenceRule
+from scheduling.occurrences import SCHEDULE_ON_DATE
+from utils.time_utils import date_to_ordinal, weekday_index
+from reports.export import export_table
+from gui.workers import ExportThread
 from datetime import datetime, timedelta
-from config import TIME_SLOTS
+from config import TIME_SLOTS, RECURRENCE_MAX_OCCURRENCES
 
 class UserDashboard(QMainWindow):
     def __init__(self, user):
@@ -281,6 +288,21 @@ class UserDashboard(QMainWindow):
         
         layout.addWidget(self.bookings_table)
         
+        # Waitlist
+        waitlist_title = QLabel("My Waitlist")
+        waitlist_title.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        layout.addWidget(waitlist_title)
+        
+        self.waitlist_table = QTableWidget()
+        self.waitlist_table.setColumnCount(7)
+        self.waitlist_table.setHorizontalHeaderLabels(["Room", "Course", "Date", "Start", "End", "Position", "Leave"])
+        self.waitlist_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.waitlist_table.setAlternatingRowColors(True)
+        self.waitlist_table.setMaximumHeight(200)
+        self.refresh_waitlist_table()
+        
+        layout.addWidget(self.waitlist_table)
+        
         return widget
     
     def create_available_rooms_tab(self):
@@ -319,6 +341,7 @@ class UserDashboard(QMainWindow):
         filter_layout.addWidget(QLabel("To:"))
         self.search_end_time = QComboBox()
         self.search_end_time.addItems(TIME_SLOTS)
+        self.search_end_time.setCurrentIndex(1)
         filter_layout.addWidget(self.search_end_time)
         
         # Search button
@@ -883,37 +906,37 @@ class UserDashboard(QMainWindow):
         
         selected_day = self.day_selector.currentText()
         
-        # Get all schedules for Fall 2025, Semester 5
+        # Classes meeting on the next such day, as the semester calendar dates them
+        weekday = weekday_index(selected_day)
+        today = datetime.now().date()
+        class_date = today + timedelta(days=(weekday - today.weekday()) % 7)
         db = DatabaseManager()
-        query = '''
+        query = f'''
             SELECT s.*, u.fullname as teacher_name, c.room_number, c.building
             FROM schedules s
             LEFT JOIN users u ON s.teacher_id = u.id
             LEFT JOIN classrooms c ON s.classroom_id = c.id
-            WHERE s.day_of_week = ? AND s.semester = 'Fall 2025'
-            ORDER BY s.start_time
+            WHERE s.weekday = ? AND s.status = 1
+            AND {SCHEDULE_ON_DATE.format(alias='s')}
+            ORDER BY s.start_min
         '''
-        results = db.execute_query(query, (selected_day,))
+        results = db.execute_query(query, (weekday, date_to_ordinal(class_date)))
         
         if results:
             self.schedule_table.setRowCount(len(results))
             
             for row, schedule_data in enumerate(results):
-                start_time = schedule_data[5]  # start_time
-                end_time = schedule_data[6]    # end_time
-                course_name = schedule_data[3] # course_name
-                teacher_name = schedule_data[10] # teacher_name
-                room_number = schedule_data[11]  # room_number
-                building = schedule_data[12] if schedule_data[12] else "Main"
+                start_time = schedule_data['start_time']
+                end_time = schedule_data['end_time']
+                course_name = schedule_data['course_name']
+                teacher_name = schedule_data['teacher_name']
+                room_number = schedule_data['room_number']
+                building = schedule_data['building'] if schedule_data['building'] else "Main"
                 
                 # Calculate duration
-                from datetime import datetime
-                try:
-                    start = datetime.strptime(start_time, "%H:%M")
-                    end = datetime.strptime(end_time, "%H:%M")
-                    duration_mins = int((end - start).total_seconds() / 60)
-                    duration = f"{duration_mins} mins"
-                except:
+                if schedule_data['start_min'] is not None and schedule_data['end_min'] is not None:
+                    duration = f"{schedule_data['end_min'] - schedule_data['start_min']} mins"
+                else:
                     duration = "N/A"
                 
                 # Set table items
@@ -925,7 +948,7 @@ class UserDashboard(QMainWindow):
                 self.schedule_table.setItem(row, 5, QTableWidgetItem(duration))
                 
                 # Color code by time of day
-                time_hour = int(start_time.split(':')[0])
+                time_hour = (schedule_data['start_min'] or 0) // 60
                 if time_hour < 12:
                     color = QColor(240, 253, 244)  # Light green for morning
                 elif time_hour < 15:
@@ -939,7 +962,7 @@ class UserDashboard(QMainWindow):
                         item.setBackground(color)
         else:
             self.schedule_table.setRowCount(1)
-            no_class = QTableWidgetItem("No classes scheduled for this day")
+            no_class = QTableWidgetItem(f"No classes scheduled for {class_date:%A, %B %d}")
             no_class.setForeground(QColor(128, 128, 128))
             self.schedule_table.setItem(0, 0, no_class)
             self.schedule_table.setSpan(0, 0, 1, 6)
@@ -1040,13 +1063,55 @@ class UserDashboard(QMainWindow):
             else:
                 self.bookings_table.setCellWidget(row, 9, QWidget())
     
+    def refresh_waitlist_table(self):
+        """Refresh waitlist table"""
+        entries = Waitlist.get_user_entries(self.current_user.id)
+        self.waitlist_table.setRowCount(len(entries))
+        
+        for row, entry in enumerate(entries):
+            classroom = Classroom.get_classroom_by_id(entry.classroom_id)
+            cells = [
+                QTableWidgetItem(classroom.room_number if classroom else "Unknown"),
+                QTableWidgetItem(entry.course_name),
+                QTableWidgetItem(str(entry.booking_date)),
+                QTableWidgetItem(entry.start_time),
+                QTableWidgetItem(entry.end_time),
+                QTableWidgetItem(str(entry.position())),
+            ]
+            for col, item in enumerate(cells):
+                item.setForeground(QColor("#E2E8F0"))
+                item.setFont(QFont("Segoe UI", 10))
+                self.waitlist_table.setItem(row, col, item)
+            
+            leave_btn = QPushButton("Leave")
+            leave_btn.setMinimumHeight(34)
+            leave_btn.setMaximumWidth(100)
+            leave_btn.setFont(QFont("Segoe UI", 10, QFont.Bold))
+            leave_btn.clicked.connect(lambda checked, e=entry: self.leave_waitlist(e))
+            self.waitlist_table.setCellWidget(row, 6, leave_btn)
+    
+    def leave_waitlist(self, entry):
+        """Withdraw a waitlist entry"""
+        reply = QMessageBox.question(self, "Leave Waitlist",
+                                     "Are you sure you want to leave this waitlist?",
+                                     QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            entry.withdraw()
+            self.refresh_waitlist_table()
+    
     def search_available_rooms(self):
-        """Search available rooms"""
+        """Search rooms free for the selected date and time"""
         room_type = self.room_type_combo.currentText()
-        if room_type == "All":
-            classrooms = Classroom.get_all_classrooms()
-        else:
-            classrooms = Classroom.get_all_classrooms(room_type=room_type)
+        booking_date = self.search_date.date().toString("yyyy-MM-dd")
+        start_time = self.search_start_time.currentText()
+        end_time = self.search_end_time.currentText()
+        
+        if end_time <= start_time:
+            QMessageBox.warning(self, "Invalid Time", "End time must be after start time")
+            return
+        
+        classrooms = Classroom.get_available_classrooms(
+            None if room_type == "All" else room_type, booking_date, start_time, end_time)
         
         self.available_rooms_table.setRowCount(len(classrooms))
         
@@ -1096,6 +1161,7 @@ class UserDashboard(QMainWindow):
         dialog = BookingDialog(self, classroom, self.current_user)
         if dialog.exec_():
             self.refresh_bookings_table()
+            self.refresh_waitlist_table()
             self.refresh_recent_bookings()
     
     def cancel_booking(self, booking):
@@ -1106,8 +1172,12 @@ class UserDashboard(QMainWindow):
         if reply == QMessageBox.Yes:
             reason, ok = self.get_reason_dialog("Cancellation Reason")
             if ok and reason:
-                booking.cancel(self.current_user.id, reason)
-                QMessageBox.information(self, "Success", "Booking cancelled!")
+                changed, skipped = Booking.transition_many([booking.id], 0, self.current_user.id, reason)
+                if changed:
+                    QMessageBox.information(self, "Success", "Booking cancelled!")
+                else:
+                    QMessageBox.warning(self, "Not Cancelled",
+                                        f"Booking could not be cancelled: {skipped.get(booking.id)}")
                 self.refresh_bookings_table()
                 self.refresh_recent_bookings()
     
@@ -1373,6 +1443,7 @@ class UserDashboard(QMainWindow):
     def refresh_data(self):
         """Refresh all data"""
         self.refresh_bookings_table()
+        self.refresh_waitlist_table()
         self.refresh_recent_bookings()
         if self.current_user.role == 2:
             self.refresh_schedules_table()
@@ -1380,18 +1451,17 @@ class UserDashboard(QMainWindow):
         QMessageBox.information(self, "Success", "Data refreshed!")
     
     def export_bookings(self):
-        """Export bookings to CSV file"""
+        """Export bookings to CSV file, streamed off the UI thread"""
         try:
-            import csv
             import os
-            from datetime import datetime
-            
-            # Get all bookings for current user
-            bookings = Booking.get_user_bookings(self.current_user.id)
             
-            if not bookings:
+            db = DatabaseManager()
+            if not db.execute_query('SELECT 1 FROM bookings WHERE user_id = ? LIMIT 1', (self.current_user.id,)):
                 QMessageBox.warning(self, "Export", "No bookings to export!")
                 return
+            if getattr(self, 'export_thread', None) and self.export_thread.isRunning():
+                QMessageBox.information(self, "Export", "An export is already running.")
+                return
             
             # Create reports directory if it doesn't exist
             base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -1400,31 +1470,22 @@ class UserDashboard(QMainWindow):
             
             # Generate filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"my_bookings_{timestamp}.csv"
-            filepath = os.path.join(reports_dir, filename)
+            filepath = os.path.join(reports_dir, f"my_bookings_{timestamp}.csv")
             
-            # Write to CSV
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(['ID', 'Room', 'Course', 'Date', 'Start Time', 'End Time', 'Status'])
-                
-                status_map = {0: "Cancelled", 1: "Approved", 2: "Pending", 3: "Rejected"}
-                for booking in bookings:
-                    classroom = Classroom.get_classroom_by_id(booking.classroom_id)
-                    room = classroom.room_number if classroom else "Unknown"
-                    status = status_map.get(booking.status, "Unknown")
-                    
-                    writer.writerow([
-                        booking.id,
-                        room,
-                        booking.course_name,
-                        booking.booking_date,
-                        booking.start_time,
-                        booking.end_time,
-                        status
-                    ])
+            def export(progress, cancelled):
+                export_table('bookings', filepath, db.db_path, progress=progress, cancelled=cancelled,
+                             user_id=self.current_user.id)
+                return [filepath]
             
-            QMessageBox.information(self, "Export", f"Bookings exported successfully!\n\nFile saved to:\n{filepath}")
+            def on_finished(files, error, cancelled):
+                if error:
+                    QMessageBox.critical(self, "Error", f"Failed to export bookings:\n{error}")
+                elif not cancelled:
+                    QMessageBox.information(self, "Export", f"Bookings exported successfully!\n\nFile saved to:\n{filepath}")
+            
+            self.export_thread = ExportThread(export, self)
+            self.export_thread.completed.connect(on_finished)
+            self.export_thread.start()
         except Exception as e:
             print(f"Export error: {e}")
             import traceback
@@ -1575,6 +1636,37 @@ class BookingDialog(QDialog):
         time_layout.addWidget(self.end_time)
         layout.addLayout(time_layout)
         
+        # Repeat
+        repeat_layout = QHBoxLayout()
+        repeat_layout.addWidget(QLabel("Repeat:"))
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.addItem("Does not repeat", None)
+        self.repeat_combo.addItem("Weekly", 'weekly')
+        self.repeat_combo.addItem("Every 2 weeks", 'biweekly')
+        self.repeat_combo.currentIndexChanged.connect(self.update_repeat_inputs)
+        repeat_layout.addWidget(self.repeat_combo)
+        
+        self.repeat_end_combo = QComboBox()
+        self.repeat_end_combo.addItems(["Until", "Times"])
+        self.repeat_end_combo.currentIndexChanged.connect(self.update_repeat_inputs)
+        repeat_layout.addWidget(self.repeat_end_combo)
+        
+        self.repeat_until = QDateEdit()
+        self.repeat_until.setDate(QDate.currentDate().addMonths(3))
+        self.repeat_until.setCalendarPopup(True)
+        repeat_layout.addWidget(self.repeat_until)
+        
+        self.repeat_count = QSpinBox()
+        self.repeat_count.setRange(1, RECURRENCE_MAX_OCCURRENCES)
+        self.repeat_count.setValue(10)
+        repeat_layout.addWidget(self.repeat_count)
+        layout.addLayout(repeat_layout)
+        
+        self.skip_dates_input = QLineEdit()
+        self.skip_dates_input.setPlaceholderText("Skip dates (YYYY-MM-DD, comma separated)")
+        layout.addWidget(self.skip_dates_input)
+        self.update_repeat_inputs()
+        
         # Description
         layout.addWidget(QLabel("Description:"))
         self.desc_input = QTextEdit()
@@ -1595,6 +1687,15 @@ class BookingDialog(QDialog):
         
         layout.addLayout(button_layout)
     
+    def update_repeat_inputs(self):
+        """Enable the repeat end inputs that apply"""
+        repeating = self.repeat_combo.currentData() is not None
+        by_count = self.repeat_end_combo.currentText() == "Times"
+        self.repeat_end_combo.setEnabled(repeating)
+        self.repeat_until.setEnabled(repeating and not by_count)
+        self.repeat_count.setEnabled(repeating and by_count)
+        self.skip_dates_input.setEnabled(repeating)
+    
     def handle_booking(self):
         """Handle room booking"""
         course = self.course_input.text().strip()
@@ -1608,11 +1709,6 @@ class BookingDialog(QDialog):
         start_time = self.start_time.currentText()
         end_time = self.end_time.currentText()
         
-        # Check conflict
-        if Booking.check_conflict(self.classroom.id, booking_date, start_time, end_time):
-            QMessageBox.warning(self, "Conflict", "This time slot is already booked!")
-            return
-        
         # Create booking
         booking = Booking(
             user_id=self.user.id,
@@ -1625,7 +1721,35 @@ class BookingDialog(QDialog):
             status=2  # Pending
         )
         
-        if booking.create(created_by=self.user.id):
+        if self.repeat_combo.currentData() is not None:
+            self.handle_recurring_booking(booking)
+            return
+        
+        # Check conflict and insert in one transaction
+        success, conflicts = booking.reserve(created_by=self.user.id)
+        if conflicts:
+            details = "\n".join(f"• {c.describe()}" for c in conflicts)
+            suggestions = suggest_alternatives(self.classroom.id, booking_date, start_time, end_time)
+            alternatives = [s.describe() for s in suggestions.times + suggestions.rooms]
+            if alternatives:
+                details += "\n\nFree alternatives:\n" + "\n".join(f"• {a}" for a in alternatives)
+            reply = QMessageBox.question(
+                self, "Conflict",
+                f"This time slot is already taken!\n\n{details}\n\n"
+                f"Join the waitlist? You will get the room automatically if it is freed.",
+                QMessageBox.Yes | QMessageBox.No)
+            if reply == QMessageBox.Yes:
+                self.join_waitlist(booking)
+            return
+        
+        if success and booking.status == 1:
+            QMessageBox.information(self, "Success", "Booking approved automatically!")
+            self.accept()
+        elif success and booking.status == 3:
+            QMessageBox.warning(self, "Rejected",
+                                f"Booking request was rejected: {booking.reason or 'not allowed by booking rules'}")
+            self.accept()
+        elif success:
             # Send admin notification email
             try:
                 classroom = Classroom.get_classroom_by_id(self.classroom.id)
@@ -1637,3 +1761,65 @@ class BookingDialog(QDialog):
             self.accept()
         else:
             QMessageBox.critical(self, "Error", "Failed to create booking. Please try again.")
+    
+    def join_waitlist(self, booking):
+        """Queue for the requested room and time"""
+        entry = Waitlist(booking.user_id, booking.classroom_id, booking.course_name, booking.booking_date,
+                         booking.start_time, booking.end_time, booking.description)
+        joined, reason = entry.join()
+        if joined:
+            QMessageBox.information(self, "Waitlist",
+                                    f"You are number {entry.position()} on the waitlist for this room.")
+            self.accept()
+        else:
+            QMessageBox.warning(self, "Waitlist", reason)
+    
+    def handle_recurring_booking(self, booking):
+        """Book every occurrence of a repeating request in one transaction"""
+        skip_dates = [d.strip() for d in self.skip_dates_input.text().split(',') if d.strip()]
+        try:
+            if self.repeat_end_combo.currentText() == "Times":
+                rule = RecurrenceRule(self.repeat_combo.currentData(), count=self.repeat_count.value(),
+                                      skip_dates=skip_dates)
+            else:
+                rule = RecurrenceRule(self.repeat_combo.currentData(),
+                                      until=self.repeat_until.date().toString("yyyy-MM-dd"),
+                                      skip_dates=skip_dates)
+            dates = rule.occurrences(booking.booking_date)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", f"Invalid repeat settings: {e}")
+            return
+        
+        created, conflicts = booking.reserve_recurring(rule, created_by=self.user.id)
+        if conflicts:
+            details = "\n".join(f"• {day}: {', '.join(c.describe() for c in found)}"
+                                 for day, found in conflicts.items())
+            if len(conflicts) == len(dates):
+                QMessageBox.warning(self, "Conflict", f"Every date in the series is taken!\n\n{details}")
+                return
+            reply = QMessageBox.question(
+                self, "Conflict",
+                f"{len(conflicts)} of {len(dates)} dates are already taken:\n\n{details}\n\n"
+                f"Book the remaining {len(dates) - len(conflicts)} dates?",
+                QMessageBox.Yes | QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+            created, conflicts = booking.reserve_recurring(rule, created_by=self.user.id, skip_conflicts=True)
+        
+        if created:
+            pending = [b for b in created if b.status == 2]
+            if pending:
+                try:
+                    classroom = Classroom.get_classroom_by_id(self.classroom.id)
+                    EmailNotificationService.send_admin_notification_new_booking(pending[0], self.user, classroom)
+                except Exception as e:
+                    print(f"Failed to send admin notification: {e}")
+            
+            approved = sum(1 for b in created if b.status == 1)
+            rejected = len(created) - approved - len(pending)
+            QMessageBox.information(self, "Success",
+                                    f"{len(created)} booking requests submitted: {approved} approved, "
+                                    f"{len(pending)} waiting for approval, {rejected} rejected.")
+            self.accept()
+        else:
+            QMessageBox.critical(self, "Error", "Failed to create bookings. Please try again.")
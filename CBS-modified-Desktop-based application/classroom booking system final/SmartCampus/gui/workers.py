@@ -0,0 +1,80 @@
+"""
+Background Workers Module
+
+QThreads for long-running jobs started from the dashboards. Results and
+progress come back as signals, which Qt delivers on the GUI thread.
+"""
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from reports.export import ExportCancelled
+
+
+class ReportJobThread(QThread):
+    """Runs a reports.jobs.ReportJobRunner off the GUI thread"""
+    
+    progress = pyqtSignal(int, int, dict)      # done, total, manifest entry
+    completed = pyqtSignal(dict, str)          # manifest, error message ('' on success)
+    
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self._cancelled = False
+    
+    def cancel(self):
+        self._cancelled = True
+    
+    def run(self):
+        try:
+            manifest = self.runner.run(progress=self.progress.emit, cancelled=lambda: self._cancelled)
+            self.completed.emit(manifest, '')
+        except Exception as e:
+            print(f"Report pack error: {e}")
+            self.completed.emit({}, str(e))
+
+
+class ScheduledReportThread(QThread):
+    """Runs the due schedules of a reports.scheduler.ReportScheduler off the GUI thread"""
+    
+    completed = pyqtSignal(list, str)          # report_runs entries, error message ('' on success)
+    
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+    
+    def run(self):
+        try:
+            self.completed.emit(self.scheduler.run_due(), '')
+        except Exception as e:
+            print(f"Scheduled report error: {e}")
+            self.completed.emit([], str(e))
+
+
+class ExportThread(QThread):
+    """
+    Runs a streaming export off the GUI thread.
+    
+    ``export`` is called as export(progress=..., cancelled=...) and returns
+    the list of paths it wrote, e.g. a functools.partial of
+    reports.export.export_tables.
+    """
+    
+    progress = pyqtSignal(int, int)            # rows written, total rows
+    completed = pyqtSignal(list, str, bool)    # paths, error message ('' on success), cancelled
+    
+    def __init__(self, export, parent=None):
+        super().__init__(parent)
+        self.export = export
+        self._cancelled = False
+    
+    def cancel(self):
+        self._cancelled = True
+    
+    def run(self):
+        try:
+            paths = self.export(progress=self.progress.emit, cancelled=lambda: self._cancelled)
+            self.completed.emit(list(paths), '', False)
+        except ExportCancelled:
+            self.completed.emit([], '', True)
+        except Exception as e:
+            print(f"Export error: {e}")
+            self.completed.emit([], str(e), False)
@@ -7,6 +7,8 @@ from database.db_setup import DatabaseManager
 from models.user import User
 from models.classroom import Classroom
 from models.schedule import Schedule
+from models.semester import Semester
+from utils.time_utils import normalize_time
 import sys
 import io
 
@@ -96,6 +98,16 @@ def get_classroom_id(room_number):
     result = db.execute_query('SELECT id FROM classrooms WHERE room_number = ?', (room_number,))
     return result[0][0] if result else None
 
+def import_semester():
+    """Add Fall 2025 to the semester calendar so its classes get dated"""
+    if Semester.get_semester_by_name('Fall 2025'):
+        return
+    semester = Semester(name='Fall 2025', start_date='2025-09-08', end_date='2026-01-16')
+    if semester.create():
+        print(f"✓ Added semester: {semester.name} ({semester.start_date} - {semester.end_date})")
+    else:
+        print(f"✗ Error adding semester {semester.name}")
+
 def import_schedules():
     """Import all schedule data from the timetables"""
     schedules_data = [
@@ -168,8 +180,9 @@ def import_schedules():
                         classroom_id=classroom_id,
                         course_name=schedule['course'],
                         day_of_week=schedule['day'],
-                        start_time=schedule['start'],
-                        end_time=schedule['end'],
+                        # The timetable is on a 12-hour clock without AM/PM
+                        start_time=normalize_time(schedule['start'], legacy=True),
+                        end_time=normalize_time(schedule['end'], legacy=True),
                         semester='Fall 2025'
                     )
                     if new_schedule.create():
@@ -192,13 +205,16 @@ def main():
     print("FJWU Schedule Data Import - Semester Fall 2025")
     print("=" * 60)
     
-    print("\n[1/3] Importing classrooms...")
+    print("\n[1/4] Importing classrooms...")
     import_classrooms()
     
-    print("\n[2/3] Importing teachers...")
+    print("\n[2/4] Importing teachers...")
     import_teachers()
     
-    print("\n[3/3] Importing schedules...")
+    print("\n[3/4] Importing semester...")
+    import_semester()
+    
+    print("\n[4/4] Importing schedules...")
     import_schedules()
     
     print("\n" + "=" * 60)
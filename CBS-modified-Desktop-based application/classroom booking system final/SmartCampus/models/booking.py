@@ -4,6 +4,12 @@ Booking Model Module
 
 from datetime import datetime
 from database.db_setup import DatabaseManager
+from config import BOOKING_STATUS
+from utils.time_utils import parse_time, format_minutes, date_to_ordinal
+from scheduling.interval_index import interval_index
+from scheduling.conflicts import ConflictEngine
+from scheduling.approval import approval_rules
+from models.waitlist import Waitlist
 
 class Booking:
     def __init__(self, user_id=None, classroom_id=None, course_name=None,
@@ -20,28 +26,174 @@ class Booking:
         self.status = status  # 0=Cancelled, 1=Approved, 2=Pending, 3=Rejected
         self.created_by = None
         self.cancelled_by = None
+        self.reason = None
         self.created_at = None
         self.db = DatabaseManager()
     
+    def time_columns(self):
+        """Canonicalise times and return ``(date_ord, start_min, end_min)``"""
+        start_min, end_min = parse_time(self.start_time), parse_time(self.end_time)
+        self.start_time, self.end_time = format_minutes(start_min), format_minutes(end_min)
+        return date_to_ordinal(self.booking_date), start_min, end_min
+    
     def create(self, created_by=None):
         """Create a new booking"""
         try:
+            date_ord, start_min, end_min = self.time_columns()
             query = '''
                 INSERT INTO bookings 
                 (user_id, classroom_id, course_name, booking_date, 
-                 start_time, end_time, description, status, created_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 start_time, end_time, description, status, created_by,
+                 date_ord, start_min, end_min)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             '''
             self.id = self.db.execute_update(query, (
                 self.user_id, self.classroom_id, self.course_name,
                 self.booking_date, self.start_time, self.end_time,
-                self.description, self.status, created_by
+                self.description, self.status, created_by,
+                date_ord, start_min, end_min
             ))
+            if self.id is not None and self.status in (1, 2):
+                interval_index.add_booking(self.id, self.classroom_id, date_ord, start_min, end_min,
+                                           self.course_name, self.user_id)
             return self.id is not None
         except Exception as e:
             print(f"Create booking error: {e}")
             return False
     
+    def reserve(self, created_by=None):
+        """
+        Atomically check for conflicts and create the booking.
+        
+        The conflict check (against bookings and weekly schedules) and the
+        insert run in one BEGIN IMMEDIATE transaction, so two clients
+        cannot both pass the check for the same slot. A pending request is
+        then decided by the auto-approval rules; ``status`` and ``reason``
+        show the outcome.
+        
+        Returns:
+            tuple: (success, list of scheduling.conflicts.Conflict)
+        """
+        try:
+            date_ord, start_min, end_min = self.time_columns()
+            with self.db.transaction() as conn:
+                conflicts = ConflictEngine.booking_conflicts(
+                    self.classroom_id, date_ord, start_min, end_min, conn=conn)
+                if conflicts:
+                    return False, conflicts
+                
+                cursor = conn.execute('''
+                    INSERT INTO bookings 
+                    (user_id, classroom_id, course_name, booking_date, 
+                     start_time, end_time, description, status, created_by,
+                     date_ord, start_min, end_min)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    self.user_id, self.classroom_id, self.course_name,
+                    self.booking_date, self.start_time, self.end_time,
+                    self.description, self.status, created_by,
+                    date_ord, start_min, end_min
+                ))
+                self.id = cursor.lastrowid
+                self.created_by = created_by
+                if self.status == 2:
+                    decision = approval_rules.decide(conn, self.user_id, self.classroom_id,
+                                                     date_ord, start_min, end_min)
+                    approval_rules.apply(conn, self.id, self.user_id, decision)
+                    self.status, self.reason = decision.status, decision.reason
+            if self.status in (1, 2):
+                interval_index.add_booking(self.id, self.classroom_id, date_ord, start_min, end_min,
+                                           self.course_name, self.user_id)
+            return True, []
+        except Exception as e:
+            print(f"Reserve booking error: {e}")
+            return False, []
+    
+    def reserve_recurring(self, rule, created_by=None, skip_conflicts=False):
+        """
+        Atomically book every occurrence of a recurring request.
+        
+        ``self`` describes the first occurrence; ``rule`` is a
+        scheduling.recurrence.RecurrenceRule. Once the transaction holds
+        the write lock, all dates are conflict checked against the interval
+        index in one batch and inserted together with
+        a ``booking_series`` row. If any date conflicts nothing is booked,
+        unless ``skip_conflicts`` is set, in which case only the free dates
+        are booked. Pending occurrences are decided by the auto-approval
+        rules one by one.
+        
+        Returns:
+            tuple: (list of created Bookings, dict of 'YYYY-MM-DD' -> list of Conflict)
+        """
+        try:
+            dates = rule.occurrences(self.booking_date)
+            _, start_min, end_min = self.time_columns()
+            with self.db.transaction() as conn:
+                found = ConflictEngine.booking_conflicts_many(
+                    [(self.classroom_id, d, start_min, end_min) for d in dates], conn=conn)
+                conflicts = {d: hits for d, hits in sorted(zip(dates, found)) if hits}
+                free_dates = [d for d in dates if d not in conflicts]
+                if (conflicts and not skip_conflicts) or not free_dates:
+                    return [], conflicts
+                
+                series_id = conn.execute('''
+                    INSERT INTO booking_series (user_id, classroom_id, rule, created_by)
+                    VALUES (?, ?, ?, ?)
+                ''', (self.user_id, self.classroom_id, rule.describe(), created_by)).lastrowid
+                
+                created = []
+                for booking_date in free_dates:
+                    booking = Booking(self.user_id, self.classroom_id, self.course_name, booking_date,
+                                      self.start_time, self.end_time, self.description, self.status)
+                    booking.id = conn.execute('''
+                        INSERT INTO bookings 
+                        (user_id, classroom_id, course_name, booking_date, 
+                         start_time, end_time, description, status, created_by,
+                         date_ord, start_min, end_min, series_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        self.user_id, self.classroom_id, self.course_name,
+                        booking_date, self.start_time, self.end_time,
+                        self.description, self.status, created_by,
+                        date_to_ordinal(booking_date), start_min, end_min, series_id
+                    )).lastrowid
+                    booking.created_by = created_by
+                    if self.status == 2:
+                        decision = approval_rules.decide(conn, self.user_id, self.classroom_id,
+                                                         booking_date, start_min, end_min)
+                        approval_rules.apply(conn, booking.id, self.user_id, decision)
+                        booking.status, booking.reason = decision.status, decision.reason
+                    created.append(booking)
+            
+            for booking in created:
+                if booking.status in (1, 2):
+                    interval_index.add_booking(booking.id, self.classroom_id, date_to_ordinal(booking.booking_date),
+                                               start_min, end_min, self.course_name, self.user_id)
+            return created, conflicts
+        except Exception as e:
+            print(f"Reserve recurring booking error: {e}")
+            return [], {}
+    
+    @staticmethod
+    def from_row(row):
+        """Build a Booking from a full ``bookings`` row"""
+        booking = Booking(
+            user_id=row[1],
+            classroom_id=row[2],
+            course_name=row[3],
+            booking_date=row[4],
+            start_time=row[5],
+            end_time=row[6],
+            description=row[8],
+            status=row[7]
+        )
+        booking.id = row[0]
+        booking.created_by = row[9]
+        booking.cancelled_by = row[10]
+        booking.reason = row[11]
+        booking.created_at = row[12]
+        return booking
+    
     @staticmethod
     def get_booking_by_id(booking_id):
         """Get booking by ID"""
@@ -65,6 +217,7 @@ class Booking:
                 booking.id = row[0]
                 booking.created_by = row[9]
                 booking.cancelled_by = row[10]
+                booking.reason = row[11]
                 booking.created_at = row[12]
                 return booking
             return None
@@ -81,14 +234,14 @@ class Booking:
                 query = '''
                     SELECT * FROM bookings 
                     WHERE user_id = ? AND status = ?
-                    ORDER BY booking_date DESC, start_time DESC
+                    ORDER BY date_ord DESC, start_min DESC
                 '''
                 results = db.execute_query(query, (user_id, status))
             else:
                 query = '''
                     SELECT * FROM bookings 
                     WHERE user_id = ?
-                    ORDER BY booking_date DESC, start_time DESC
+                    ORDER BY date_ord DESC, start_min DESC
                 '''
                 results = db.execute_query(query, (user_id,))
             
@@ -123,11 +276,11 @@ class Booking:
                 query = '''
                     SELECT * FROM bookings 
                     WHERE status = ?
-                    ORDER BY booking_date DESC
+                    ORDER BY date_ord DESC
                 '''
                 results = db.execute_query(query, (status,))
             else:
-                query = 'SELECT * FROM bookings ORDER BY booking_date DESC'
+                query = 'SELECT * FROM bookings ORDER BY date_ord DESC'
                 results = db.execute_query(query)
             
             bookings = []
@@ -186,84 +339,122 @@ class Booking:
             print(f"Get recent bookings error: {e}")
             return []
     
-    def approve(self, approved_by):
-        """Approve a booking"""
+    # New status -> statuses a booking may move from
+    TRANSITIONS = {
+        1: (2,),     # approve a pending request
+        3: (2,),     # reject a pending request
+        0: (1, 2),   # cancel an active booking
+    }
+    
+    @staticmethod
+    def transition_many(booking_ids, new_status, acted_by, reason=None):
+        """
+        Approve, reject or cancel many bookings in one transaction.
+        
+        Each booking is checked against ``TRANSITIONS``; approvals are
+        also checked against approved bookings (including ones approved
+        earlier in the same call) and classes. Bookings that fail a check
+        are skipped and reported, the rest are applied together. Time freed
+        by rejections and cancellations is offered to the waitlist in the
+        same transaction.
+        
+        Returns:
+            tuple: (list of changed Bookings, dict of booking id -> reason skipped)
+        """
+        allowed = Booking.TRANSITIONS.get(new_status)
+        if allowed is None:
+            raise ValueError(f"Unsupported booking status: {new_status}")
+        booking_ids = sorted(set(booking_ids))
+        if not booking_ids:
+            return [], {}
+        
         try:
-            query = 'UPDATE bookings SET status = 1, updated_at = ? WHERE id = ?'
-            self.db.execute_update(query, (datetime.now(), self.id))
-            self.status = 1
-            return True
+            now = datetime.now()
+            changed, skipped, freed = [], {}, set()
+            with DatabaseManager().transaction() as conn:
+                marks = ', '.join('?' for _ in booking_ids)
+                rows = conn.execute(f'''
+                    SELECT * FROM bookings WHERE id IN ({marks})
+                    ORDER BY date_ord, start_min, id
+                ''', booking_ids).fetchall()
+                for booking_id in set(booking_ids) - {row[0] for row in rows}:
+                    skipped[booking_id] = "not found"
+                
+                for row in rows:
+                    booking = Booking.from_row(row)
+                    date_ord, start_min, end_min = row['date_ord'], row['start_min'], row['end_min']
+                    if booking.status not in allowed:
+                        skipped[booking.id] = f"is {BOOKING_STATUS.get(booking.status, 'unknown').lower()}"
+                        continue
+                    
+                    if new_status == 1:
+                        clash = ConflictEngine.approved_conflicts(
+                            booking.classroom_id, date_ord, start_min, end_min,
+                            exclude_booking_id=booking.id, conn=conn)
+                        if clash:
+                            skipped[booking.id] = f"clashes with {clash[0].describe()}"
+                            continue
+                        conn.execute('UPDATE bookings SET status = 1, updated_at = ? WHERE id = ?',
+                                     (now, booking.id))
+                    elif new_status == 3:
+                        conn.execute('''
+                            UPDATE bookings SET status = 3, reason = ?, updated_at = ?
+                            WHERE id = ?
+                        ''', (reason, now, booking.id))
+                    else:
+                        conn.execute('''
+                            UPDATE bookings SET status = 0, cancelled_by = ?, reason = ?, updated_at = ?
+                            WHERE id = ?
+                        ''', (acted_by, reason, now, booking.id))
+                        booking.cancelled_by = acted_by
+                    
+                    booking.status = new_status
+                    if new_status != 1:
+                        booking.reason = reason
+                        freed.add((booking.classroom_id, date_ord))
+                    changed.append(booking)
+                
+                promoted = []
+                for classroom_id, date_ord in sorted(freed):
+                    promoted.extend(Waitlist.promote(classroom_id, date_ord, conn))
+            
+            if new_status != 1:
+                for booking in changed:
+                    interval_index.remove_booking(booking.id)
+            Waitlist.notify_promoted(promoted)
+            return changed, skipped
         except Exception as e:
-            print(f"Approve booking error: {e}")
+            print(f"Bulk booking update error: {e}")
+            return [], {booking_id: str(e) for booking_id in booking_ids}
+    
+    def _transition(self, new_status, acted_by, reason=None):
+        changed, skipped = Booking.transition_many([self.id], new_status, acted_by, reason)
+        if not changed:
+            print(f"Booking {self.id} not updated: {skipped.get(self.id)}")
             return False
+        self.status = new_status
+        if new_status != 1:
+            self.reason = reason
+        return True
+    
+    def approve(self, approved_by):
+        """Approve a pending booking"""
+        return self._transition(1, approved_by)
     
     def reject(self, rejected_by, reason):
-        """Reject a booking"""
-        try:
-            query = '''
-                UPDATE bookings 
-                SET status = 3, reason = ?, updated_at = ?
-                WHERE id = ?
-            '''
-            self.db.execute_update(query, (reason, datetime.now(), self.id))
-            self.status = 3
-            return True
-        except Exception as e:
-            print(f"Reject booking error: {e}")
-            return False
+        """Reject a pending booking and promote waitlisted requests for the freed slot"""
+        return self._transition(3, rejected_by, reason)
     
     def cancel(self, cancelled_by, reason):
-        """Cancel a booking"""
-        try:
-            query = '''
-                UPDATE bookings 
-                SET status = 0, cancelled_by = ?, reason = ?, updated_at = ?
-                WHERE id = ?
-            '''
-            self.db.execute_update(query, (cancelled_by, reason, datetime.now(), self.id))
-            self.status = 0
-            return True
-        except Exception as e:
-            print(f"Cancel booking error: {e}")
-            return False
+        """Cancel a booking and promote waitlisted requests for the freed slot"""
+        return self._transition(0, cancelled_by, reason)
     
     @staticmethod
     def check_conflict(classroom_id, booking_date, start_time, end_time, booking_id=None):
-        """Check for booking conflicts"""
+        """Check for conflicts with other bookings and weekly schedules"""
         try:
-            db = DatabaseManager()
-            if booking_id:
-                query = '''
-                    SELECT COUNT(*) as count FROM bookings
-                    WHERE classroom_id = ? AND booking_date = ?
-                    AND status IN (1, 2) AND id != ?
-                    AND (
-                        (start_time <= ? AND end_time > ?)
-                        OR (start_time < ? AND end_time >= ?)
-                        OR (start_time >= ? AND end_time <= ?)
-                    )
-                '''
-                results = db.execute_query(query, (
-                    classroom_id, booking_date, booking_id,
-                    start_time, start_time, end_time, end_time, start_time, end_time
-                ))
-            else:
-                query = '''
-                    SELECT COUNT(*) as count FROM bookings
-                    WHERE classroom_id = ? AND booking_date = ?
-                    AND status IN (1, 2)
-                    AND (
-                        (start_time <= ? AND end_time > ?)
-                        OR (start_time < ? AND end_time >= ?)
-                        OR (start_time >= ? AND end_time <= ?)
-                    )
-                '''
-                results = db.execute_query(query, (
-                    classroom_id, booking_date,
-                    start_time, start_time, end_time, end_time, start_time, end_time
-                ))
-            
-            return results[0][0] > 0 if results else False
+            return bool(ConflictEngine.booking_conflicts(
+                classroom_id, booking_date, start_time, end_time, exclude_booking_id=booking_id))
         except Exception as e:
             print(f"Check conflict error: {e}")
             return False
@@ -4,6 +4,9 @@ Classroom Model Module
 
 from datetime import datetime
 from database.db_setup import DatabaseManager
+from utils.time_utils import parse_time, date_to_ordinal, weekday_of_ordinal
+from scheduling.availability import availability
+from scheduling.occurrences import SCHEDULE_ON_DATE
 
 class Classroom:
     def __init__(self, room_number=None, room_type=None, capacity=None, 
@@ -30,11 +33,27 @@ class Classroom:
                 self.room_number, self.room_type, self.capacity,
                 self.building, self.floor, self.description, self.status
             ))
+            availability.rooms_changed()
             return self.id is not None
         except Exception as e:
             print(f"Create classroom error: {e}")
             return False
     
+    @staticmethod
+    def from_row(row):
+        """Build a Classroom from a full ``classrooms`` row"""
+        classroom = Classroom(
+            room_number=row[1],
+            room_type=row[2],
+            capacity=row[3],
+            building=row[4],
+            floor=row[5],
+            description=row[6],
+            status=row[7]
+        )
+        classroom.id = row[0]
+        return classroom
+    
     @staticmethod
     def get_classroom_by_id(classroom_id):
         """Get classroom by ID"""
@@ -113,6 +132,7 @@ class Classroom:
                 self.room_number, self.room_type, self.capacity,
                 self.building, self.floor, self.description, self.id
             ))
+            availability.rooms_changed()
             return True
         except Exception as e:
             print(f"Update classroom error: {e}")
@@ -124,6 +144,7 @@ class Classroom:
             query = 'UPDATE classrooms SET status = 0 WHERE id = ?'
             self.db.execute_update(query, (self.id,))
             self.status = 0
+            availability.rooms_changed()
             return True
         except Exception as e:
             print(f"Deactivate classroom error: {e}")
@@ -131,44 +152,44 @@ class Classroom:
     
     @staticmethod
     def get_available_classrooms(room_type, booking_date, start_time, end_time):
-        """Get available classrooms for a specific time slot"""
+        """
+        Get classrooms with no booking or class during a time slot.
+        
+        Pass ``room_type=None`` for all types. Current and future dates are
+        answered from the in-memory availability bitmaps; past dates fall
+        back to SQL.
+        """
         try:
+            if availability.covers(booking_date):
+                rooms = availability.free_rooms(booking_date, start_time, end_time, room_type)
+                return [Classroom.from_row(room.row) for room in rooms]
+            
             db = DatabaseManager()
-            query = '''
-                SELECT DISTINCT c.* FROM classrooms c
-                WHERE c.room_type = ? AND c.status = 1
+            date_ord = date_to_ordinal(booking_date)
+            start_min, end_min = parse_time(start_time), parse_time(end_time)
+            query = f'''
+                SELECT c.* FROM classrooms c
+                WHERE c.status = 1 AND (? IS NULL OR c.room_type = ?)
                 AND c.id NOT IN (
                     SELECT classroom_id FROM bookings
-                    WHERE booking_date = ? 
+                    WHERE date_ord = ? 
                     AND status IN (1, 2)
-                    AND (
-                        (start_time <= ? AND end_time > ?)
-                        OR (start_time < ? AND end_time >= ?)
-                        OR (start_time >= ? AND end_time <= ?)
-                    )
+                    AND start_min < ? AND end_min > ?
+                )
+                AND c.id NOT IN (
+                    SELECT s.classroom_id FROM schedules s
+                    WHERE s.weekday = ? AND s.status = 1
+                    AND s.start_min < ? AND s.end_min > ?
+                    AND {SCHEDULE_ON_DATE.format(alias='s')}
                 )
                 ORDER BY c.room_number
             '''
             results = db.execute_query(query, (
-                room_type, booking_date, start_time, start_time,
-                end_time, end_time, start_time, end_time
+                room_type, room_type,
+                date_ord, end_min, start_min,
+                weekday_of_ordinal(date_ord), end_min, start_min, date_ord
             ))
-            
-            classrooms = []
-            if results:
-                for row in results:
-                    classroom = Classroom(
-                        room_number=row[1],
-                        room_type=row[2],
-                        capacity=row[3],
-                        building=row[4],
-                        floor=row[5],
-                        description=row[6],
-                        status=row[7]
-                    )
-                    classroom.id = row[0]
-                    classrooms.append(classroom)
-            return classrooms
+            return [Classroom.from_row(row) for row in results] if results else []
         except Exception as e:
             print(f"Get available classrooms error: {e}")
             return []
@@ -0,0 +1,223 @@
+"""
+Query Builder Module
+
+Composable filters for bookings and schedules that compile to a single
+parameterized SQL statement, so filtering runs inside SQLite instead of
+over Python lists.
+
+Example:
+    upcoming = (BookingQuery()
+                .date_range(start='2026-01-12')
+                .statuses(1)
+                .order_by('booking_date', 'start_time')
+                .limit(4)
+                .all())
+"""
+
+from abc import ABC, abstractmethod
+
+from database.db_setup import DatabaseManager
+from utils.time_utils import date_to_ordinal, weekday_index
+
+
+class _QueryBuilder(ABC):
+    """Shared WHERE/ORDER BY/LIMIT handling for the concrete builders"""
+
+    TABLE = None
+    ALIAS = None
+    # Public ordering keys mapped to SQL expressions (whitelist)
+    ORDER_FIELDS = {}
+
+    def __init__(self):
+        self._where = []
+        self._params = []
+        self._join_classrooms = False
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    def where(self, clause, *params):
+        """Add a raw parameterized condition (use the table alias)"""
+        self._where.append(clause)
+        self._params.extend(params)
+        return self
+
+    def _in(self, column, values):
+        values = [v for v in values if v is not None]
+        if not values:
+            return self
+        if len(values) == 1:
+            return self.where(f"{column} = ?", values[0])
+        placeholders = ', '.join('?' for _ in values)
+        return self.where(f"{column} IN ({placeholders})", *values)
+
+    def rooms(self, *classroom_ids):
+        """Only rows for the given classroom ids"""
+        return self._in(f"{self.ALIAS}.classroom_id", classroom_ids)
+
+    def statuses(self, *statuses):
+        """Only rows with one of the given status codes"""
+        return self._in(f"{self.ALIAS}.status", statuses)
+
+    def buildings(self, *buildings):
+        """Only rows whose classroom is in one of the given buildings"""
+        self._join_classrooms = True
+        return self._in("c.building", buildings)
+
+    def room_types(self, *room_types):
+        """Only rows whose classroom has one of the given types"""
+        self._join_classrooms = True
+        return self._in("c.room_type", room_types)
+
+    def order_by(self, *fields):
+        """Order by whitelisted fields; prefix a field with '-' for DESC"""
+        for field in fields:
+            descending = field.startswith('-')
+            key = field.lstrip('-')
+            if key not in self.ORDER_FIELDS:
+                raise ValueError(f"Cannot order {self.TABLE} by '{key}'")
+            self._order.append(f"{self.ORDER_FIELDS[key]} {'DESC' if descending else 'ASC'}")
+        return self
+
+    def limit(self, limit, offset=None):
+        """Limit the number of rows returned"""
+        self._limit = int(limit)
+        self._offset = int(offset) if offset is not None else None
+        return self
+
+    def compile(self, columns=None, limit=None, ordered=True):
+        """
+        Return ``(sql, params)`` for this query.
+
+        ``limit`` overrides the builder's limit for this statement only,
+        and ``ordered=False`` leaves out ORDER BY and LIMIT; the builder
+        itself is not changed.
+        """
+        columns = columns or f"{self.ALIAS}.*"
+        sql = f"SELECT {columns} FROM {self.TABLE} {self.ALIAS}"
+        if self._join_classrooms:
+            sql += f" JOIN classrooms c ON c.id = {self.ALIAS}.classroom_id"
+        if self._where:
+            sql += " WHERE " + " AND ".join(f"({clause})" for clause in self._where)
+        params = list(self._params)
+        if not ordered:
+            return sql, tuple(params)
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        limit = self._limit if limit is None else limit
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+            if self._offset is not None:
+                sql += " OFFSET ?"
+                params.append(self._offset)
+        return sql, tuple(params)
+
+    @abstractmethod
+    def _from_row(self, row):
+        """Build the model object for one result row"""
+
+    def all(self, db=None, limit=None):
+        """Run the query and return model objects"""
+        try:
+            db = db or DatabaseManager()
+            sql, params = self.compile(limit=limit)
+            results = db.execute_query(sql, params)
+            return [self._from_row(row) for row in results] if results else []
+        except Exception as e:
+            print(f"{self.TABLE} query error: {e}")
+            return []
+
+    def first(self, db=None):
+        """Run the query and return the first object or None"""
+        results = self.all(db, limit=1)
+        return results[0] if results else None
+
+    def count(self, db=None):
+        """Count matching rows without loading them"""
+        try:
+            db = db or DatabaseManager()
+            sql, params = self.compile('COUNT(*)', ordered=False)
+            results = db.execute_query(sql, params)
+            return results[0][0] if results else 0
+        except Exception as e:
+            print(f"{self.TABLE} count error: {e}")
+            return 0
+
+
+class BookingQuery(_QueryBuilder):
+    """Query builder for the ``bookings`` table"""
+
+    TABLE = 'bookings'
+    ALIAS = 'b'
+    ORDER_FIELDS = {
+        'id': 'b.id',
+        'booking_date': 'b.date_ord',
+        'start_time': 'b.start_min',
+        'end_time': 'b.end_min',
+        'status': 'b.status',
+        'created_at': 'b.created_at',
+        'classroom_id': 'b.classroom_id',
+    }
+
+    def on_date(self, booking_date):
+        """Only bookings on a single date (YYYY-MM-DD)"""
+        return self.where("b.date_ord = ?", date_to_ordinal(booking_date))
+
+    def date_range(self, start=None, end=None):
+        """Only bookings between two dates, both inclusive and optional"""
+        if start is not None:
+            self.where("b.date_ord >= ?", date_to_ordinal(start))
+        if end is not None:
+            self.where("b.date_ord <= ?", date_to_ordinal(end))
+        return self
+
+    def between_times(self, start_min, end_min):
+        """Only bookings overlapping ``[start_min, end_min)`` minutes"""
+        return self.where("b.start_min < ? AND b.end_min > ?", end_min, start_min)
+
+    def users(self, *user_ids):
+        """Only bookings made for the given users"""
+        return self._in("b.user_id", user_ids)
+
+    def _from_row(self, row):
+        from models.booking import Booking
+        return Booking.from_row(row)
+
+
+class ScheduleQuery(_QueryBuilder):
+    """Query builder for the ``schedules`` table"""
+
+    TABLE = 'schedules'
+    ALIAS = 's'
+    ORDER_FIELDS = {
+        'id': 's.id',
+        'day_of_week': 's.weekday',
+        'start_time': 's.start_min',
+        'end_time': 's.end_min',
+        'course_name': 's.course_name',
+        'classroom_id': 's.classroom_id',
+    }
+
+    def days(self, *days_of_week):
+        """Only schedules on the given weekday names"""
+        return self._in("s.weekday", [weekday_index(day) for day in days_of_week])
+
+    def teachers(self, *teacher_ids):
+        """Only schedules taught by the given teachers"""
+        return self._in("s.teacher_id", teacher_ids)
+
+    def between_times(self, start_min, end_min):
+        """Only schedules overlapping ``[start_min, end_min)`` minutes"""
+        return self.where("s.start_min < ? AND s.end_min > ?", end_min, start_min)
+
+    # Schedules are owned by teachers; keep the booking-style name available
+    users = teachers
+
+    def semesters(self, *semesters):
+        """Only schedules in the given semesters"""
+        return self._in("s.semester", semesters)
+
+    def _from_row(self, row):
+        from models.schedule import Schedule
+        return Schedule.from_row(row)
@@ -4,6 +4,11 @@ Schedule Model Module
 
 from datetime import datetime
 from database.db_setup import DatabaseManager
+from utils.time_utils import parse_time, format_minutes, weekday_index
+from scheduling.interval_index import interval_index
+from scheduling.conflicts import ConflictEngine
+from scheduling.occurrences import ScheduleCalendar
+from models.waitlist import Waitlist
 
 class Schedule:
     def __init__(self, teacher_id=None, classroom_id=None, course_name=None,
@@ -21,25 +26,54 @@ class Schedule:
         self.created_at = None
         self.db = DatabaseManager()
     
+    def time_columns(self):
+        """Canonicalise times and return ``(weekday, start_min, end_min)``"""
+        start_min, end_min = parse_time(self.start_time), parse_time(self.end_time)
+        self.start_time, self.end_time = format_minutes(start_min), format_minutes(end_min)
+        return weekday_index(self.day_of_week), start_min, end_min
+    
     def create(self):
         """Create a new schedule"""
         try:
+            weekday, start_min, end_min = self.time_columns()
             query = '''
                 INSERT INTO schedules 
                 (teacher_id, classroom_id, course_name, day_of_week,
-                 start_time, end_time, semester, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                 start_time, end_time, semester, status,
+                 weekday, start_min, end_min)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             '''
             self.id = self.db.execute_update(query, (
                 self.teacher_id, self.classroom_id, self.course_name,
                 self.day_of_week, self.start_time, self.end_time,
-                self.semester, self.status
+                self.semester, self.status,
+                weekday, start_min, end_min
             ))
+            if self.id is not None:
+                interval_index.schedule_changed(self.id)
+                ScheduleCalendar.refresh_schedule(self.id)
             return self.id is not None
         except Exception as e:
             print(f"Create schedule error: {e}")
             return False
     
+    @staticmethod
+    def from_row(row):
+        """Build a Schedule from a full ``schedules`` row"""
+        schedule = Schedule(
+            teacher_id=row[1],
+            classroom_id=row[2],
+            course_name=row[3],
+            day_of_week=row[4],
+            start_time=row[5],
+            end_time=row[6],
+            semester=row[7],
+            status=row[8]
+        )
+        schedule.id = row[0]
+        schedule.created_at = row[9]
+        return schedule
+    
     @staticmethod
     def get_schedule_by_id(schedule_id):
         """Get schedule by ID"""
@@ -76,7 +110,7 @@ class Schedule:
             query = '''
                 SELECT * FROM schedules 
                 WHERE teacher_id = ? AND status = 1
-                ORDER BY day_of_week, start_time
+                ORDER BY weekday, start_min
             '''
             results = db.execute_query(query, (teacher_id,))
             
@@ -108,7 +142,7 @@ class Schedule:
             query = '''
                 SELECT * FROM schedules 
                 WHERE classroom_id = ? AND status = 1
-                ORDER BY day_of_week, start_time
+                ORDER BY weekday, start_min
             '''
             results = db.execute_query(query, (classroom_id,))
             
@@ -137,7 +171,7 @@ class Schedule:
         """Get all schedules"""
         try:
             db = DatabaseManager()
-            query = 'SELECT * FROM schedules WHERE status = 1 ORDER BY day_of_week, start_time'
+            query = 'SELECT * FROM schedules WHERE status = 1 ORDER BY weekday, start_min'
             results = db.execute_query(query)
             
             schedules = []
@@ -161,30 +195,48 @@ class Schedule:
             return []
     
     def update(self):
-        """Update schedule"""
+        """Update schedule, offering any slot it leaves to the waitlist"""
         try:
-            query = '''
-                UPDATE schedules 
-                SET teacher_id = ?, classroom_id = ?, course_name = ?,
-                    day_of_week = ?, start_time = ?, end_time = ?, semester = ?
-                WHERE id = ?
-            '''
-            self.db.execute_update(query, (
-                self.teacher_id, self.classroom_id, self.course_name,
-                self.day_of_week, self.start_time, self.end_time,
-                self.semester, self.id
-            ))
+            weekday, start_min, end_min = self.time_columns()
+            promoted = []
+            with self.db.transaction() as conn:
+                old = conn.execute('''
+                    SELECT classroom_id, weekday, start_min, end_min, status FROM schedules WHERE id = ?
+                ''', (self.id,)).fetchone()
+                conn.execute('''
+                    UPDATE schedules 
+                    SET teacher_id = ?, classroom_id = ?, course_name = ?,
+                        day_of_week = ?, start_time = ?, end_time = ?, semester = ?, status = ?,
+                        weekday = ?, start_min = ?, end_min = ?
+                    WHERE id = ?
+                ''', (
+                    self.teacher_id, self.classroom_id, self.course_name,
+                    self.day_of_week, self.start_time, self.end_time,
+                    self.semester, self.status, weekday, start_min, end_min, self.id
+                ))
+                ScheduleCalendar.refresh_schedule(self.id, conn)
+                # Waiters for the old slot get whatever part of it is now free
+                if old is not None and old['status'] == 1:
+                    promoted = Waitlist.promote_weekly(old['classroom_id'], old['weekday'],
+                                                       old['start_min'], old['end_min'], conn)
+            interval_index.schedule_changed(self.id)
+            Waitlist.notify_promoted(promoted)
             return True
         except Exception as e:
             print(f"Update schedule error: {e}")
             return False
     
     def delete(self):
-        """Delete/deactivate schedule"""
+        """Delete/deactivate schedule, offering the freed slots to the waitlist"""
         try:
-            query = 'UPDATE schedules SET status = 0 WHERE id = ?'
-            self.db.execute_update(query, (self.id,))
+            with self.db.transaction() as conn:
+                conn.execute('UPDATE schedules SET status = 0 WHERE id = ?', (self.id,))
+                ScheduleCalendar.refresh_schedule(self.id, conn)
+                promoted = Waitlist.promote_weekly(self.classroom_id, weekday_index(self.day_of_week),
+                                                   parse_time(self.start_time), parse_time(self.end_time), conn)
             self.status = 0
+            interval_index.schedule_changed(self.id)
+            Waitlist.notify_promoted(promoted)
             return True
         except Exception as e:
             print(f"Delete schedule error: {e}")
@@ -192,41 +244,11 @@ class Schedule:
     
     @staticmethod
     def check_conflict(teacher_id, classroom_id, day_of_week, start_time, end_time, schedule_id=None):
-        """Check for schedule conflicts"""
+        """Check for conflicts with other schedules and upcoming bookings"""
         try:
-            db = DatabaseManager()
-            if schedule_id:
-                query = '''
-                    SELECT COUNT(*) as count FROM schedules
-                    WHERE (teacher_id = ? OR classroom_id = ?)
-                    AND day_of_week = ? AND status = 1 AND id != ?
-                    AND (
-                        (start_time <= ? AND end_time > ?)
-                        OR (start_time < ? AND end_time >= ?)
-                        OR (start_time >= ? AND end_time <= ?)
-                    )
-                '''
-                results = db.execute_query(query, (
-                    teacher_id, classroom_id, day_of_week, schedule_id,
-                    start_time, start_time, end_time, end_time, start_time, end_time
-                ))
-            else:
-                query = '''
-                    SELECT COUNT(*) as count FROM schedules
-                    WHERE (teacher_id = ? OR classroom_id = ?)
-                    AND day_of_week = ? AND status = 1
-                    AND (
-                        (start_time <= ? AND end_time > ?)
-                        OR (start_time < ? AND end_time >= ?)
-                        OR (start_time >= ? AND end_time <= ?)
-                    )
-                '''
-                results = db.execute_query(query, (
-                    teacher_id, classroom_id, day_of_week,
-                    start_time, start_time, end_time, end_time, start_time, end_time
-                ))
-            
-            return results[0][0] > 0 if results else False
+            return bool(ConflictEngine.schedule_conflicts(
+                teacher_id, classroom_id, day_of_week, start_time, end_time,
+                exclude_schedule_id=schedule_id))
         except Exception as e:
             print(f"Check conflict error: {e}")
             return False
@@ -0,0 +1,134 @@
+"""
+Semester Model Module
+"""
+
+from database.db_setup import DatabaseManager
+from utils.time_utils import date_to_ordinal, ordinal_to_date
+from scheduling.occurrences import ScheduleCalendar
+
+class Semester:
+    def __init__(self, name=None, start_date=None, end_date=None):
+        self.id = None
+        self.name = name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.created_at = None
+        self.db = DatabaseManager()
+    
+    def create(self):
+        """Create a semester and date its schedules"""
+        try:
+            start_ord, end_ord = self._ordinals()
+            with self.db.transaction() as conn:
+                self.id = conn.execute('''
+                    INSERT INTO semesters (name, start_date, end_date, start_ord, end_ord)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (self.name, ordinal_to_date(start_ord), ordinal_to_date(end_ord),
+                      start_ord, end_ord)).lastrowid
+                ScheduleCalendar.refresh_semester(self.name, conn)
+            return True
+        except Exception as e:
+            print(f"Create semester error: {e}")
+            return False
+    
+    def update(self):
+        """Update semester dates and regenerate its occurrences"""
+        try:
+            start_ord, end_ord = self._ordinals()
+            with self.db.transaction() as conn:
+                conn.execute('''
+                    UPDATE semesters
+                    SET name = ?, start_date = ?, end_date = ?, start_ord = ?, end_ord = ?
+                    WHERE id = ?
+                ''', (self.name, ordinal_to_date(start_ord), ordinal_to_date(end_ord),
+                      start_ord, end_ord, self.id))
+                # Refresh everything so a rename also clears the old name's rows
+                ScheduleCalendar.refresh_all(conn)
+            return True
+        except Exception as e:
+            print(f"Update semester error: {e}")
+            return False
+    
+    def _ordinals(self):
+        start_ord, end_ord = date_to_ordinal(self.start_date), date_to_ordinal(self.end_date)
+        if end_ord < start_ord:
+            raise ValueError("Semester ends before it starts")
+        return start_ord, end_ord
+    
+    def add_holiday(self, holiday_date, name=None, all_semesters=False):
+        """Add a holiday to this semester (or to every semester)"""
+        try:
+            date_ord = date_to_ordinal(holiday_date)
+            with self.db.transaction() as conn:
+                conn.execute('''
+                    INSERT INTO holidays (holiday_date, date_ord, name, semester_id)
+                    VALUES (?, ?, ?, ?)
+                ''', (ordinal_to_date(date_ord), date_ord, name, None if all_semesters else self.id))
+                if all_semesters:
+                    ScheduleCalendar.refresh_all(conn)
+                else:
+                    ScheduleCalendar.refresh_semester(self.name, conn)
+            return True
+        except Exception as e:
+            print(f"Add holiday error: {e}")
+            return False
+    
+    def remove_holiday(self, holiday_id):
+        """Remove a holiday and restore the classes on that date"""
+        try:
+            with self.db.transaction() as conn:
+                conn.execute('DELETE FROM holidays WHERE id = ?', (holiday_id,))
+                ScheduleCalendar.refresh_all(conn)
+            return True
+        except Exception as e:
+            print(f"Remove holiday error: {e}")
+            return False
+    
+    def get_holidays(self):
+        """Holidays that apply to this semester as (id, date, name) tuples"""
+        try:
+            query = '''
+                SELECT id, holiday_date, name FROM holidays
+                WHERE (semester_id = ? OR semester_id IS NULL)
+                AND date_ord BETWEEN ? AND ?
+                ORDER BY date_ord
+            '''
+            start_ord, end_ord = self._ordinals()
+            results = self.db.execute_query(query, (self.id, start_ord, end_ord))
+            return [tuple(row) for row in results] if results else []
+        except Exception as e:
+            print(f"Get holidays error: {e}")
+            return []
+    
+    @staticmethod
+    def from_row(row):
+        """Build a Semester from a full ``semesters`` row"""
+        semester = Semester(name=row[1], start_date=row[2], end_date=row[3])
+        semester.id = row[0]
+        semester.created_at = row[6]
+        return semester
+    
+    @staticmethod
+    def get_semester_by_name(name):
+        """Get semester by name"""
+        try:
+            db = DatabaseManager()
+            results = db.execute_query('SELECT * FROM semesters WHERE name = ?', (name,))
+            return Semester.from_row(results[0]) if results else None
+        except Exception as e:
+            print(f"Get semester error: {e}")
+            return None
+    
+    @staticmethod
+    def get_all_semesters():
+        """Get all semesters, latest first"""
+        try:
+            db = DatabaseManager()
+            results = db.execute_query('SELECT * FROM semesters ORDER BY start_ord DESC')
+            return [Semester.from_row(row) for row in results] if results else []
+        except Exception as e:
+            print(f"Get all semesters error: {e}")
+            return []
+    
+    def __repr__(self):
+        return f"<Semester(id={self.id}, name={self.name}, {self.start_date} - {self.end_date})>"
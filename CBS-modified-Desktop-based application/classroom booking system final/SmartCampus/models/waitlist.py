@@ -0,0 +1,234 @@
+"""
+Waitlist Model Module
+"""
+
+from datetime import date, datetime
+from database.db_setup import DatabaseManager
+from utils.time_utils import parse_time, format_minutes, date_to_ordinal, ordinal_to_date, weekday_of_ordinal
+from scheduling.interval_index import interval_index
+from scheduling.conflicts import ConflictEngine
+from scheduling.approval import approval_rules
+
+class Waitlist:
+    def __init__(self, user_id=None, classroom_id=None, course_name=None,
+                 booking_date=None, start_time=None, end_time=None, description=None):
+        self.id = None
+        self.user_id = user_id
+        self.classroom_id = classroom_id
+        self.course_name = course_name
+        self.booking_date = booking_date
+        self.start_time = start_time
+        self.end_time = end_time
+        self.description = description
+        self.status = 1  # 0=Withdrawn, 1=Waiting, 2=Promoted
+        self.booking_id = None
+        self.created_at = None
+        self.db = DatabaseManager()
+    
+    def join(self):
+        """
+        Queue for a room and time range.
+        
+        The entry is refused when the user is already waiting for the same
+        slot, or when nothing occupies the slot (book it directly instead).
+        The checks and the insert share one transaction.
+        
+        Returns:
+            tuple: (joined, reason refused or None)
+        """
+        try:
+            start_min, end_min = parse_time(self.start_time), parse_time(self.end_time)
+            date_ord = date_to_ordinal(self.booking_date)
+            self.booking_date = ordinal_to_date(date_ord)
+            self.start_time, self.end_time = format_minutes(start_min), format_minutes(end_min)
+            with self.db.transaction() as conn:
+                waiting = conn.execute('''
+                    SELECT 1 FROM waitlist
+                    WHERE user_id = ? AND classroom_id = ? AND date_ord = ? AND start_min = ? AND end_min = ?
+                    AND status = 1
+                ''', (self.user_id, self.classroom_id, date_ord, start_min, end_min)).fetchone()
+                if waiting:
+                    return False, "You are already on the waitlist for this slot."
+                if not ConflictEngine.booking_conflicts(self.classroom_id, date_ord, start_min, end_min, conn=conn):
+                    return False, "The room is free at this time; book it directly."
+                
+                self.id = conn.execute('''
+                    INSERT INTO waitlist
+                    (user_id, classroom_id, course_name, booking_date, start_time, end_time,
+                     description, date_ord, start_min, end_min)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    self.user_id, self.classroom_id, self.course_name, self.booking_date,
+                    self.start_time, self.end_time, self.description, date_ord, start_min, end_min
+                )).lastrowid
+            return True, None
+        except Exception as e:
+            print(f"Join waitlist error: {e}")
+            return False, "Failed to join the waitlist. Please try again."
+    
+    def withdraw(self):
+        """Leave the waitlist"""
+        try:
+            query = 'UPDATE waitlist SET status = 0 WHERE id = ? AND status = 1'
+            self.db.execute_update(query, (self.id,))
+            self.status = 0
+            return True
+        except Exception as e:
+            print(f"Withdraw waitlist error: {e}")
+            return False
+    
+    def position(self):
+        """1-based place among waiting entries for this room whose time overlaps this one"""
+        try:
+            query = '''
+                SELECT COUNT(*) FROM waitlist
+                WHERE classroom_id = ? AND date_ord = ? AND status = 1 AND id <= ?
+                AND start_min < ? AND end_min > ?
+            '''
+            results = self.db.execute_query(query, (self.classroom_id, date_to_ordinal(self.booking_date), self.id,
+                                                    parse_time(self.end_time), parse_time(self.start_time)))
+            return results[0][0] if results else 0
+        except Exception as e:
+            print(f"Get waitlist position error: {e}")
+            return 0
+    
+    @staticmethod
+    def promote(classroom_id, booking_date, conn):
+        """
+        Turn waiting entries for a room and day into pending bookings.
+        
+        Must run inside the transaction that freed the room, so the slot
+        cannot be taken in between. Entries are tried in the order they
+        joined; each one whose time range is now free becomes a booking,
+        and later entries are checked against the bookings made before
+        them. Each new booking goes through the auto-approval rules like
+        any other request.
+        
+        Returns:
+            list: the created Bookings (see ``notify_promoted``)
+        """
+        from models.booking import Booking
+        date_ord = date_to_ordinal(booking_date)
+        if date_ord < date.today().toordinal():
+            return []
+        
+        waiting = conn.execute('''
+            SELECT id, user_id, course_name, booking_date, start_time, end_time, description,
+                   start_min, end_min
+            FROM waitlist
+            WHERE classroom_id = ? AND date_ord = ? AND status = 1
+            ORDER BY id
+        ''', (classroom_id, date_ord)).fetchall()
+        
+        promoted = []
+        now = datetime.now()
+        for (entry_id, user_id, course_name, entry_date, start_time, end_time, description,
+             start_min, end_min) in waiting:
+            if ConflictEngine.booking_conflicts(classroom_id, date_ord, start_min, end_min, conn=conn):
+                continue
+            booking = Booking(user_id, classroom_id, course_name, entry_date,
+                              start_time, end_time, description, status=2)
+            booking.id = conn.execute('''
+                INSERT INTO bookings
+                (user_id, classroom_id, course_name, booking_date,
+                 start_time, end_time, description, status, created_by,
+                 date_ord, start_min, end_min)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, classroom_id, course_name, entry_date, start_time, end_time,
+                  description, 2, user_id, date_ord, start_min, end_min)).lastrowid
+            booking.created_by = user_id
+            decision = approval_rules.decide(conn, user_id, classroom_id, date_ord, start_min, end_min)
+            approval_rules.apply(conn, booking.id, user_id, decision)
+            booking.status, booking.reason = decision.status, decision.reason
+            conn.execute('''
+                UPDATE waitlist SET status = 2, booking_id = ?, promoted_at = ?
+                WHERE id = ?
+            ''', (booking.id, now, entry_id))
+            promoted.append(booking)
+        return promoted
+    
+    @staticmethod
+    def promote_weekly(classroom_id, weekday, start_min, end_min, conn):
+        """
+        Promote waiting entries on every upcoming date a weekly slot freed.
+        
+        Used when a class is removed from a room; like ``promote`` it must
+        run inside the transaction that freed the slot.
+        
+        Returns:
+            list: the created Bookings (see ``notify_promoted``)
+        """
+        dates = conn.execute('''
+            SELECT DISTINCT date_ord FROM waitlist
+            WHERE classroom_id = ? AND status = 1 AND date_ord >= ?
+            AND start_min < ? AND end_min > ?
+            ORDER BY date_ord
+        ''', (classroom_id, date.today().toordinal(), end_min, start_min)).fetchall()
+        promoted = []
+        for (date_ord,) in dates:
+            if weekday_of_ordinal(date_ord) == weekday:
+                promoted.extend(Waitlist.promote(classroom_id, date_ord, conn))
+        return promoted
+    
+    @staticmethod
+    def notify_promoted(bookings):
+        """Index and email promoted bookings once their transaction has committed"""
+        from models.user import User
+        from utils.email_notification import EmailNotificationService
+        for booking in bookings:
+            if booking.status in (1, 2):
+                interval_index.add_booking(booking.id, booking.classroom_id, date_to_ordinal(booking.booking_date),
+                                           parse_time(booking.start_time), parse_time(booking.end_time),
+                                           booking.course_name, booking.user_id)
+            try:
+                user = User.get_user_by_id(booking.user_id)
+                if not user:
+                    continue
+                if booking.status == 1:
+                    EmailNotificationService.send_async(
+                        EmailNotificationService.send_approval_email, booking, user)
+                elif booking.status == 3:
+                    EmailNotificationService.send_async(
+                        EmailNotificationService.send_rejection_email, booking, user, booking.reason or "")
+                else:
+                    EmailNotificationService.send_async(
+                        EmailNotificationService.send_waitlist_promotion_email, booking, user)
+            except Exception as e:
+                print(f"Failed to send waitlist notification: {e}")
+    
+    @staticmethod
+    def from_row(row):
+        """Build a Waitlist entry from a full ``waitlist`` row"""
+        entry = Waitlist(
+            user_id=row[1],
+            classroom_id=row[2],
+            course_name=row[3],
+            booking_date=row[4],
+            start_time=row[5],
+            end_time=row[6],
+            description=row[7]
+        )
+        entry.id = row[0]
+        entry.status = row[11]
+        entry.booking_id = row[12]
+        entry.created_at = row[13]
+        return entry
+    
+    @staticmethod
+    def get_user_entries(user_id, status=1):
+        """Get a user's waitlist entries (waiting ones by default)"""
+        try:
+            db = DatabaseManager()
+            query = '''
+                SELECT * FROM waitlist
+                WHERE user_id = ? AND status = ?
+                ORDER BY date_ord, start_min
+            '''
+            results = db.execute_query(query, (user_id, status))
+            return [Waitlist.from_row(row) for row in results] if results else []
+        except Exception as e:
+            print(f"Get waitlist entries error: {e}")
+            return []
+    
+    def __repr__(self):
+        return f"<Waitlist(id={self.id}, user={self.user_id}, room={self.classroom_id}, date={self.booking_date})>"
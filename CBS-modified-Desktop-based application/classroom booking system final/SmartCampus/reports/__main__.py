@@ -0,0 +1,140 @@
+"""
+Headless Report Runner
+
+Writes the resource report without a display; run from the SmartCampus
+directory (like main.py):
+
+    python -m reports                                  # text, last four weeks
+    python -m reports -f text csv json png -o /srv/reports
+    python -m reports --from 2026-09-01 --to 2026-12-31 --db backup.db --timing
+    python -m reports --snapshot snapshots/2026-10-19   # columnar .npy snapshot
+    python -m reports --forecast 4                      # demand forecast CSV
+    python -m reports --scheduled                       # due scheduled reports (cron)
+    python -m reports --scheduled daily-summary         # run one schedule now
+
+Nothing from PyQt5 is imported, and matplotlib (Agg canvas) only when a
+PNG is requested. ``--timing`` prints import, report and write times to
+stderr.
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+from reports.formats import FORMATS
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reports_output')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m reports', description="Generate resource reports headlessly")
+    parser.add_argument('-f', '--format', dest='formats', nargs='+', choices=sorted(FORMATS), default=['text'],
+                        help="output formats (default: text)")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help="output directory")
+    parser.add_argument('--name', default='resource_report', help="file name prefix")
+    parser.add_argument('--from', dest='start', help="utilization window start, YYYY-MM-DD")
+    parser.add_argument('--to', dest='end', help="utilization window end, YYYY-MM-DD (default today)")
+    parser.add_argument('--db', help="database file (default: the application database)")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help="write a columnar snapshot (see reports.snapshot) instead of a report")
+    parser.add_argument('--compressed', action='store_true',
+                        help="with --snapshot: write one compressed .npz (cannot be memory-mapped)")
+    parser.add_argument('--forecast', type=int, metavar='WEEKS',
+                        help="write a demand forecast for the next WEEKS weeks instead of a report")
+    parser.add_argument('--scheduled', nargs='*', metavar='SCHEDULE',
+                        help="run the due scheduled reports (config.REPORT_SCHEDULES), or the named ones now")
+    parser.add_argument('--timing', action='store_true', help="print timings to stderr")
+    args = parser.parse_args(argv)
+    if args.forecast is not None and args.forecast < 1:
+        parser.error("--forecast needs at least one week")
+    if args.db and not os.path.exists(args.db):
+        parser.error(f"database not found: {args.db}")
+    return args
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    args = parse_args(argv)
+
+    # Imported after argument parsing so --help and usage errors stay instant
+    from database.db_setup import DatabaseManager
+    from reports.generator import ReportGenerator
+    imported = time.perf_counter()
+
+    db = DatabaseManager(args.db) if args.db else DatabaseManager()
+    if args.snapshot:
+        from reports.snapshot import write_snapshot
+        path = args.snapshot
+        if args.compressed and not path.endswith('.npz'):
+            path += '.npz'
+        manifest = write_snapshot(path, db.db_path, compressed=args.compressed)
+        print(path)
+        if args.timing:
+            rows = ', '.join(f"{table} {info['rows']}" for table, info in manifest['tables'].items())
+            print(f"snapshot {(time.perf_counter() - imported) * 1000:.0f} ms ({rows})", file=sys.stderr)
+        return 0
+    if args.scheduled is not None:
+        from reports.scheduler import ReportScheduler
+        scheduler = ReportScheduler(output_dir=args.output, db_path=db.db_path)
+        unknown = [name for name in args.scheduled if name not in scheduler.schedules]
+        if unknown:
+            print(f"Unknown schedules: {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        if args.scheduled:
+            runs = [run for run in (scheduler.run(name) for name in args.scheduled) if run]
+        else:
+            runs = scheduler.run_due()
+        for run in runs:
+            print(f"{run['schedule']}: {run['status']}, {run['changes']} changes "
+                  f"(seq {run['from_seq']}-{run['to_seq']})")
+            for path in run['full_files'] + ([run['delta_file']] if run['delta_file'] else []):
+                print(f"  {path}")
+            if run['error']:
+                print(f"  {run['error']}", file=sys.stderr)
+        if args.timing:
+            print(f"scheduled {(time.perf_counter() - imported) * 1000:.0f} ms", file=sys.stderr)
+        return 1 if any(run['status'] == 'failed' for run in runs) else 0
+    if args.forecast:
+        from reports.forecast import forecast_demand, write_forecast_csv
+        forecast = forecast_demand(weeks_ahead=args.forecast, end_date=args.end, db=db)
+        built = time.perf_counter()
+        os.makedirs(args.output, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        print(write_forecast_csv(forecast, os.path.join(args.output, f"demand_forecast_{stamp}.csv")))
+        expected, lower, upper = forecast.weekly_totals()
+        for i, room_type in enumerate(forecast.room_types):
+            for week, week_start in enumerate(forecast.week_starts):
+                print(f"{room_type:<15} {week_start}  {expected[i, week]:8.1f} room-hours "
+                      f"({lower[i, week]:.1f}-{upper[i, week]:.1f})")
+        if args.timing:
+            print(f"forecast {(built - imported) * 1000:.0f} ms, "
+                  f"write {(time.perf_counter() - built) * 1000:.0f} ms", file=sys.stderr)
+        return 0
+    try:
+        report = ReportGenerator(db).build_report(args.start, args.end)
+    except ValueError as e:
+        print(f"Report error: {e}", file=sys.stderr)
+        return 2
+    built = time.perf_counter()
+
+    os.makedirs(args.output, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    for name in dict.fromkeys(args.formats):
+        extension, write = FORMATS[name]
+        try:
+            print(write(report, os.path.join(args.output, f"{args.name}_{stamp}.{extension}")))
+        except ImportError as e:
+            print(f"Cannot write {name} report: {e}", file=sys.stderr)
+            return 1
+    written = time.perf_counter()
+
+    if args.timing:
+        print(f"imports {(imported - started) * 1000:.0f} ms, report {(built - imported) * 1000:.0f} ms, "
+              f"write {(written - built) * 1000:.0f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Report Cache Module
+
+Keeps computed report data (summaries, utilization cubes, trend buckets)
+together with the version of every table it was computed from. A table's
+version is the last ``change_log`` sequence number recorded for it by
+the triggers in ``database.db_setup``, so checking whether an entry is
+still valid is one indexed query, whatever the size of the tables.
+
+Entries are read-only: callers must not modify what ``get`` returns.
+
+Example:
+    summary = report_cache.get('summary', ('bookings', 'classrooms'), compute_summary)
+    report_cache.stats()    # {'hits': 12, 'misses': 3, 'entries': 3, 'hit_rate': 0.8}
+"""
+
+import threading
+from collections import OrderedDict
+
+from database.db_setup import DatabaseManager
+
+
+class ReportCache:
+    """Least recently used cache of report data, invalidated by table versions"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # (db_path, key) -> (versions, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def versions(tables, db=None):
+        """Last change sequence of each table (0 if never changed), in order"""
+        db = db or DatabaseManager()
+        query = 'SELECT ' + ', '.join(
+            'COALESCE((SELECT MAX(seq) FROM change_log WHERE table_name = ?), 0)' for _ in tables)
+        rows = db.execute_query(query, tuple(tables))
+        if not rows:
+            return None
+        return tuple(rows[0])
+
+    def get(self, key, tables, compute, db=None):
+        """
+        Cached value of ``compute()`` for ``key``.
+
+        Args:
+            key: hashable description of the data, including its parameters
+            tables: tables the data is read from
+            compute: callable producing the data
+
+        The versions are read before computing, so a change that commits
+        while ``compute`` runs makes the entry look stale on the next call
+        and it is computed again; a stale value is never served.
+        """
+        db = db or DatabaseManager()
+        tables = tuple(tables)
+        versions = self.versions(tables, db)
+        full_key = (db.db_path, key, tables)
+        if versions is not None:
+            with self._lock:
+                entry = self._entries.get(full_key)
+                if entry is not None and entry[0] == versions:
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return entry[1]
+        with self._lock:
+            self.misses += 1
+
+        value = compute()
+        if versions is not None:
+            with self._lock:
+                self._entries[full_key] = (versions, value)
+                self._entries.move_to_end(full_key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one key (for every database) or, with no key, everything"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                return
+            for full_key in [k for k in self._entries if k[1] == key]:
+                del self._entries[full_key]
+
+    def stats(self):
+        """Hit/miss counters and the number of cached entries"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+report_cache = ReportCache()
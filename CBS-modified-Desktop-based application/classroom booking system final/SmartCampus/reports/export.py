@@ -0,0 +1,214 @@
+"""
+Streaming Export Module
+
+Exports tables as CSV or JSON Lines, optionally gzipped, without loading
+them into memory. Rows are read in chunks by keyset pagination (``WHERE
+id > last ORDER BY id LIMIT n``) on a read-only connection, already
+joined in SQL (room numbers, status names), and written as they arrive,
+so memory stays constant however many rows there are. Each chunk is its
+own short read, so a long export does not hold a lock that would stall
+bookings being saved meanwhile.
+
+Files are written to ``<path>.part`` and renamed when complete; a
+cancelled or failed export leaves nothing behind.
+
+Example:
+    export_table('bookings', 'reports_output/bookings.csv.gz',
+                 progress=lambda done, total: print(done, total))
+"""
+
+import csv
+import gzip
+import json
+import os
+from collections import namedtuple
+
+from config import DB_PATH
+from database.db_setup import ReadOnlyDatabase
+
+CHUNK_ROWS = 5000
+
+# File extensions understood by the writers
+EXPORT_FORMATS = ('csv', 'jsonl', 'csv.gz', 'jsonl.gz')
+
+
+class ExportSpec(namedtuple('ExportSpec', 'columns fields source key where filters')):
+    """
+    One exportable table.
+
+    columns: (JSON key, CSV header) per output column
+    fields: SQL expressions for the columns, in order
+    source: FROM clause (with joins)
+    key: unique integer column used for paging
+    where: fixed condition, or None
+    filters: filter name -> condition with one placeholder
+    """
+
+    __slots__ = ()
+
+
+STATUS_NAME = "CASE {} WHEN 0 THEN 'Cancelled' WHEN 1 THEN 'Approved' WHEN 2 THEN 'Pending' " \
+              "WHEN 3 THEN 'Rejected' ELSE 'Unknown' END"
+
+EXPORTS = {
+    'bookings': ExportSpec(
+        (('id', 'ID'), ('room', 'Room'), ('course', 'Course'), ('date', 'Date'),
+         ('start_time', 'Start Time'), ('end_time', 'End Time'), ('status', 'Status')),
+        ('b.id', "COALESCE(c.room_number, 'Unknown')", 'b.course_name', 'b.booking_date',
+         'b.start_time', 'b.end_time', STATUS_NAME.format('b.status')),
+        'bookings b LEFT JOIN classrooms c ON c.id = b.classroom_id',
+        'b.id', None, {'user_id': 'b.user_id = ?'}),
+    'classrooms': ExportSpec(
+        (('room_number', 'Room Number'), ('type', 'Type'), ('building', 'Building'),
+         ('floor', 'Floor'), ('capacity', 'Capacity')),
+        ('room_number', 'room_type', 'building', 'floor', 'capacity'),
+        'classrooms', 'id', 'status = 1', {}),
+    'teachers': ExportSpec(
+        (('fullname', 'Full Name'), ('username', 'Username'), ('email', 'Email'),
+         ('phone', 'Phone'), ('department', 'Department')),
+        ('fullname', 'username', 'email', 'phone', 'department'),
+        'users', 'id', 'role = 2', {}),
+    'schedules': ExportSpec(
+        (('course', 'Course'), ('teacher', 'Teacher'), ('classroom', 'Classroom'), ('day', 'Day'),
+         ('start_time', 'Start Time'), ('end_time', 'End Time'), ('semester', 'Semester')),
+        ('s.course_name', 'u.fullname', 'c.room_number', 's.day_of_week', 's.start_time',
+         's.end_time', 's.semester'),
+        'schedules s JOIN users u ON s.teacher_id = u.id JOIN classrooms c ON s.classroom_id = c.id',
+        's.id', None, {}),
+}
+
+
+class ExportCancelled(Exception):
+    """Raised when an export is cancelled; its partial file has been removed"""
+
+
+def _conditions(spec, filters):
+    conditions, params = [], []
+    if spec.where:
+        conditions.append(spec.where)
+    for name, value in (filters or {}).items():
+        if name not in spec.filters:
+            raise ValueError(f"Unknown filter {name!r}")
+        conditions.append(spec.filters[name])
+        params.append(value)
+    return conditions, params
+
+
+def count_rows(name, db, **filters):
+    """Rows an export of ``name`` will write"""
+    spec = EXPORTS[name]
+    conditions, params = _conditions(spec, filters)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    return db.conn.execute(f'SELECT COUNT(*) FROM {spec.source}{where}', params).fetchone()[0]
+
+
+def iter_chunks(name, db, chunk_rows=CHUNK_ROWS, **filters):
+    """Yield lists of exported rows (tuples of column values), ``chunk_rows`` at a time"""
+    spec = EXPORTS[name]
+    conditions, params = _conditions(spec, filters)
+    # The key is selected first to page on and dropped from the output
+    query = (f"SELECT {spec.key}, {', '.join(spec.fields)} FROM {spec.source} "
+             f"WHERE {' AND '.join(conditions + [f'{spec.key} > ?'])} ORDER BY {spec.key} LIMIT ?")
+    last = -1
+    while True:
+        rows = db.conn.execute(query, params + [last, chunk_rows]).fetchall()
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield [tuple(row)[1:] for row in rows]
+        if len(rows) < chunk_rows:
+            return
+
+
+def _open(path, compressed):
+    if compressed:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_format(path):
+    """Export format of a file name, e.g. 'csv.gz' for 'bookings.csv.gz'"""
+    for fmt in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if path.endswith('.' + fmt):
+            return fmt
+    raise ValueError(f"Unsupported export file type: {os.path.basename(path)}")
+
+
+def export_table(name, path, db_path=DB_PATH, chunk_rows=CHUNK_ROWS, progress=None, cancelled=None,
+                 db=None, **filters):
+    """
+    Stream one table to ``path``; the format follows the extension.
+
+    Args:
+        progress: called as progress(rows written, total rows) after each chunk
+        cancelled: callable returning True to stop (raises ExportCancelled)
+        filters: e.g. user_id=7 for one user's bookings
+
+    Returns:
+        int: rows written
+    """
+    spec = EXPORTS[name]
+    fmt = export_format(path)
+    json_lines = fmt.startswith('jsonl')
+    keys = [key for key, _ in spec.columns]
+    own_db = db is None
+    db = db or ReadOnlyDatabase(db_path)
+    part = path + '.part'
+    written = 0
+    try:
+        total = count_rows(name, db, **filters)
+        with _open(part, fmt.endswith('.gz')) as f:
+            writer = None if json_lines else csv.writer(f)
+            if writer:
+                writer.writerow([label for _, label in spec.columns])
+            for rows in iter_chunks(name, db, chunk_rows, **filters):
+                if cancelled and cancelled():
+                    raise ExportCancelled(f"Export of {name} cancelled")
+                if writer:
+                    writer.writerows(rows)
+                else:
+                    f.writelines(json.dumps(dict(zip(keys, row)), default=str) + '\n' for row in rows)
+                written += len(rows)
+                if progress:
+                    progress(written, total)
+        os.replace(part, path)
+        return written
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+    finally:
+        if own_db:
+            db.close()
+
+
+def export_tables(names, output_dir, stamp, fmt='csv', db_path=DB_PATH, progress=None, cancelled=None):
+    """
+    Export several tables to ``<name>_<stamp>.<fmt>`` files in ``output_dir``.
+
+    Progress is reported over all tables together. If one export fails or
+    is cancelled, the files already written by this call are removed.
+
+    Returns:
+        list: paths written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt!r}")
+    os.makedirs(output_dir, exist_ok=True)
+    db = ReadOnlyDatabase(db_path)
+    paths = []
+    try:
+        grand_total, done = sum(count_rows(name, db) for name in names), 0
+        for name in names:
+            on_chunk = (lambda rows, _, base=done: progress(base + rows, grand_total)) if progress else None
+            path = os.path.join(output_dir, f"{name}_{stamp}.{fmt}")
+            done += export_table(name, path, chunk_rows=CHUNK_ROWS, progress=on_chunk,
+                                 cancelled=cancelled, db=db)
+            paths.append(path)
+        return paths
+    except BaseException:
+        for path in paths:
+            os.remove(path)
+        raise
+    finally:
+        db.close()
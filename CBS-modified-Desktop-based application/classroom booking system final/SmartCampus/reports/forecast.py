@@ -0,0 +1,188 @@
+"""
+Demand Forecast Module
+
+Booking demand per room type, weekday and hour, measured in room-hours
+requested per week, and a forecast for the coming weeks with confidence
+bands.
+
+History is one NumPy array [room type, week, weekday, hour] built from a
+single grouped query. Rolling statistics over the week axis come from
+``sliding_window_view``, so every (type, weekday, hour) series is handled
+at once; the forecast for a cell is the level and linear trend of its
+last ``window`` weeks, and the band is the regression prediction
+interval from the spread of those weeks around the trend.
+
+Demand counts every request that was made (approved, pending or
+rejected), since rejected requests are demand that could not be met.
+
+Example:
+    fc = forecast_demand(weeks_ahead=4)
+    fc.week_starts                     # ['2026-10-26', ...]
+    expected, lower, upper = fc.weekly_totals()
+    write_forecast_csv(fc, 'reports_output/demand_forecast.csv')
+"""
+
+import csv
+from collections import namedtuple
+from datetime import date
+from statistics import NormalDist
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import CAMPUS_DAY_START_HOUR, CAMPUS_DAY_END_HOUR
+from database.db_setup import DatabaseManager
+from reports.cache import report_cache
+from utils.time_utils import date_to_ordinal, ordinal_to_date
+
+DEMAND_STATUSES = (1, 2, 3)
+
+
+class DemandHistory(namedtuple('DemandHistory', 'room_types first_monday hours weekly')):
+    """Room-hours requested per [room type, week, weekday, hour]; weeks start on first_monday"""
+
+    __slots__ = ()
+
+    def week_starts(self):
+        return [ordinal_to_date(self.first_monday + 7 * w) for w in range(self.weekly.shape[1])]
+
+    def rolling(self, window):
+        """Rolling mean and standard deviation over ``window`` weeks, shape [type, weeks-window+1, 7, hours]"""
+        windows = sliding_window_view(self.weekly, window, axis=1)
+        return windows.mean(axis=-1), windows.std(axis=-1)
+
+
+class Forecast(namedtuple('Forecast', 'room_types hours week_starts expected std z history')):
+    """
+    Forecast per [room type, week ahead, weekday, hour] in room-hours.
+
+    ``std`` is the forecast standard deviation of each cell, ``z`` the
+    normal quantile of the confidence band and ``history`` the
+    DemandHistory it was fitted on.
+    """
+
+    __slots__ = ()
+
+    @property
+    def lower(self):
+        return np.clip(self.expected - self.z * self.std, 0, None)
+
+    @property
+    def upper(self):
+        return self.expected + self.z * self.std
+
+    def weekly_totals(self):
+        """
+        Expected room-hours per [room type, week ahead] with its band.
+
+        Cells are treated as independent, so their variances add.
+        """
+        expected = self.expected.sum(axis=(2, 3))
+        std = np.sqrt((self.std ** 2).sum(axis=(2, 3)))
+        return expected, np.clip(expected - self.z * std, 0, None), expected + self.z * std
+
+    def peak_hours(self, room_type, top=5):
+        """Busiest (weekday, hour, expected room-hours) of a room type over the forecast weeks"""
+        cells = self.expected[self.room_types.index(room_type)].mean(axis=0)
+        order = np.argsort(cells, axis=None)[::-1][:top]
+        return [(int(day), int(self.hours[hour]), round(float(cells[day, hour]), 2))
+                for day, hour in zip(*np.unravel_index(order, cells.shape))]
+
+
+def demand_history(weeks=104, end_date=None, statuses=DEMAND_STATUSES, first_hour=CAMPUS_DAY_START_HOUR,
+                   last_hour=CAMPUS_DAY_END_HOUR, db=None):
+    """
+    Weekly demand for the ``weeks`` complete weeks (Monday-Sunday) before the one containing end_date.
+
+    Returns:
+        DemandHistory, cached until bookings or classrooms change
+    """
+    db = db or DatabaseManager()
+    end = date_to_ordinal(end_date or date.today())
+    first_monday = end - (end + 6) % 7 - 7 * weeks
+    statuses = tuple(statuses)
+    key = ('demand_history', first_monday, weeks, statuses, first_hour, last_hour)
+    return report_cache.get(key, ('bookings', 'classrooms'), lambda: _demand_history(
+        first_monday, weeks, statuses, first_hour, last_hour, db), db)
+
+
+def _demand_history(first_monday, weeks, statuses, first_hour, last_hour, db):
+    # Grouped on the covering date index; rooms are mapped to types afterwards
+    rows = db.execute_query(f'''
+        SELECT classroom_id, date_ord, start_min, end_min, COUNT(*)
+        FROM bookings
+        WHERE date_ord BETWEEN ? AND ? AND status IN ({', '.join('?' for _ in statuses)})
+              AND start_min IS NOT NULL AND end_min IS NOT NULL
+        GROUP BY date_ord, classroom_id, start_min, end_min
+    ''', (first_monday, first_monday + 7 * weeks - 1) + statuses) or []
+    room_type = {row[0]: row[1] for row in db.execute_query('SELECT id, room_type FROM classrooms') or []}
+
+    data = np.array([tuple(row) for row in rows], dtype=np.int64).reshape(-1, 5)
+    rooms = np.unique(data[:, 0])
+    room_types = sorted({room_type[room] for room in rooms.tolist() if room in room_type})
+    hours = np.arange(first_hour, last_hour)
+    daily = np.zeros((len(room_types), 7 * weeks, len(hours)))
+    if room_types:
+        # Type index per room, -1 for bookings of deleted rooms
+        type_pos = {name: i for i, name in enumerate(room_types)}
+        room_pos = np.array([type_pos.get(room_type.get(room), -1) for room in rooms.tolist()])
+        types = room_pos[np.searchsorted(rooms, data[:, 0])]
+        data = data[types >= 0]
+        types = types[types >= 0]
+        edges = hours * 60
+        # Room-hours of each (start, end) group falling in every hour column
+        overlap = (np.minimum(data[:, 3:4], edges + 60) - np.maximum(data[:, 2:3], edges)).clip(0) / 60.0
+        np.add.at(daily, (types, data[:, 1] - first_monday), overlap * data[:, 4:5])
+    weekly = daily.reshape(len(room_types), weeks, 7, len(hours))
+    return DemandHistory(room_types, first_monday, hours, weekly)
+
+
+def forecast_demand(weeks_ahead=4, window=8, history_weeks=104, confidence=0.9, end_date=None, db=None):
+    """
+    Forecast weekly demand per room type, weekday and hour.
+
+    Args:
+        weeks_ahead: weeks to forecast, starting with the current week
+        window: weeks of history the level and trend are fitted on
+        history_weeks: weeks of history to load (at least ``window``)
+        confidence: two-sided band, e.g. 0.9 for 5%-95%
+
+    Returns:
+        Forecast
+    """
+    if window < 3:
+        raise ValueError("window must be at least 3 weeks")
+    history = demand_history(max(history_weeks, window), end_date, db=db)
+    recent = np.moveaxis(history.weekly[:, -window:], 1, -1)     # [type, 7, hours, window]
+
+    # Least-squares line through the last `window` weeks of every cell
+    t = np.arange(window) - (window - 1) / 2.0
+    level = recent.mean(axis=-1)
+    slope = (recent * t).sum(axis=-1) / (t ** 2).sum()
+    residuals = recent - (level[..., None] + slope[..., None] * t)
+    sigma = np.sqrt((residuals ** 2).sum(axis=-1) / (window - 2))
+
+    # Week h ahead sits at t = (window - 1) / 2 + h; prediction interval of a fitted line
+    ahead = (window - 1) / 2.0 + np.arange(1, weeks_ahead + 1)
+    expected = np.clip(level[:, None] + slope[:, None] * ahead[None, :, None, None], 0, None)
+    factor = np.sqrt(1 + 1.0 / window + ahead ** 2 / (t ** 2).sum())
+    std = sigma[:, None] * factor[None, :, None, None]
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    next_monday = history.first_monday + 7 * history.weekly.shape[1]
+    week_starts = [ordinal_to_date(next_monday + 7 * w) for w in range(weeks_ahead)]
+    return Forecast(history.room_types, history.hours, week_starts, expected, std, z, history)
+
+
+def write_forecast_csv(forecast, path):
+    """One row per room type, week, weekday and hour with the expected room-hours and band"""
+    lower, upper = forecast.lower, forecast.upper
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['room_type', 'week_start', 'weekday', 'hour', 'expected', 'lower', 'upper'])
+        for index in np.ndindex(forecast.expected.shape):
+            room_type, week, day, hour = index
+            writer.writerow([forecast.room_types[room_type], forecast.week_starts[week], day,
+                             int(forecast.hours[hour]), round(float(forecast.expected[index]), 3),
+                             round(float(lower[index]), 3), round(float(upper[index]), 3)])
+    return path
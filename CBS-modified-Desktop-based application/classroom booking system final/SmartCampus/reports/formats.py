@@ -0,0 +1,132 @@
+"""
+Report Formats Module
+
+Writers for a report built by ``ReportGenerator.build_report``: plain
+text, CSV (one ``section,key,value`` row per figure), JSON and a PNG of
+the main charts. matplotlib is imported only when a PNG is written, and
+through the Agg canvas, so no display or Qt is needed.
+"""
+
+import csv
+import json
+
+
+def render_text(report):
+    """Report as the plain-text layout used by the admin exports"""
+    stats = report['booking_stats']
+    utilization = report['utilization']
+    window = utilization['window']
+    lines = [
+        "Smart Campus Resource Management Report",
+        f"Generated: {report['generated']}",
+        "=" * 60,
+        "",
+        "BOOKING STATISTICS",
+        "-" * 60,
+        f"Total Bookings: {stats['total']}",
+        f"Approved: {stats['approved']}",
+        f"Pending: {stats['pending']}",
+        f"Rejected: {stats['rejected']}",
+        f"Cancelled: {stats['cancelled']}",
+        "",
+        "RESOURCE USAGE",
+        "-" * 60,
+    ]
+    lines += [f"{room}: {count} bookings" for room, count in report['resource_usage'].items()]
+    lines += ["", "PEAK HOURS", "-" * 60]
+    lines += [f"{time}: {count} bookings" for time, count in list(report['peak_hours'].items())[:5]]
+    lines += ["", "UNDERUTILIZED ROOMS", "-" * 60]
+    lines += [f"{room['room']} ({room['type']}): {room['bookings']} bookings"
+              for room in report['underutilized_rooms']]
+    lines += [
+        "",
+        f"ROOM UTILIZATION, MON-FRI ({window['start']} - {window['end']})",
+        "-" * 60,
+        f"All rooms: {utilization['hours']:.1f}% of hours, {utilization['seat_hours']:.1f}% of seat-hours",
+    ]
+    lines += [f"{room['room']} ({room['type']}, {room['capacity']} seats): {room['utilization']}% used"
+              for room in utilization['underutilized']]
+    return "\n".join(lines) + "\n"
+
+
+def write_text(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render_text(report))
+    return path
+
+
+def csv_rows(report):
+    """Report flattened to (section, key, value) rows"""
+    utilization = report['utilization']
+    yield 'report', 'generated', report['generated']
+    for key, value in report['booking_stats'].items():
+        yield 'booking_stats', key, value
+    for room, count in report['resource_usage'].items():
+        yield 'resource_usage', room, count
+    for hour, count in report['peak_hours'].items():
+        yield 'peak_hours', hour, count
+    for room in report['underutilized_rooms']:
+        yield 'underutilized_rooms', room['room'], room['bookings']
+    yield 'utilization', 'window_start', utilization['window']['start']
+    yield 'utilization', 'window_end', utilization['window']['end']
+    yield 'utilization', 'hours_percent', utilization['hours']
+    yield 'utilization', 'seat_hours_percent', utilization['seat_hours']
+    for room, percent in utilization['rooms'].items():
+        yield 'room_utilization_percent', room, percent
+
+
+def write_csv(report, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['section', 'key', 'value'])
+        writer.writerows(csv_rows(report))
+    return path
+
+
+def write_json(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def write_png(report, path):
+    """Booking status, room usage, peak hours and utilization charts on one image"""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(12, 8), dpi=100)
+    FigureCanvasAgg(fig)
+    (status_ax, usage_ax), (peak_ax, util_ax) = fig.subplots(2, 2)
+
+    stats = {k: v for k, v in report['booking_stats'].items() if k != 'total'}
+    status_ax.bar(list(stats), list(stats.values()), color=['#059669', '#F59E0B', '#DC2626', '#6B7280'])
+    status_ax.set_title('Booking Status')
+
+    usage = report['resource_usage']
+    usage_ax.bar(list(usage), list(usage.values()), color='#2563EB')
+    usage_ax.set_title('Approved Bookings by Classroom')
+    usage_ax.tick_params(axis='x', rotation=90, labelsize=7)
+
+    peak = dict(sorted(report['peak_hours'].items()))
+    peak_ax.plot(list(peak), list(peak.values()), marker='o', color='#2563EB')
+    peak_ax.set_title('Bookings by Start Hour')
+    peak_ax.grid(True, alpha=0.3)
+
+    window = report['utilization']['window']
+    rooms = report['utilization']['rooms']
+    util_ax.bar(list(rooms), list(rooms.values()), color='#0EA5E9')
+    util_ax.set_title(f"Utilization % Mon-Fri ({window['start']} - {window['end']})")
+    util_ax.tick_params(axis='x', rotation=90, labelsize=7)
+
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+# Format name -> (file extension, writer)
+FORMATS = {
+    'text': ('txt', write_text),
+    'csv': ('csv', write_csv),
+    'json': ('json', write_json),
+    'png': ('png', write_png),
+}
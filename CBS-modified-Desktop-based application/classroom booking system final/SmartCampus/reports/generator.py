@@ -0,0 +1,150 @@
+"""
+Report Generator Module
+
+Report data (booking statistics, room usage, peak hours, utilization)
+without any GUI dependency, so reports can be produced headlessly, e.g.
+by ``python -m reports``. The Qt chart widget lives in
+reports.usage_report.
+"""
+
+from datetime import datetime
+from database.db_setup import DatabaseManager
+from reports.utilization import UtilizationCube
+from reports.cache import report_cache
+from utils.time_utils import ordinal_to_date
+
+class ReportGenerator:
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+    
+    def get_summary(self):
+        """
+        Booking counts per room, status and start hour in one pass.
+        
+        Bookings are grouped in SQL by (room, status, hour) and the small
+        result is rolled up here, so the cost of a report does not depend on
+        the number of rooms or on loading bookings into Python. The result is
+        cached until bookings or classrooms change; do not modify it.
+        
+        Returns:
+            dict: 'rooms' -> [(id, room_number, room_type)] of active rooms,
+                  'by_status' -> {status: count},
+                  'by_room' -> {classroom_id: approved count},
+                  'by_room_all' -> {classroom_id: count of any status},
+                  'by_hour' -> {hour: approved count}
+        """
+        return report_cache.get('summary', ('bookings', 'classrooms'), self._compute_summary, self.db)
+    
+    def _compute_summary(self):
+        summary = {'rooms': [], 'by_status': {}, 'by_room': {}, 'by_room_all': {}, 'by_hour': {}}
+        results = self.db.execute_query('''
+            SELECT classroom_id, status, start_min / 60 AS hour, COUNT(*)
+            FROM bookings
+            GROUP BY classroom_id, status, hour
+        ''')
+        for classroom_id, status, hour, count in results or []:
+            by_status = summary['by_status']
+            by_status[status] = by_status.get(status, 0) + count
+            summary['by_room_all'][classroom_id] = summary['by_room_all'].get(classroom_id, 0) + count
+            if status == 1:
+                summary['by_room'][classroom_id] = summary['by_room'].get(classroom_id, 0) + count
+                if hour is not None:
+                    summary['by_hour'][hour] = summary['by_hour'].get(hour, 0) + count
+        
+        rooms = self.db.execute_query(
+            'SELECT id, room_number, room_type FROM classrooms WHERE status = 1 ORDER BY room_number')
+        summary['rooms'] = [tuple(row) for row in rooms] if rooms else []
+        return summary
+    
+    def get_totals(self):
+        """
+        Row counts for the dashboard cards, cached until one of the tables changes.
+        
+        Returns:
+            dict: 'bookings', 'classrooms' (active), 'users', 'schedules' (active)
+                  and 'capacity' (seats in active classrooms)
+        """
+        return report_cache.get('totals', ('bookings', 'classrooms', 'users', 'schedules'),
+                                self._compute_totals, self.db)
+    
+    def _compute_totals(self):
+        results = self.db.execute_query('''
+            SELECT (SELECT COUNT(*) FROM bookings),
+                   (SELECT COUNT(*) FROM classrooms WHERE status = 1),
+                   (SELECT COUNT(*) FROM users),
+                   (SELECT COUNT(*) FROM schedules WHERE status = 1),
+                   (SELECT COALESCE(SUM(capacity), 0) FROM classrooms WHERE status = 1)
+        ''')
+        values = tuple(results[0]) if results else (0, 0, 0, 0, 0)
+        return dict(zip(('bookings', 'classrooms', 'users', 'schedules', 'capacity'), values))
+    
+    def get_booking_stats(self, summary=None):
+        """Get booking statistics"""
+        by_status = (summary or self.get_summary())['by_status']
+        
+        stats = {
+            'total': sum(by_status.values()),
+            'approved': by_status.get(1, 0),
+            'pending': by_status.get(2, 0),
+            'rejected': by_status.get(3, 0),
+            'cancelled': by_status.get(0, 0),
+        }
+        
+        return stats
+    
+    def get_resource_usage(self, summary=None):
+        """Get approved bookings per active classroom"""
+        summary = summary or self.get_summary()
+        return {room_number: summary['by_room'].get(room_id, 0)
+                for room_id, room_number, _ in summary['rooms']}
+    
+    def get_peak_hours(self, summary=None):
+        """Get approved bookings per start hour, busiest first"""
+        by_hour = (summary or self.get_summary())['by_hour']
+        return {f"{hour:02d}:00": count
+                for hour, count in sorted(by_hour.items(), key=lambda x: (-x[1], x[0]))}
+    
+    def get_underutilized_rooms(self, threshold=2, summary=None):
+        """Get underutilized classrooms"""
+        summary = summary or self.get_summary()
+        underutilized = []
+        
+        for room_id, room_number, room_type in summary['rooms']:
+            count = summary['by_room'].get(room_id, 0)
+            if count <= threshold:
+                underutilized.append({
+                    'room': room_number,
+                    'type': room_type,
+                    'bookings': count
+                })
+        
+        return underutilized
+    
+    def build_report(self, start_date=None, end_date=None):
+        """
+        All report sections as plain data (JSON-serialisable).
+        
+        Args:
+            start_date/end_date: utilization window (default the last four weeks)
+        """
+        summary = self.get_summary()
+        cube = UtilizationCube.build(start_date, end_date, db=self.db)
+        return {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'booking_stats': self.get_booking_stats(summary),
+            'resource_usage': self.get_resource_usage(summary),
+            'peak_hours': self.get_peak_hours(summary),
+            'underutilized_rooms': self.get_underutilized_rooms(summary=summary),
+            'utilization': {
+                'window': {'start': ordinal_to_date(cube.first_ord), 'end': ordinal_to_date(cube.last_ord)},
+                'hours': round(cube.total() * 100, 1),
+                'seat_hours': round(cube.total(weighted=True) * 100, 1),
+                'rooms': cube.room_utilization(),
+                'underutilized': cube.underutilized(threshold=0.2),
+            },
+        }
+    
+    def export_report_to_text(self, filename='resource_report.txt', report=None):
+        """Export report to text file"""
+        from reports.formats import write_text
+        return write_text(report or self.build_report(), filename)
@@ -0,0 +1,254 @@
+"""
+Report Jobs Module
+
+The admin text/CSV reports as plain functions of a database, and a
+runner that produces several of them at once in a process pool. Each
+worker opens its own read-only connection, so a report pack neither
+blocks the GUI nor competes with it for the write lock, and independent
+reports run on separate cores.
+
+Example:
+    runner = ReportJobRunner(output_dir='reports_output')
+    manifest = runner.run(progress=lambda done, total, entry: print(done, total, entry['job']))
+    manifest['path']            # reports_output/report_pack_<timestamp>.json
+
+A job function takes (db, output_dir, stamp) and returns the paths it
+wrote; ``db`` only needs ``execute_query`` and ``db_path``.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from config import DB_PATH
+from database.db_setup import DatabaseManager, ReadOnlyDatabase
+from reports.generator import ReportGenerator
+from reports.export import export_tables
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'reports_output')
+
+
+def _header(f, title):
+    f.write("=" * 80 + "\n")
+    f.write("FATIMA JINNAH WOMEN UNIVERSITY\n")
+    f.write(f"{title}\n")
+    f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    f.write("=" * 80 + "\n\n")
+
+
+def comprehensive_report(db, output_dir, stamp):
+    """Booking statistics, room usage, classroom and teacher information"""
+    path = os.path.join(output_dir, f"comprehensive_report_{stamp}.txt")
+    report_gen = ReportGenerator(db)
+    summary = report_gen.get_summary()
+    stats = report_gen.get_booking_stats(summary)
+    with open(path, 'w', encoding='utf-8') as f:
+        _header(f, "Smart Campus Resource Management System - Comprehensive Report")
+
+        f.write("1. BOOKING STATISTICS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"Total Bookings: {stats['total']}\n")
+        f.write(f"Approved: {stats['approved']}\n")
+        f.write(f"Pending: {stats['pending']}\n")
+        f.write(f"Rejected: {stats['rejected']}\n")
+        f.write(f"Cancelled: {stats['cancelled']}\n\n")
+
+        f.write("2. CLASSROOM RESOURCE USAGE\n")
+        f.write("-" * 80 + "\n")
+        for classroom, count in report_gen.get_resource_usage(summary).items():
+            f.write(f"{classroom}: {count} bookings\n")
+        f.write("\n")
+
+        f.write("3. CLASSROOM INFORMATION\n")
+        f.write("-" * 80 + "\n")
+        for room_number, room_type, building, floor, capacity in db.execute_query(
+                'SELECT room_number, room_type, building, floor, capacity FROM classrooms '
+                'WHERE status = 1 ORDER BY room_number') or []:
+            f.write(f"Room {room_number}:\n")
+            f.write(f"  Type: {room_type}\n")
+            f.write(f"  Building: {building}\n")
+            f.write(f"  Floor: {floor}\n")
+            f.write(f"  Capacity: {capacity}\n\n")
+
+        f.write("4. TEACHER INFORMATION\n")
+        f.write("-" * 80 + "\n")
+        for fullname, email, phone in db.execute_query(
+                'SELECT fullname, email, phone FROM users WHERE role = 2') or []:
+            f.write(f"{fullname}:\n")
+            f.write(f"  Email: {email}\n")
+            f.write(f"  Phone: {phone}\n\n")
+
+        f.write("=" * 80 + "\n")
+        f.write("End of Report\n")
+        f.write("=" * 80 + "\n")
+    return [path]
+
+
+def resource_usage_report(db, output_dir, stamp):
+    """Approved bookings per classroom"""
+    path = os.path.join(output_dir, f"resource_usage_report_{stamp}.txt")
+    usage = ReportGenerator(db).get_resource_usage()
+    with open(path, 'w', encoding='utf-8') as f:
+        _header(f, "Classroom Resource Usage Report")
+        f.write("CLASSROOM RESOURCE USAGE STATISTICS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"{'Classroom':<20} {'Bookings':<15}\n")
+        f.write("-" * 80 + "\n")
+        for classroom, count in sorted(usage.items()):
+            f.write(f"{classroom:<20} {count:<15}\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"{'TOTAL':<20} {sum(usage.values()):<15}\n")
+        f.write("=" * 80 + "\n")
+    return [path]
+
+
+def booking_statistics_report(db, output_dir, stamp):
+    """Bookings per status with approval and pending rates"""
+    path = os.path.join(output_dir, f"booking_statistics_{stamp}.txt")
+    stats = ReportGenerator(db).get_booking_stats()
+    with open(path, 'w', encoding='utf-8') as f:
+        _header(f, "Booking Statistics Report")
+        f.write("BOOKING STATISTICS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"Total Bookings:    {stats['total']}\n")
+        f.write(f"Approved:          {stats['approved']}\n")
+        f.write(f"Pending:           {stats['pending']}\n")
+        f.write(f"Rejected:          {stats['rejected']}\n")
+        f.write(f"Cancelled:         {stats['cancelled']}\n")
+        f.write("-" * 80 + "\n")
+        if stats['total'] > 0:
+            f.write(f"\nApproval Rate:     {(stats['approved'] / stats['total'] * 100):.1f}%\n")
+            f.write(f"Pending Rate:      {(stats['pending'] / stats['total'] * 100):.1f}%\n")
+        f.write("=" * 80 + "\n")
+    return [path]
+
+
+def teacher_schedule_report(db, output_dir, stamp):
+    """Weekly classes of every teacher"""
+    path = os.path.join(output_dir, f"teacher_schedule_{stamp}.txt")
+    teachers = db.execute_query('SELECT id, fullname FROM users WHERE role = 2 ORDER BY fullname') or []
+    # One query for all teachers instead of one per teacher
+    classes = {}
+    for row in db.execute_query('''
+        SELECT s.teacher_id, s.course_name, s.day_of_week, s.start_time, s.end_time, c.room_number
+        FROM schedules s JOIN classrooms c ON s.classroom_id = c.id
+        ORDER BY s.teacher_id, s.weekday, s.start_min
+    ''') or []:
+        classes.setdefault(row[0], []).append(tuple(row[1:]))
+
+    with open(path, 'w', encoding='utf-8') as f:
+        _header(f, "Teacher Schedule Report")
+        f.write("TEACHER SCHEDULES\n")
+        f.write("-" * 80 + "\n\n")
+        for teacher_id, teacher_name in teachers:
+            f.write(f"Teacher: {teacher_name}\n")
+            f.write("-" * 60 + "\n")
+            if teacher_id in classes:
+                for course, day, start, end, room in classes[teacher_id]:
+                    f.write(f"  {day:<12} {start}-{end}  {room:<8}  {course}\n")
+            else:
+                f.write("  No schedules assigned\n")
+            f.write("\n")
+        f.write("=" * 80 + "\n")
+    return [path]
+
+
+def data_export(db, output_dir, stamp):
+    """Classrooms, teachers and schedules as CSV files"""
+    return export_tables(['classrooms', 'teachers', 'schedules'], output_dir, stamp, 'csv', db.db_path)
+
+
+# Job name -> (title, function), in the order a report pack lists them
+REPORT_JOBS = {
+    'comprehensive': ("Comprehensive Report", comprehensive_report),
+    'resource_usage': ("Resource Usage Report", resource_usage_report),
+    'booking_statistics': ("Booking Statistics", booking_statistics_report),
+    'teacher_schedule': ("Teacher Schedule Report", teacher_schedule_report),
+    'data_export': ("Data Export (CSV)", data_export),
+}
+
+
+def run_job(name, db_path, output_dir, stamp):
+    """Worker entry point: one job on its own read-only connection"""
+    started = time.perf_counter()
+    db = ReadOnlyDatabase(db_path)
+    try:
+        paths = REPORT_JOBS[name][1](db, output_dir, stamp)
+    finally:
+        db.close()
+    return {
+        'job': name,
+        'title': REPORT_JOBS[name][0],
+        'files': [os.path.basename(path) for path in paths],
+        'seconds': round(time.perf_counter() - started, 3),
+        'pid': os.getpid(),
+    }
+
+
+class ReportJobRunner:
+    """Runs report jobs in a process pool and writes a JSON manifest of the outputs"""
+
+    def __init__(self, jobs=None, output_dir=DEFAULT_OUTPUT, db_path=DB_PATH, workers=None):
+        self.jobs = list(jobs or REPORT_JOBS)
+        unknown = [name for name in self.jobs if name not in REPORT_JOBS]
+        if unknown:
+            raise ValueError(f"Unknown report jobs: {', '.join(unknown)}")
+        self.output_dir = output_dir
+        self.db_path = db_path
+        self.workers = max(1, min(workers or os.cpu_count() or 1, len(self.jobs)))
+
+    def run(self, progress=None, cancelled=None):
+        """
+        Run every job and write the manifest.
+
+        Args:
+            progress: called as progress(done, total, entry) after each job,
+                      from the thread that called run()
+            cancelled: callable returning True to stop; queued jobs are
+                       dropped, running ones finish
+
+        Returns:
+            dict: the manifest; 'jobs' has one entry per job with 'files'
+                  or 'error', and 'path' is where it was written
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Create or migrate the schema once, here; the workers only read
+        DatabaseManager(self.db_path)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        started = time.perf_counter()
+        entries = {}
+
+        # spawn, not fork: the caller may be the Qt GUI process
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as pool:
+            futures = {pool.submit(run_job, name, self.db_path, self.output_dir, stamp): name
+                       for name in self.jobs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    entries[name] = future.result()
+                except Exception as e:
+                    entries[name] = {'job': name, 'title': REPORT_JOBS[name][0], 'error': str(e)}
+                if progress:
+                    progress(len(entries), len(self.jobs), entries[name])
+                if cancelled and cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+
+        manifest = {
+            'generated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'database': os.path.abspath(self.db_path),
+            'output_dir': os.path.abspath(self.output_dir),
+            'workers': self.workers,
+            'seconds': round(time.perf_counter() - started, 3),
+            'jobs': [entries.get(name, {'job': name, 'title': REPORT_JOBS[name][0], 'cancelled': True})
+                     for name in self.jobs],
+        }
+        manifest['path'] = os.path.join(self.output_dir, f"report_pack_{stamp}.json")
+        with open(manifest['path'], 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
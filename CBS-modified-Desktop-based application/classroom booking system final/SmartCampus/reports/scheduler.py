@@ -0,0 +1,395 @@
+"""
+Report Scheduler Module
+
+Runs the reports configured in ``config.REPORT_SCHEDULES`` on their
+cadence. Every run is recorded in ``report_runs`` with the ``change_log``
+sequence it covers, and the next run of the schedule starts from there,
+so it knows exactly what changed in between. A run writes:
+
+- the full report, and
+- a delta of what changed since the schedule's previous run.
+
+A run whose source tables did not change writes nothing and points at
+the previous full report.
+
+The daily summary (bookings and booked hours per day, room and status)
+is kept in the ``daily_summary`` table and updated from the journal:
+only the days of bookings changed since the last refresh are recomputed,
+so a run costs the same however many years of bookings there are.
+After each run, ``change_log`` entries that every schedule and
+incremental table has consumed are pruned, so the journal stays small.
+
+Example:
+    scheduler = ReportScheduler()
+    for run in scheduler.run_due():
+        print(run['schedule'], run['status'], run['full_files'], run['delta_file'])
+
+From cron, in the SmartCampus directory:
+    */15 * * * * python -m reports --scheduled
+"""
+
+import csv
+import json
+import os
+from datetime import datetime, timedelta
+
+from config import DB_PATH, BOOKING_STATUS, REPORT_SCHEDULES
+from database.db_setup import DatabaseManager, ReadOnlyDatabase
+from reports.jobs import REPORT_JOBS, DEFAULT_OUTPUT
+from utils.time_utils import ordinal_to_date
+
+# Tables each report reads; a run where none of them changed is skipped
+REPORT_TABLES = {
+    'daily_summary': ('bookings', 'classrooms'),
+    'comprehensive': ('bookings', 'classrooms', 'users'),
+    'resource_usage': ('bookings', 'classrooms'),
+    'booking_statistics': ('bookings',),
+    'teacher_schedule': ('users', 'schedules', 'classrooms'),
+    'data_export': ('classrooms', 'users', 'schedules'),
+}
+
+CADENCES = ('hour', 'day', 'week')
+
+# A run still 'running' after this long died with its process
+STALE_RUN = timedelta(hours=1)
+
+# Run times are local, like the cadence ('at') they are compared with;
+# CURRENT_TIMESTAMP would be UTC
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Values per IN (...) list
+CHUNK = 500
+
+SUMMARY_SELECT = '''
+    SELECT date_ord, classroom_id, status, COUNT(*), COALESCE(SUM(end_min - start_min), 0)
+    FROM bookings
+    WHERE date_ord IS NOT NULL AND classroom_id IS NOT NULL AND status IS NOT NULL
+'''
+SUMMARY_HEADER = ['date', 'room', 'status', 'bookings', 'hours']
+
+
+def _marks(values):
+    return ', '.join('?' for _ in values)
+
+
+def _refresh_daily_summary(conn):
+    """Bring daily_summary up to the last change; ``conn`` must hold the write lock"""
+    seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+    state = conn.execute("SELECT seq FROM report_state WHERE name = 'daily_summary'").fetchone()
+    if state is None:
+        for table in ('daily_summary', 'daily_summary_rows', 'daily_summary_days'):
+            conn.execute(f'DELETE FROM {table}')
+        conn.execute(f'INSERT INTO daily_summary {SUMMARY_SELECT} GROUP BY date_ord, classroom_id, status')
+        conn.execute('INSERT INTO daily_summary_rows SELECT id, date_ord FROM bookings')
+        conn.execute("INSERT INTO report_state (name, base_seq, seq) VALUES ('daily_summary', ?, ?)", (seq, seq))
+        return seq
+    if state[0] >= seq:
+        return seq
+
+    changed = conn.execute('''
+        SELECT row_id, MAX(seq) FROM change_log
+        WHERE table_name = 'bookings' AND seq > ? AND seq <= ?
+        GROUP BY row_id
+    ''', (state[0], seq)).fetchall()
+    # (change seq, day) for the old and the new day of every changed booking
+    touched = set()
+    for i in range(0, len(changed), CHUNK):
+        last_change = {row[0]: row[1] for row in changed[i:i + CHUNK]}
+        ids = list(last_change)
+        for query in ('SELECT booking_id, date_ord FROM daily_summary_rows WHERE booking_id IN ({})',
+                      'SELECT id, date_ord FROM bookings WHERE id IN ({})'):
+            touched.update((last_change[row[0]], row[1])
+                           for row in conn.execute(query.format(_marks(ids)), ids) if row[1] is not None)
+        conn.execute(f'DELETE FROM daily_summary_rows WHERE booking_id IN ({_marks(ids)})', ids)
+        conn.execute(f'INSERT INTO daily_summary_rows SELECT id, date_ord FROM bookings '
+                     f'WHERE id IN ({_marks(ids)})', ids)
+
+    days = sorted({day for _, day in touched})
+    for i in range(0, len(days), CHUNK):
+        chunk = days[i:i + CHUNK]
+        conn.execute(f'DELETE FROM daily_summary WHERE date_ord IN ({_marks(chunk)})', chunk)
+        conn.execute(f'INSERT INTO daily_summary {SUMMARY_SELECT} AND date_ord IN ({_marks(chunk)}) '
+                     f'GROUP BY date_ord, classroom_id, status', chunk)
+    conn.executemany('INSERT OR IGNORE INTO daily_summary_days (seq, date_ord) VALUES (?, ?)', sorted(touched))
+    conn.execute("UPDATE report_state SET seq = ? WHERE name = 'daily_summary'", (seq,))
+    return seq
+
+
+def refresh_daily_summary(db=None):
+    """
+    Update daily_summary from change_log.
+
+    The first call builds it from all bookings; later calls recompute
+    only the days of bookings changed since.
+
+    Returns:
+        int: change sequence the summary is at
+    """
+    db = db or DatabaseManager()
+    with db.transaction() as conn:
+        return _refresh_daily_summary(conn)
+
+
+def _room_numbers(db):
+    return {row[0]: row[1] for row in db.execute_query('SELECT id, room_number FROM classrooms') or []}
+
+
+def _summary_row(room_numbers, dates, date_ord, classroom_id, status, bookings, minutes):
+    # Rows come grouped by day, so each date string is formatted once
+    day = dates.get(date_ord)
+    if day is None:
+        day = dates[date_ord] = ordinal_to_date(date_ord)
+    return [day, room_numbers.get(classroom_id, 'Unknown'), BOOKING_STATUS.get(status, 'Unknown'),
+            bookings, round(minutes / 60.0, 2)]
+
+
+def write_daily_summary(db, path):
+    """Every day of daily_summary as CSV"""
+    rooms, dates = _room_numbers(db), {}
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        writer.writerows(_summary_row(rooms, dates, *row) for row in db.conn.execute(
+            'SELECT date_ord, classroom_id, status, bookings, minutes FROM daily_summary '
+            'ORDER BY date_ord, classroom_id, status'))
+    return path
+
+
+def write_daily_summary_delta(db, path, from_seq, to_seq):
+    """
+    Days whose bookings changed after from_seq, up to to_seq, as CSV.
+
+    Each listed day replaces that day in the previous output; a day left
+    without bookings is one row with an empty room and zero bookings.
+    """
+    days = [row[0] for row in db.conn.execute(
+        'SELECT DISTINCT date_ord FROM daily_summary_days WHERE seq > ? AND seq <= ? ORDER BY date_ord',
+        (from_seq, to_seq))]
+    rooms, dates = _room_numbers(db), {}
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADER)
+        for i in range(0, len(days), CHUNK):
+            chunk = days[i:i + CHUNK]
+            rows = {}
+            for row in db.conn.execute(
+                    f'SELECT date_ord, classroom_id, status, bookings, minutes FROM daily_summary '
+                    f'WHERE date_ord IN ({_marks(chunk)}) ORDER BY date_ord, classroom_id, status', chunk):
+                rows.setdefault(row[0], []).append(_summary_row(rooms, dates, *row))
+            for day in chunk:
+                writer.writerows(rows.get(day) or [[ordinal_to_date(day), '', '', 0, 0]])
+    return path
+
+
+def count_changes(db, tables, from_seq, to_seq):
+    """change_log entries of ``tables`` after from_seq, up to to_seq"""
+    return db.execute_query(
+        f'SELECT COUNT(*) FROM change_log WHERE seq > ? AND seq <= ? AND table_name IN ({_marks(tables)})',
+        (from_seq, to_seq) + tuple(tables))[0][0]
+
+
+def write_changes(db, path, tables, from_seq, to_seq):
+    """Rows of ``tables`` changed after from_seq, up to to_seq, with the last operation on each, as CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['table', 'row_id', 'op', 'changed_at'])
+        writer.writerows(tuple(row) for row in db.conn.execute(f'''
+            SELECT table_name, row_id, op, changed_at FROM change_log
+            WHERE seq IN (SELECT MAX(seq) FROM change_log
+                          WHERE seq > ? AND seq <= ? AND table_name IN ({_marks(tables)})
+                          GROUP BY table_name, row_id)
+            ORDER BY seq
+        ''', (from_seq, to_seq) + tuple(tables)))
+    return path
+
+
+def slot_start(schedule, now):
+    """Start of the cadence period ``now`` is in; a schedule runs once per period"""
+    every = schedule.get('every', 'day')
+    if every == 'hour':
+        return now.replace(minute=0, second=0, microsecond=0)
+    hour, minute = (int(part) for part in schedule.get('at', '00:00').split(':'))
+    start = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    step = timedelta(days=1)
+    if every == 'week':
+        start -= timedelta(days=now.weekday())
+        step = timedelta(weeks=1)
+    return start - step if start > now else start
+
+
+def _run_dict(row):
+    run = dict(row)
+    run['full_files'] = json.loads(run['full_files']) if run['full_files'] else []
+    return run
+
+
+class ReportScheduler:
+    """Runs scheduled reports and records each run in report_runs"""
+
+    def __init__(self, schedules=None, output_dir=DEFAULT_OUTPUT, db_path=DB_PATH):
+        self.schedules = {}
+        for schedule in REPORT_SCHEDULES if schedules is None else schedules:
+            name = schedule['name']
+            if schedule['report'] not in REPORT_TABLES:
+                raise ValueError(f"Unknown report {schedule['report']!r} in schedule {name!r}")
+            if schedule.get('every', 'day') not in CADENCES:
+                raise ValueError(f"Unknown cadence {schedule['every']!r} in schedule {name!r}")
+            if name in self.schedules:
+                raise ValueError(f"Duplicate schedule {name!r}")
+            self.schedules[name] = schedule
+        self.output_dir = output_dir
+        self.db = DatabaseManager(db_path)
+
+    def last_run(self, name):
+        """Last successful ('done' or 'unchanged') run of a schedule, or None"""
+        rows = self.db.execute_query('''
+            SELECT * FROM report_runs WHERE schedule = ? AND status IN ('done', 'unchanged')
+            ORDER BY id DESC LIMIT 1
+        ''', (name,))
+        return _run_dict(rows[0]) if rows else None
+
+    def history(self, name=None, limit=20):
+        """Most recent runs, of one schedule or of all"""
+        if name:
+            rows = self.db.execute_query('SELECT * FROM report_runs WHERE schedule = ? ORDER BY id DESC LIMIT ?',
+                                         (name, limit))
+        else:
+            rows = self.db.execute_query('SELECT * FROM report_runs ORDER BY id DESC LIMIT ?', (limit,))
+        return [_run_dict(row) for row in rows or []]
+
+    def due(self, now=None):
+        """Names of the schedules that have not run in their current period"""
+        now = now or datetime.now()
+        names = []
+        for name, schedule in self.schedules.items():
+            last = self.last_run(name)
+            if last is None or last['started_at'] < slot_start(schedule, now).strftime(TIME_FORMAT):
+                names.append(name)
+        return names
+
+    def run_due(self, now=None):
+        """Run every due schedule; returns the runs made"""
+        now = now or datetime.now()
+        runs = (self.run(name, now, force=False) for name in self.due(now))
+        return [run for run in runs if run]
+
+    def _claim(self, name, now, force):
+        """Record a 'running' run, unless it is not due or already running elsewhere"""
+        schedule = self.schedules[name]
+        with self.db.transaction() as conn:
+            conn.execute('''
+                UPDATE report_runs SET status = 'failed', error = 'Interrupted'
+                WHERE schedule = ? AND status = 'running' AND started_at <= ?
+            ''', (name, (now - STALE_RUN).strftime(TIME_FORMAT)))
+            if conn.execute("SELECT 1 FROM report_runs WHERE schedule = ? AND status = 'running'",
+                            (name,)).fetchone():
+                return None
+            previous = conn.execute('''
+                SELECT * FROM report_runs WHERE schedule = ? AND status IN ('done', 'unchanged')
+                ORDER BY id DESC LIMIT 1
+            ''', (name,)).fetchone()
+            if not force and previous and previous['started_at'] >= slot_start(schedule, now).strftime(TIME_FORMAT):
+                return None
+            if schedule['report'] == 'daily_summary':
+                to_seq = _refresh_daily_summary(conn)
+            else:
+                to_seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+            from_seq = previous['to_seq'] if previous else 0
+            cursor = conn.execute('''
+                INSERT INTO report_runs (schedule, report, from_seq, to_seq, status, started_at)
+                VALUES (?, ?, ?, ?, 'running', ?)
+            ''', (name, schedule['report'], from_seq, to_seq, now.strftime(TIME_FORMAT)))
+            return cursor.lastrowid, from_seq, to_seq, previous and _run_dict(previous)
+
+    def run(self, name, now=None, force=True):
+        """
+        Run one schedule.
+
+        Args:
+            force: run even if the schedule already ran in its current period
+
+        Returns:
+            dict: the report_runs entry ('full_files', 'delta_file', 'status'
+                  'done', 'unchanged' or 'failed'), or None if it was not due
+                  or is being run by another process
+        """
+        now = now or datetime.now()
+        claim = self._claim(name, now, force)
+        if claim is None:
+            return None
+        run_id, from_seq, to_seq, previous = claim
+        report = self.schedules[name]['report']
+        tables = REPORT_TABLES[report]
+        status, changes, full_files, delta_file, error = 'failed', 0, [], None, None
+        try:
+            db = ReadOnlyDatabase(self.db.db_path)
+            try:
+                changes = count_changes(db, tables, from_seq, to_seq)
+                if previous and not changes and all(os.path.exists(path) for path in previous['full_files']):
+                    status, full_files = 'unchanged', previous['full_files']
+                else:
+                    output_dir = os.path.join(self.output_dir, 'scheduled', name)
+                    os.makedirs(output_dir, exist_ok=True)
+                    stamp = now.strftime('%Y%m%d_%H%M%S')
+                    if report == 'daily_summary':
+                        full_files = [write_daily_summary(db, os.path.join(output_dir, f"daily_summary_{stamp}.csv"))]
+                        base_seq = db.execute_query(
+                            "SELECT base_seq FROM report_state WHERE name = 'daily_summary'")[0][0]
+                        # Days changed before the summary was (re)built are not journaled
+                        if previous and from_seq >= base_seq:
+                            delta_file = write_daily_summary_delta(
+                                db, os.path.join(output_dir, f"daily_summary_delta_{stamp}.csv"), from_seq, to_seq)
+                    else:
+                        full_files = REPORT_JOBS[report][1](db, output_dir, stamp)
+                        if previous:
+                            delta_file = write_changes(db, os.path.join(output_dir, f"changes_{stamp}.csv"),
+                                                       tables, from_seq, to_seq)
+                    status = 'done'
+            finally:
+                db.close()
+        except Exception as e:
+            print(f"Scheduled report error: {e}")
+            error = str(e)
+
+        self.db.execute_update('''
+            UPDATE report_runs SET status = ?, changes = ?, full_files = ?, delta_file = ?, error = ?,
+                                   finished_at = ?
+            WHERE id = ?
+        ''', (status, changes, json.dumps(full_files), delta_file, error,
+              datetime.now().strftime(TIME_FORMAT), run_id))
+        if status == 'done' and report == 'daily_summary':
+            self._prune_summary_days()
+        if status != 'failed':
+            self._prune_change_log()
+        return _run_dict(self.db.execute_query('SELECT * FROM report_runs WHERE id = ?', (run_id,))[0])
+
+    def _prune_summary_days(self):
+        """Drop journaled days every daily summary schedule has already covered"""
+        covered = []
+        for name, schedule in self.schedules.items():
+            if schedule['report'] == 'daily_summary':
+                last = self.last_run(name)
+                if last is None:
+                    return
+                covered.append(last['to_seq'])
+        self.db.execute_update('DELETE FROM daily_summary_days WHERE seq <= ?', (min(covered),))
+
+    def _prune_change_log(self):
+        """
+        Drop journal entries that no schedule or incremental table still needs.
+
+        Everything up to the oldest of the schedules' last to_seq and the
+        report_state sequences has been consumed. The newest entry of each
+        table is kept, since MAX(seq) per table is that table's version.
+        """
+        covered = [row[0] for row in self.db.execute_query('SELECT seq FROM report_state') or []]
+        for name in self.schedules:
+            last = self.last_run(name)
+            if last is not None:
+                covered.append(last['to_seq'])
+        if not covered:
+            return
+        self.db.execute_update('''
+            DELETE FROM change_log
+            WHERE seq <= ? AND seq NOT IN (SELECT MAX(seq) FROM change_log GROUP BY table_name)
+        ''', (min(covered),))
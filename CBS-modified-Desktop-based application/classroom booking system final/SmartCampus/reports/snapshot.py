@@ -0,0 +1,230 @@
+"""
+Columnar Snapshot Module
+
+Writes bookings, schedules and rooms as typed NumPy columns for offline
+analysis: integer dates (ordinal days), minutes since midnight, status
+codes, and strings (courses, rooms, semesters, room types, buildings)
+dictionary-encoded as int32 codes into shared dictionaries.
+
+A snapshot is a directory of plain ``.npy`` files plus manifest.json.
+``.npy`` files can be memory-mapped, so loading years of history is
+instant and only the columns an analysis touches are read from disk.
+A compressed ``.npz`` is also supported for sending a snapshot around,
+but zip members cannot be memory-mapped: loading it decompresses every
+column into memory.
+
+Example:
+    write_snapshot('snapshots/2026-10-19')
+    snap = load_snapshot('snapshots/2026-10-19')
+    b = snap['bookings']
+    approved = b['status'] == 1
+    np.bincount(b['classroom_id'][approved])
+    snap.decode('bookings', 'course')[:5]       # array of course names
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from config import DB_PATH
+from database.db_setup import ReadOnlyDatabase
+
+SNAPSHOT_VERSION = 1
+CHUNK_ROWS = 50000
+
+# Table -> (source table, [(column, SQL expression, dtype, dictionary)]).
+# NULLs become -1 (NaT for timestamps, '' for dictionary columns).
+SNAPSHOT_TABLES = {
+    'bookings': ('bookings', [
+        ('id', 'id', 'int64', None),
+        ('user_id', 'user_id', 'int32', None),
+        ('classroom_id', 'classroom_id', 'int32', None),
+        ('date_ord', 'date_ord', 'int32', None),
+        ('start_min', 'start_min', 'int16', None),
+        ('end_min', 'end_min', 'int16', None),
+        ('status', 'status', 'int8', None),
+        ('series_id', 'series_id', 'int32', None),
+        ('created_at', "CAST(strftime('%s', created_at) AS INTEGER)", 'datetime64[s]', None),
+        ('course', 'course_name', 'int32', 'course'),
+    ]),
+    'schedules': ('schedules', [
+        ('id', 'id', 'int64', None),
+        ('teacher_id', 'teacher_id', 'int32', None),
+        ('classroom_id', 'classroom_id', 'int32', None),
+        ('weekday', 'weekday', 'int8', None),
+        ('start_min', 'start_min', 'int16', None),
+        ('end_min', 'end_min', 'int16', None),
+        ('status', 'status', 'int8', None),
+        ('course', 'course_name', 'int32', 'course'),
+        ('semester', 'semester', 'int32', 'semester'),
+    ]),
+    'rooms': ('classrooms', [
+        ('id', 'id', 'int64', None),
+        ('room', 'room_number', 'int32', 'room'),
+        ('room_type', 'room_type', 'int32', 'room_type'),
+        ('building', 'building', 'int32', 'building'),
+        ('floor', 'floor', 'int16', None),
+        ('capacity', 'capacity', 'int32', None),
+        ('status', 'status', 'int8', None),
+    ]),
+}
+
+
+def _read_table(db, source, columns, dictionaries):
+    """Column arrays of one table, read in id order CHUNK_ROWS at a time"""
+    rows = db.execute_query(f'SELECT COUNT(*) FROM {source}')[0][0]
+    arrays = {name: np.empty(rows, dtype='int64' if dtype.startswith('datetime') else dtype)
+              for name, _, dtype, _ in columns}
+    query = (f"SELECT id, {', '.join(expr for _, expr, _, _ in columns)} FROM {source} "
+             f"WHERE id > ? ORDER BY id LIMIT ?")
+    filled, last = 0, -1
+    while filled < rows:
+        chunk = db.execute_query(query, (last, CHUNK_ROWS))
+        if not chunk:
+            break
+        count = min(len(chunk), rows - filled)
+        chunk = chunk[:count]
+        last = chunk[-1][0]
+        for i, (name, _, dtype, dictionary) in enumerate(columns, start=1):
+            values = [row[i] for row in chunk]
+            if dictionary:
+                codes = dictionaries.setdefault(dictionary, {})
+                values = [-1 if v is None else codes.setdefault(str(v), len(codes)) for v in values]
+            else:
+                null = np.iinfo(np.int64).min if dtype.startswith('datetime') else -1
+                values = [null if v is None else v for v in values]
+            arrays[name][filled:filled + count] = values
+        filled += count
+
+    for name, _, dtype, _ in columns:
+        arrays[name] = arrays[name][:filled]
+        if dtype.startswith('datetime'):
+            arrays[name] = arrays[name].view(dtype)
+    return arrays
+
+
+def write_snapshot(path, db_path=DB_PATH, compressed=False):
+    """
+    Write a snapshot of the database.
+
+    Args:
+        path: directory to create (replaced if it exists), or a file name
+              ending in .npz when ``compressed``
+        compressed: write one compressed .npz instead (not memory-mappable)
+
+    Returns:
+        dict: the manifest
+    """
+    db = ReadOnlyDatabase(db_path)
+    try:
+        change_seq = db.execute_query('SELECT COALESCE(MAX(seq), 0) FROM change_log')[0][0]
+        dictionaries, tables = {}, {}
+        for table, (source, columns) in SNAPSHOT_TABLES.items():
+            tables[table] = _read_table(db, source, columns, dictionaries)
+    finally:
+        db.close()
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'change_seq': change_seq,
+        'tables': {table: {'rows': len(next(iter(arrays.values()))),
+                           'columns': {name: {'dtype': dtype, 'dictionary': dictionary}
+                                       for name, _, dtype, dictionary in SNAPSHOT_TABLES[table][1]}}
+                   for table, arrays in tables.items()},
+        'dictionaries': {name: len(codes) for name, codes in dictionaries.items()},
+    }
+    # Codes were assigned in first-seen order, so the dictionary is the keys in order
+    values = {name: np.array(list(codes) or [''], dtype=str) for name, codes in dictionaries.items()}
+
+    if compressed:
+        members = {f'{table}/{name}': array for table, arrays in tables.items() for name, array in arrays.items()}
+        members.update({f'dictionaries/{name}': array for name, array in values.items()})
+        members['manifest'] = np.array(json.dumps(manifest))
+        tmp = path + '.tmp.npz'
+        np.savez_compressed(tmp, **members)
+        os.replace(tmp, path)
+        return manifest
+
+    tmp = path.rstrip(os.sep) + '.tmp'
+    if os.path.exists(tmp):
+        shutil.rmtree(tmp)
+    for table, arrays in tables.items():
+        os.makedirs(os.path.join(tmp, table))
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, table, f'{name}.npy'), array)
+    os.makedirs(os.path.join(tmp, 'dictionaries'))
+    for name, array in values.items():
+        np.save(os.path.join(tmp, 'dictionaries', f'{name}.npy'), array)
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp, path)
+    return manifest
+
+
+class Snapshot:
+    """Loaded snapshot: ``snap[table][column]`` is a NumPy array"""
+
+    def __init__(self, manifest, tables, dictionaries):
+        self.manifest = manifest
+        self.tables = tables
+        self.dictionaries = dictionaries
+
+    def __getitem__(self, table):
+        return self.tables[table]
+
+    @property
+    def change_seq(self):
+        """change_log sequence the snapshot was taken at"""
+        return self.manifest['change_seq']
+
+    def decode(self, table, column):
+        """Strings of a dictionary-encoded column ('' for NULL)"""
+        dictionary = self.manifest['tables'][table]['columns'][column]['dictionary']
+        if dictionary is None:
+            raise ValueError(f"{table}.{column} is not dictionary-encoded")
+        codes = self.tables[table][column]
+        values = self.dictionaries[dictionary]
+        return np.where(codes >= 0, values[np.clip(codes, 0, None)], '')
+
+    def code(self, dictionary, value):
+        """Code of a string in a dictionary, or -1 if it does not occur"""
+        found = np.flatnonzero(self.dictionaries[dictionary] == value)
+        return int(found[0]) if len(found) else -1
+
+
+def load_snapshot(path, mmap=True):
+    """
+    Open a snapshot written by ``write_snapshot``.
+
+    Args:
+        path: snapshot directory, or a .npz file
+        mmap: memory-map the .npy columns (directory snapshots only)
+
+    Returns:
+        Snapshot
+    """
+    if path.endswith('.npz'):
+        with np.load(path) as archive:
+            manifest = json.loads(str(archive['manifest']))
+            tables = {table: {name: archive[f'{table}/{name}'] for name in info['columns']}
+                      for table, info in manifest['tables'].items()}
+            dictionaries = {name: archive[f'dictionaries/{name}'] for name in manifest['dictionaries']}
+        return Snapshot(manifest, tables, dictionaries)
+
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {manifest.get('version')}")
+    mode = 'r' if mmap else None
+    tables = {table: {name: np.load(os.path.join(path, table, f'{name}.npy'), mmap_mode=mode)
+                      for name in info['columns']}
+              for table, info in manifest['tables'].items()}
+    dictionaries = {name: np.load(os.path.join(path, 'dictionaries', f'{name}.npy'), mmap_mode=mode)
+                    for name in manifest['dictionaries']}
+    return Snapshot(manifest, tables, dictionaries)
@@ -0,0 +1,107 @@
+"""
+Booking Trends Module
+
+Counts of bookings per time bucket (day, week, month or weekday) over a
+date window. SQL groups the window's bookings by ordinal day, so only
+one row per day with bookings comes back, and np.bincount folds the days
+into the requested buckets. The cost follows the window length, not the
+size of the booking history. Daily counts are cached (see reports.cache)
+until the bookings table changes.
+
+Example:
+    trend = bucket_bookings('2026-09-01', '2026-12-31', by='week')
+    for label, count in zip(trend.labels, trend.counts):
+        print(label, count)
+"""
+
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from database.db_setup import DatabaseManager
+from reports.cache import report_cache
+from utils.time_utils import date_to_ordinal, ordinal_to_date, WEEK_DAYS
+
+BUCKETS = ('day', 'week', 'month', 'weekday')
+
+
+class Buckets(namedtuple('Buckets', 'labels counts')):
+    """Bucket labels and their booking counts, in time order"""
+
+    __slots__ = ()
+
+    def as_dict(self):
+        """Label -> count"""
+        return dict(zip(self.labels, self.counts.tolist()))
+
+
+def daily_counts(start_date, end_date, statuses=None, db=None):
+    """
+    Bookings per day of a window (inclusive).
+
+    Args:
+        statuses: booking statuses to count (default all)
+
+    Returns:
+        tuple: (first ordinal day, np.ndarray of counts, one per day)
+    """
+    db = db or DatabaseManager()
+    first, last = date_to_ordinal(start_date), date_to_ordinal(end_date)
+    if last < first:
+        raise ValueError("Window ends before it starts")
+    if statuses is not None:
+        statuses = tuple(statuses)
+    return report_cache.get(('daily_counts', first, last, statuses), ('bookings',),
+                            lambda: _daily_counts(first, last, statuses, db), db)
+
+
+def _daily_counts(first, last, statuses, db):
+    query = 'SELECT date_ord, COUNT(*) FROM bookings WHERE date_ord BETWEEN ? AND ?'
+    params = [first, last]
+    if statuses is not None:
+        query += f" AND status IN ({', '.join('?' for _ in statuses)})"
+        params += list(statuses)
+    rows = np.array([tuple(row) for row in db.execute_query(query + ' GROUP BY date_ord', tuple(params))
+                     or []], dtype=np.int64).reshape(-1, 2)
+    counts = np.bincount(rows[:, 0] - first, weights=rows[:, 1], minlength=last - first + 1)
+    return first, counts.astype(np.int64)
+
+
+def bucket_bookings(start_date=None, end_date=None, by='day', statuses=None, db=None):
+    """
+    Bookings in a window grouped into buckets.
+
+    Args:
+        start_date: default 27 days before end_date
+        end_date: default today
+        by: 'day', 'week' (Monday to Sunday, labelled by its Monday),
+            'month' ('YYYY-MM') or 'weekday' (Monday..Sunday)
+        statuses: booking statuses to count (default all)
+
+    Returns:
+        Buckets
+    """
+    if by not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {by!r}")
+    last = date_to_ordinal(end_date or date.today())
+    first = date_to_ordinal(start_date) if start_date else last - 27
+    first, counts = daily_counts(first, last, statuses, db)
+    days = np.arange(first, first + len(counts))
+
+    if by == 'day':
+        return Buckets([ordinal_to_date(int(d)) for d in days], counts)
+
+    if by == 'weekday':
+        return Buckets(list(WEEK_DAYS), np.bincount((days + 6) % 7, weights=counts, minlength=7).astype(np.int64))
+
+    if by == 'week':
+        monday = days - (days + 6) % 7
+        keys = (monday - monday[0]) // 7
+        labels = [ordinal_to_date(int(monday[0]) + 7 * k) for k in range(int(keys[-1]) + 1)]
+    else:
+        months = np.array([date.fromordinal(int(d)).year * 12 + date.fromordinal(int(d)).month - 1
+                           for d in days], dtype=np.int64)
+        keys = months - months[0]
+        labels = [f"{m // 12:04d}-{m % 12 + 1:02d}" for m in range(int(months[0]), int(months[-1]) + 1)]
+    return Buckets(labels, np.bincount(keys, weights=counts, minlength=len(labels)).astype(np.int64))
@@ -1,132 +1,16 @@
 """
 Reports Module
+
+Qt chart widget for reports; the report data itself comes from
+reports.generator, re-exported here for existing imports.
 """
 
-from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PyQt5.QtGui import QFont
-from models.booking import Booking
-from models.schedule import Schedule
-from models.classroom import Classroom
-from database.db_setup import DatabaseManager
-
-class ReportGenerator:
-    def __init__(self):
-        self.db = DatabaseManager()
-    
-    def get_booking_stats(self):
-        """Get booking statistics"""
-        all_bookings = Booking.get_all_bookings()
-        
-        stats = {
-            'total': len(all_bookings),
-            'approved': len([b for b in all_bookings if b.status == 1]),
-            'pending': len([b for b in all_bookings if b.status == 2]),
-            'rejected': len([b for b in all_bookings if b.status == 3]),
-            'cancelled': len([b for b in all_bookings if b.status == 0]),
-        }
-        
-        return stats
-    
-    def get_resource_usage(self):
-        """Get resource usage statistics"""
-        classrooms = Classroom.get_all_classrooms()
-        
-        usage_data = {}
-        for classroom in classrooms:
-            bookings = self.db.execute_query(
-                'SELECT COUNT(*) FROM bookings WHERE classroom_id = ? AND status = 1',
-                (classroom.id,)
-            )
-            usage_data[classroom.room_number] = bookings[0][0] if bookings else 0
-        
-        return usage_data
-    
-    def get_peak_hours(self):
-        """Get peak booking hours"""
-        query = '''
-            SELECT start_time, COUNT(*) as count 
-            FROM bookings 
-            WHERE status = 1
-            GROUP BY start_time
-            ORDER BY count DESC
-        '''
-        results = self.db.execute_query(query)
-        
-        peak_hours = {}
-        if results:
-            for time, count in results:
-                peak_hours[time] = count
-        
-        return peak_hours
-    
-    def get_underutilized_rooms(self, threshold=2):
-        """Get underutilized classrooms"""
-        classrooms = Classroom.get_all_classrooms()
-        underutilized = []
-        
-        for classroom in classrooms:
-            bookings = self.db.execute_query(
-                'SELECT COUNT(*) FROM bookings WHERE classroom_id = ? AND status = 1',
-                (classroom.id,)
-            )
-            count = bookings[0][0] if bookings else 0
-            
-            if count <= threshold:
-                underutilized.append({
-                    'room': classroom.room_number,
-                    'type': classroom.room_type,
-                    'bookings': count
-                })
-        
-        return underutilized
-    
-    def export_report_to_text(self, filename='resource_report.txt'):
-        """Export report to text file"""
-        with open(filename, 'w') as f:
-            f.write("Smart Campus Resource Management Report\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 60 + "\n\n")
-            
-            # Booking Stats
-            stats = self.get_booking_stats()
-            f.write("BOOKING STATISTICS\n")
-            f.write("-" * 60 + "\n")
-            f.write(f"Total Bookings: {stats['total']}\n")
-            f.write(f"Approved: {stats['approved']}\n")
-            f.write(f"Pending: {stats['pending']}\n")
-            f.write(f"Rejected: {stats['rejected']}\n")
-            f.write(f"Cancelled: {stats['cancelled']}\n\n")
-            
-            # Resource Usage
-            f.write("RESOURCE USAGE\n")
-            f.write("-" * 60 + "\n")
-            usage = self.get_resource_usage()
-            for room, count in usage.items():
-                f.write(f"{room}: {count} bookings\n")
-            
-            f.write("\n")
-            
-            # Peak Hours
-            f.write("PEAK HOURS\n")
-            f.write("-" * 60 + "\n")
-            peak_hours = self.get_peak_hours()
-            for time, count in sorted(peak_hours.items(), key=lambda x: x[1], reverse=True)[:5]:
-                f.write(f"{time}: {count} bookings\n")
-            
-            f.write("\n")
-            
-            # Underutilized Rooms
-            f.write("UNDERUTILIZED ROOMS\n")
-            f.write("-" * 60 + "\n")
-            underutilized = self.get_underutilized_rooms()
-            for room_info in underutilized:
-                f.write(f"{room_info['room']} ({room_info['type']}): {room_info['bookings']} bookings\n")
-        
-        return filename
+from reports.generator import ReportGenerator
 
 
 class ReportChartWidget(QWidget):
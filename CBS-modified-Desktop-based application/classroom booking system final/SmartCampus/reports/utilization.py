@@ -0,0 +1,210 @@
+"""
+Utilization Cube Module
+
+Room usage over a date window as a NumPy array of occupied minutes with
+shape rooms x weekdays x hours. Bookings and classes are binned by
+their actual start and end times (a 90 minute class adds 60 minutes to
+one hour and 30 to the next), and weekly classes count once for every
+date they meet in the window.
+
+Dividing by the minutes available in each cell gives utilization;
+weighting by room capacity gives seat-hour utilization, where a full
+50-seat hall counts for more than a full 10-seat room.
+
+Example:
+    cube = UtilizationCube.build('2026-09-01', '2026-12-31')
+    cube.room_utilization()                    # {'S-6': 41.7, ...} percent
+    cube.heatmap(weighted=True)                # 7 x hours ratios
+    cube.underutilized(threshold=0.2)
+"""
+
+from datetime import date
+
+import numpy as np
+
+from database.db_setup import DatabaseManager
+from reports.cache import report_cache
+from config import CAMPUS_DAY_START_HOUR, CAMPUS_DAY_END_HOUR
+from utils.time_utils import date_to_ordinal, ordinal_to_date
+
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Tables a cube is computed from; a change to any of them invalidates cached cubes
+SOURCE_TABLES = ('bookings', 'schedules', 'schedule_occurrences', 'classrooms', 'semesters', 'holidays')
+
+
+class UtilizationCube:
+    """Occupied minutes per room, weekday and hour"""
+
+    def __init__(self, rooms, first_ord, last_ord, first_hour, minutes):
+        self.rooms = rooms              # classroom rows: (id, room_number, room_type, capacity, building)
+        self.first_ord = first_ord
+        self.last_ord = last_ord
+        self.first_hour = first_hour
+        self.minutes = minutes          # float array [room, weekday, hour]
+        self.room_ids = np.array([room[0] for room in rooms], dtype=np.int64)
+        self.capacities = np.array([room[3] or 0 for room in rooms], dtype=np.float64)
+        days = np.arange(first_ord, last_ord + 1)
+        self.weekday_counts = np.bincount((days + 6) % 7, minlength=7)
+
+    @property
+    def hours(self):
+        """Hour of day of each column"""
+        return np.arange(self.first_hour, self.first_hour + self.minutes.shape[2])
+
+    @staticmethod
+    def build(start_date=None, end_date=None, first_hour=CAMPUS_DAY_START_HOUR,
+              last_hour=CAMPUS_DAY_END_HOUR, include_schedules=True, include_pending=False,
+              room_type=None, db=None):
+        """
+        Build the cube for a date window (inclusive).
+
+        Args:
+            start_date: default 27 days before end_date
+            end_date: default today
+            first_hour/last_hour: hours covered, e.g. 8 and 20 for 08:00-20:00
+            include_schedules: count weekly classes on the dates they meet
+            include_pending: count pending bookings as well as approved ones
+
+        Returns:
+            UtilizationCube, cached until one of the tables it is read from
+            changes; do not modify it
+        """
+        db = db or DatabaseManager()
+        last = date_to_ordinal(end_date or date.today())
+        first = date_to_ordinal(start_date) if start_date else last - 27
+        if last < first:
+            raise ValueError("Window ends before it starts")
+        key = ('utilization', first, last, first_hour, last_hour, include_schedules, include_pending, room_type)
+        return report_cache.get(key, SOURCE_TABLES, lambda: UtilizationCube._build(
+            first, last, first_hour, last_hour, include_schedules, include_pending, room_type, db), db)
+
+    @staticmethod
+    def _build(first, last, first_hour, last_hour, include_schedules, include_pending, room_type, db):
+        query = 'SELECT id, room_number, room_type, capacity, building FROM classrooms WHERE status = 1'
+        params = ()
+        if room_type:
+            query += ' AND room_type = ?'
+            params = (room_type,)
+        rooms = [tuple(row) for row in db.execute_query(query + ' ORDER BY room_number', params) or []]
+        cube = UtilizationCube(rooms, first, last, first_hour,
+                               np.zeros((len(rooms), 7, last_hour - first_hour), dtype=np.float64))
+        if not rooms:
+            return cube
+
+        # Intervals as (classroom_id, weekday, start_min, end_min, times counted)
+        statuses = '(1, 2)' if include_pending else '(1)'
+        intervals = [tuple(row) for row in db.execute_query(f'''
+            SELECT classroom_id, (date_ord + 6) % 7, start_min, end_min, 1
+            FROM bookings
+            WHERE status IN {statuses} AND date_ord BETWEEN ? AND ?
+        ''', (first, last)) or []]
+
+        if include_schedules:
+            # Dated classes count their occurrences in the window; undated ones
+            # (semester not in the calendar) meet on every matching weekday
+            for classroom_id, weekday, start_min, end_min, dated in db.execute_query('''
+                SELECT s.classroom_id, s.weekday, s.start_min, s.end_min,
+                       CASE WHEN EXISTS (SELECT 1 FROM semesters m WHERE m.name = s.semester)
+                            THEN (SELECT COUNT(*) FROM schedule_occurrences o
+                                  WHERE o.schedule_id = s.id AND o.date_ord BETWEEN ? AND ?)
+                       END
+                FROM schedules s
+                WHERE s.status = 1 AND s.weekday IS NOT NULL
+            ''', (first, last)) or []:
+                times = dated if dated is not None else cube.weekday_counts[weekday]
+                if times:
+                    intervals.append((classroom_id, weekday, start_min, end_min, times))
+
+        cube._fill(intervals)
+        return cube
+
+    def _fill(self, intervals):
+        """Add each interval's overlap with every hour column"""
+        room_pos = {room_id: i for i, room_id in enumerate(self.room_ids.tolist())}
+        data = np.array([row for row in intervals if row[0] in room_pos and row[2] is not None
+                         and row[3] is not None], dtype=np.int64).reshape(-1, 5)
+        if not len(data):
+            return
+        rows = np.array([room_pos[c] for c in data[:, 0]], dtype=np.int64)
+        edges = self.hours * 60
+        # Overlap of [start, end) with [edge, edge + 60) for every interval and hour
+        overlap = (np.minimum(data[:, 3:4], edges + 60) - np.maximum(data[:, 2:3], edges)).clip(0)
+        np.add.at(self.minutes, (rows, data[:, 1]), overlap * data[:, 4:5])
+
+    def available(self):
+        """Minutes available per weekday and hour, shape 7 x hours"""
+        return np.repeat(self.weekday_counts[:, None] * 60.0, self.minutes.shape[2], axis=1)
+
+    def _ratio(self, used, available):
+        return np.divide(used, available, out=np.zeros_like(used, dtype=np.float64), where=available > 0)
+
+    def _select(self, room_ids=None, room_type=None):
+        """Boolean mask over rooms"""
+        mask = np.ones(len(self.rooms), dtype=bool)
+        if room_ids is not None:
+            mask &= np.isin(self.room_ids, list(room_ids))
+        if room_type:
+            mask &= np.array([room[2] == room_type for room in self.rooms], dtype=bool)
+        return mask
+
+    def heatmap(self, room_ids=None, room_type=None, weighted=False):
+        """
+        Utilization ratio per weekday and hour across the selected rooms.
+
+        Returns:
+            np.ndarray: 7 x hours, 0..1
+        """
+        mask = self._select(room_ids, room_type)
+        weights = self.capacities[mask] if weighted else np.ones(mask.sum())
+        used = np.tensordot(weights, self.minutes[mask], axes=1)
+        return self._ratio(used, self.available() * weights.sum())
+
+    def by_room(self, weekdays=range(5)):
+        """Utilization ratio per room over the given weekdays (default Mon-Fri)"""
+        weekdays = list(weekdays)
+        used = self.minutes[:, weekdays, :].sum(axis=(1, 2))
+        available = self.available()[weekdays].sum()
+        return self._ratio(used, np.full(len(self.rooms), available))
+
+    def total(self, weekdays=range(5), room_type=None, weighted=False):
+        """Single utilization ratio over the selected rooms and weekdays"""
+        mask = self._select(room_type=room_type)
+        weekdays = list(weekdays)
+        weights = self.capacities[mask] if weighted else np.ones(mask.sum())
+        used = float(weights @ self.minutes[mask][:, weekdays, :].sum(axis=(1, 2)))
+        available = float(self.available()[weekdays].sum() * weights.sum())
+        return used / available if available else 0.0
+
+    def seat_hours(self):
+        """Seat-hours used per room number"""
+        used = self.minutes.sum(axis=(1, 2)) / 60.0 * self.capacities
+        return {room[1]: float(hours) for room, hours in zip(self.rooms, used)}
+
+    def busy_rooms(self, room_type=None):
+        """
+        Average number of rooms in use per weekday and hour.
+
+        For capacity planning: compare against the number of rooms of that
+        type to see how close peak hours come to running out.
+        """
+        mask = self._select(room_type=room_type)
+        used = self.minutes[mask].sum(axis=0)
+        return self._ratio(used, self.available())
+
+    def room_utilization(self, weekdays=range(5)):
+        """Utilization percent per room number over the given weekdays"""
+        ratios = self.by_room(weekdays)
+        return {room[1]: round(float(r) * 100, 1) for room, r in zip(self.rooms, ratios)}
+
+    def underutilized(self, threshold=0.2, weekdays=range(5)):
+        """Rooms used less than ``threshold`` of the time, least used first"""
+        ratios = self.by_room(weekdays)
+        order = np.argsort(ratios, kind='stable')
+        return [{'room': self.rooms[i][1], 'type': self.rooms[i][2], 'capacity': self.rooms[i][3],
+                 'utilization': round(float(ratios[i]) * 100, 1)}
+                for i in order if ratios[i] < threshold]
+
+    def describe_window(self):
+        """Date window as 'YYYY-MM-DD - YYYY-MM-DD'"""
+        return f"{ordinal_to_date(self.first_ord)} - {ordinal_to_date(self.last_ord)}"
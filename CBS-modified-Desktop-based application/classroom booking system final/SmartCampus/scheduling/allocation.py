@@ -0,0 +1,284 @@
+"""
+Batch Allocation Module
+
+Plans room assignments for every pending booking in a date window at
+once, instead of first-click-wins approval. Pending requests on a day
+are grouped into clusters of overlapping time ranges, and each cluster
+is solved exactly: the plan approves as many requests as possible and,
+among plans of that size, keeps requests closest to the rooms they
+asked for.
+
+The exact method is a dynamic program over the requests of a cluster in
+order of start time. Taken that way, a room can take the next request
+if and only if everything placed in it so far has ended, so the only
+state that matters is which rooms are still busy and until when. States
+reaching the same busy set are merged, keeping the best score. The
+number of states grows with how many requests overlap at once rather
+than with the size of the cluster. Assigning intervals to eligible rooms
+is NP-hard in general, so the growth is exponential in that overlap. A
+cluster with more than ``ALLOCATION_MAX_STATES`` states for one request
+falls back to augmenting paths (a heuristic that may leave a request
+unplaced), and the plan is then marked ``exact = False``.
+
+A request may move to an equivalent room (same type, at least the
+requested room's capacity) when its own room is taken. Its preference
+order is its own room, then the same building, then the smallest room
+that fits, and a move costs its position in that order.
+
+Approved bookings and classes are fixed. The plan is applied in one
+transaction by ``AllocationPlan.approve``.
+"""
+
+from collections import namedtuple
+from datetime import date, datetime
+
+from database.db_setup import DatabaseManager
+from utils.time_utils import date_to_ordinal, weekday_of_ordinal
+from scheduling.occurrences import SCHEDULE_ON_DATE
+from scheduling.conflicts import ConflictEngine
+from scheduling.interval_index import interval_index
+from config import ALLOCATION_MAX_STATES
+
+Assignment = namedtuple('Assignment', 'booking classroom_id moved')
+
+
+class AllocationPlan:
+    """Room for each pending booking that can be approved together"""
+
+    def __init__(self, assignments, unassigned, exact=True):
+        self.assignments = assignments
+        self.unassigned = unassigned
+        # False when a cluster was too large for the exact search
+        self.exact = exact
+
+    def approve(self, approved_by):
+        """
+        Approve every assignment in one transaction.
+
+        Each booking must still be pending and its (possibly new) room
+        must still be free of approved bookings and classes; otherwise
+        nothing is changed.
+
+        Returns:
+            tuple: (success, message)
+        """
+        try:
+            now = datetime.now()
+            with DatabaseManager().transaction() as conn:
+                for a in self.assignments:
+                    b = a.booking
+                    clash = ConflictEngine.approved_conflicts(
+                        a.classroom_id, b.date_ord, b.start_min, b.end_min,
+                        exclude_booking_id=b.id, conn=conn)
+                    if clash:
+                        raise ValueError(f"Room for booking {b.id} is no longer free")
+                    updated = conn.execute('''
+                        UPDATE bookings SET classroom_id = ?, status = 1, updated_at = ?
+                        WHERE id = ? AND status = 2
+                    ''', (a.classroom_id, now, b.id)).rowcount
+                    if not updated:
+                        raise ValueError(f"Booking {b.id} is no longer pending")
+            for a in self.assignments:
+                interval_index.booking_changed(a.booking.id)
+            return True, f"Approved {len(self.assignments)} bookings"
+        except Exception as e:
+            print(f"Approve allocation error: {e}")
+            return False, str(e)
+
+    def __repr__(self):
+        return (f"<AllocationPlan(assigned={len(self.assignments)}, unassigned={len(self.unassigned)}, "
+                f"exact={self.exact})>")
+
+
+class _Request:
+    """Pending booking as seen by the allocator"""
+
+    __slots__ = ('id', 'user_id', 'classroom_id', 'course_name', 'booking_date',
+                 'start_time', 'end_time', 'date_ord', 'start_min', 'end_min', 'candidates')
+
+    def __init__(self, row):
+        (self.id, self.user_id, self.classroom_id, self.course_name, self.booking_date,
+         self.start_time, self.end_time, self.date_ord, self.start_min, self.end_min) = row
+        self.candidates = []
+
+    def overlaps(self, other):
+        return self.start_min < other.end_min and other.start_min < self.end_min
+
+
+class BatchAllocator:
+    """Capacity-aware assignment of pending bookings to free rooms"""
+
+    def __init__(self, db=None, max_states=ALLOCATION_MAX_STATES):
+        self.db = db or DatabaseManager()
+        self.max_states = max_states
+
+    def plan(self, start_date=None, end_date=None, allow_moves=True):
+        """
+        Allocate all pending bookings between two dates (inclusive).
+
+        Args:
+            start_date: default today
+            end_date: default two weeks after start_date
+            allow_moves: may assign an equivalent room instead of the requested one
+
+        Returns:
+            AllocationPlan
+        """
+        first = date_to_ordinal(start_date or date.today())
+        last = date_to_ordinal(end_date) if end_date else first + 14
+        rooms = {row[0]: tuple(row) for row in self.db.execute_query(
+            'SELECT id, room_type, capacity, building FROM classrooms WHERE status = 1') or []}
+        requests = [_Request(tuple(row)) for row in self.db.execute_query('''
+            SELECT id, user_id, classroom_id, course_name, booking_date, start_time, end_time,
+                   date_ord, start_min, end_min
+            FROM bookings
+            WHERE status = 2 AND date_ord BETWEEN ? AND ?
+            ORDER BY date_ord, start_min, id
+        ''', (first, last)) or []]
+        busy = self._fixed_busy(first, last)
+
+        for req in requests:
+            wanted = rooms.get(req.classroom_id)
+            if wanted is None:
+                continue
+            if allow_moves:
+                options = [room for room in rooms.values()
+                           if room[1] == wanted[1] and (room[2] or 0) >= (wanted[2] or 0)]
+            else:
+                options = [wanted]
+            # Own room first, then same building, then the tightest fit
+            options.sort(key=lambda room: (room[0] != wanted[0], room[3] != wanted[3],
+                                           (room[2] or 0), room[0]))
+            req.candidates = [room[0] for room in options
+                              if not any(s < req.end_min and req.start_min < e
+                                         for s, e in busy.get((room[0], req.date_ord), ()))]
+
+        assignments, unassigned, exact = [], [], True
+        for cluster in self._clusters(requests):
+            placed = self._solve(cluster)
+            if placed is None:
+                exact = False
+                placed = self._solve_greedy(cluster)
+            for req in cluster:
+                if req.id in placed:
+                    room_id = placed[req.id]
+                    assignments.append(Assignment(req, room_id, room_id != req.classroom_id))
+                else:
+                    unassigned.append(req)
+        return AllocationPlan(assignments, unassigned, exact)
+
+    def _solve(self, cluster):
+        """
+        Best room per request of one cluster, or None if the search is too large.
+
+        Scores are (requests placed, -total preference cost) and are
+        maximised. A state is the sorted tuple of (room id, busy until)
+        for rooms still busy at the current request's start.
+
+        Returns:
+            dict: request id -> room id, or None
+        """
+        # The augmenting-path plan is a lower bound: drop states that can no
+        # longer place as many requests even if every remaining one fits
+        target = len(self._solve_greedy(cluster))
+        # states: busy tuple -> (score, previous busy tuple, room chosen or None)
+        layers = [{(): ((0, 0), None, None)}]
+        for i, req in enumerate(cluster):
+            following = cluster[i + 1].start_min if i + 1 < len(cluster) else None
+            remaining = len(cluster) - i
+            nxt = {}
+            for busy, ((count, cost), _, _) in layers[-1].items():
+                if count + remaining < target:
+                    continue
+                taken = {room_id for room_id, _ in busy}
+                choices = [(None, (count, cost), busy)]
+                for rank, room_id in enumerate(req.candidates):
+                    if room_id not in taken:
+                        choices.append((room_id, (count + 1, cost - rank),
+                                        tuple(sorted(busy + ((room_id, req.end_min),)))))
+                for room_id, score, after in choices:
+                    # Rooms free again by the next start no longer matter
+                    if following is not None:
+                        after = tuple(entry for entry in after if entry[1] > following)
+                    if after not in nxt or score > nxt[after][0]:
+                        nxt[after] = (score, busy, room_id)
+            if len(nxt) > self.max_states:
+                return None
+            layers.append(nxt)
+
+        busy = max(layers[-1], key=lambda state: layers[-1][state][0])
+        placed = {}
+        for req, layer in zip(reversed(cluster), reversed(layers[1:])):
+            _, busy, room_id = layer[busy]
+            if room_id is not None:
+                placed[req.id] = room_id
+        return placed
+
+    def _solve_greedy(self, cluster):
+        """Fallback for oversized clusters: request id -> room id by augmenting paths"""
+        holders, placed = {}, {}
+        for req in cluster:
+            self._augment(req, holders, placed, set())
+        return placed
+
+    def _augment(self, req, holders, placed, visited):
+        """
+        Find room for ``req``, re-routing a blocking request if needed.
+
+        Kuhn's augmenting path step, used by ``_solve_greedy``. Only a
+        single blocking request is re-routed, so chains of partial
+        overlaps can leave requests unplaced that the exact search would
+        place.
+        """
+        for room_id in req.candidates:
+            if room_id in visited:
+                continue
+            blockers = [other for other in holders.get(room_id, ()) if other.overlaps(req)]
+            if not blockers:
+                holders.setdefault(room_id, []).append(req)
+                placed[req.id] = room_id
+                return True
+            if len(blockers) == 1:
+                visited.add(room_id)
+                blocker = blockers[0]
+                holders[room_id].remove(blocker)
+                del placed[blocker.id]
+                if self._augment(blocker, holders, placed, visited):
+                    holders[room_id].append(req)
+                    placed[req.id] = room_id
+                    return True
+                holders[room_id].append(blocker)
+                placed[blocker.id] = room_id
+        return False
+
+    @staticmethod
+    def _clusters(requests):
+        """Split requests (sorted by day and start) into overlap clusters"""
+        cluster, day, cluster_end = [], None, -1
+        for req in requests:
+            if cluster and (req.date_ord != day or req.start_min >= cluster_end):
+                yield cluster
+                cluster, cluster_end = [], -1
+            cluster.append(req)
+            day = req.date_ord
+            cluster_end = max(cluster_end, req.end_min)
+        if cluster:
+            yield cluster
+
+    def _fixed_busy(self, first, last):
+        """(room id, ordinal day) -> [(start, end)] of approved bookings and classes"""
+        busy = {}
+        for classroom_id, date_ord, start_min, end_min in self.db.execute_query('''
+            SELECT classroom_id, date_ord, start_min, end_min FROM bookings
+            WHERE status = 1 AND date_ord BETWEEN ? AND ?
+        ''', (first, last)) or []:
+            busy.setdefault((classroom_id, date_ord), []).append((start_min, end_min))
+
+        for date_ord in range(first, last + 1):
+            for classroom_id, start_min, end_min in self.db.execute_query(f'''
+                SELECT s.classroom_id, s.start_min, s.end_min FROM schedules s
+                WHERE s.weekday = ? AND s.status = 1
+                AND {SCHEDULE_ON_DATE.format(alias='s')}
+            ''', (weekday_of_ordinal(date_ord), date_ord)) or []:
+                busy.setdefault((classroom_id, date_ord), []).append((start_min, end_min))
+        return busy
@@ -0,0 +1,153 @@
+"""
+Auto-Approval Module
+
+Declarative rules that approve or reject booking requests when they are
+created, instead of leaving every request pending for an admin. Rules
+come from ``AUTO_APPROVAL_RULES`` in config and are compiled once into
+lists of predicates over a ``BookingFacts`` tuple; evaluating a request
+is then a few attribute lookups and comparisons.
+
+Example rule:
+    {'name': 'teacher-theory-short', 'decision': 'approve',
+     'role': 2, 'room_type': 'Theory', 'max_hours': 2}
+
+Every decision, including "no rule matched", is written to the ``logs``
+table in the transaction that creates the booking.
+"""
+
+from collections import namedtuple
+from datetime import date
+from operator import attrgetter
+
+from config import AUTO_APPROVAL_RULES
+from utils.time_utils import date_to_ordinal, weekday_of_ordinal
+
+# Decision name -> booking status
+DECISIONS = {
+    'approve': 1,
+    'pending': 2,
+    'reject': 3,
+}
+
+# Log action per resulting booking status
+LOG_ACTIONS = {
+    1: 'booking_auto_approved',
+    2: 'booking_pending_review',
+    3: 'booking_auto_rejected',
+}
+
+BookingFacts = namedtuple('BookingFacts', 'role department room_type capacity building '
+                                          'weekday duration days_ahead')
+
+
+class Decision(namedtuple('Decision', 'status rule reason')):
+    """Outcome of the rules for one request; ``rule`` is None when none matched"""
+
+    __slots__ = ()
+
+    @property
+    def decided(self):
+        return self.status != 2
+
+    def describe(self):
+        """One-line description for the log"""
+        if self.rule is None:
+            return "no rule matched, left for review"
+        text = f"rule '{self.rule}'"
+        return f"{text}: {self.reason}" if self.reason else text
+
+
+def _one_of(field, value):
+    get = attrgetter(field)
+    allowed = frozenset(value) if isinstance(value, (list, tuple, set, frozenset)) else frozenset([value])
+    return lambda facts: get(facts) in allowed
+
+
+def _at_least(field, limit):
+    get = attrgetter(field)
+    return lambda facts: get(facts) is not None and get(facts) >= limit
+
+
+def _at_most(field, limit):
+    get = attrgetter(field)
+    return lambda facts: get(facts) is not None and get(facts) <= limit
+
+
+# Condition key -> factory for its predicate
+CONDITIONS = {
+    'role': lambda v: _one_of('role', v),
+    'department': lambda v: _one_of('department', v),
+    'room_type': lambda v: _one_of('room_type', v),
+    'building': lambda v: _one_of('building', v),
+    'weekdays': lambda v: _one_of('weekday', v),
+    'min_hours': lambda v: _at_least('duration', v * 60),
+    'max_hours': lambda v: _at_most('duration', v * 60),
+    'min_days_ahead': lambda v: _at_least('days_ahead', v),
+    'max_days_ahead': lambda v: _at_most('days_ahead', v),
+    'min_capacity': lambda v: _at_least('capacity', v),
+    'max_capacity': lambda v: _at_most('capacity', v),
+}
+
+
+class ApprovalRules:
+    """Compiled auto-approval rules"""
+
+    def __init__(self, rules=()):
+        self.rules = [self._compile(rule) for rule in rules]
+
+    @staticmethod
+    def _compile(rule):
+        rule = dict(rule)
+        name = rule.pop('name', None) or 'unnamed'
+        decision = rule.pop('decision', None)
+        if decision not in DECISIONS:
+            raise ValueError(f"Rule {name!r}: unknown decision {decision!r}")
+        reason = rule.pop('reason', None)
+        checks = []
+        for key, value in rule.items():
+            if key not in CONDITIONS:
+                raise ValueError(f"Rule {name!r}: unknown condition {key!r}")
+            checks.append(CONDITIONS[key](value))
+        return name, DECISIONS[decision], reason, tuple(checks)
+
+    def evaluate(self, facts):
+        """First matching rule's Decision for a BookingFacts tuple"""
+        for name, status, reason, checks in self.rules:
+            if all(check(facts) for check in checks):
+                return Decision(status, name, reason)
+        return Decision(2, None, None)
+
+    def decide(self, conn, user_id, classroom_id, booking_date, start_min, end_min, today=None):
+        """
+        Decide a request using facts read through ``conn``.
+
+        Returns:
+            Decision
+        """
+        row = conn.execute('''
+            SELECT u.role, u.department, c.room_type, c.capacity, c.building
+            FROM users u, classrooms c
+            WHERE u.id = ? AND c.id = ?
+        ''', (user_id, classroom_id)).fetchone()
+        if row is None:
+            return Decision(2, None, None)
+        date_ord = date_to_ordinal(booking_date)
+        days_ahead = date_ord - date_to_ordinal(today or date.today())
+        if days_ahead < 0:
+            # Past-dated requests (admin back-entries) always go to review
+            return Decision(2, None, None)
+        facts = BookingFacts(*row, weekday_of_ordinal(date_ord), end_min - start_min, days_ahead)
+        return self.evaluate(facts)
+
+    @staticmethod
+    def apply(conn, booking_id, user_id, decision):
+        """Store a decision on a new booking and log it, inside the caller's transaction"""
+        if decision.decided:
+            conn.execute('UPDATE bookings SET status = ?, reason = ? WHERE id = ?',
+                         (decision.status, decision.reason, booking_id))
+        conn.execute('INSERT INTO logs (user_id, action, details) VALUES (?, ?, ?)',
+                     (user_id, LOG_ACTIONS[decision.status],
+                      f"Booking {booking_id}: {decision.describe()}"))
+
+
+approval_rules = ApprovalRules(AUTO_APPROVAL_RULES)
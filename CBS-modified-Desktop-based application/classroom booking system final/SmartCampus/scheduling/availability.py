@@ -0,0 +1,111 @@
+"""
+Availability Engine Module
+
+Answers "which rooms are free from X to Y" from slot occupancy bitmaps.
+Every room/day bucket of the interval index carries a Python int whose
+bits mark occupied slots of ``SLOT_MINUTES``; a room's day is the OR of
+its booking bucket and the buckets of the classes meeting that day (by
+the semester calendar, as ``SCHEDULE_ON_DATE``), and a room is free when
+that value AND the request mask is zero. The index follows
+``change_log``, so bitmaps include other clients' writes.
+
+Room metadata is cached here and reloaded when the ``classrooms``
+journal sequence moves; ``rooms_changed`` drops it at once.
+"""
+
+from collections import namedtuple
+import threading
+
+from database.db_setup import DatabaseManager
+from config import SLOT_MINUTES
+from utils.time_utils import parse_time, date_to_ordinal, slot_mask
+from scheduling.interval_index import interval_index
+
+# Active classroom as cached by the engine; ``row`` is the full table row
+Room = namedtuple('Room', 'id room_number room_type capacity building row')
+
+
+class AvailabilityEngine:
+    """Room availability over the interval index occupancy bitmaps"""
+
+    def __init__(self, index=None, db_path=None):
+        self.index = index or interval_index
+        self.db_path = db_path
+        self._rooms = None
+        self._rooms_seq = None
+        self._lock = threading.Lock()
+
+    # Rooms
+    def rooms(self):
+        """Active rooms ordered by room number"""
+        db = DatabaseManager(self.db_path) if self.db_path else DatabaseManager()
+        seq = db.execute_query(
+            "SELECT COALESCE(MAX(seq), 0) FROM change_log WHERE table_name = 'classrooms'")[0][0]
+        with self._lock:
+            if self._rooms is None or seq != self._rooms_seq:
+                rows = db.execute_query(
+                    'SELECT * FROM classrooms WHERE status = 1 ORDER BY room_number') or []
+                self._rooms = [Room(row[0], row[1], row[2], row[3], row[4], tuple(row))
+                               for row in rows]
+                self._rooms_seq = seq
+            return self._rooms
+
+    def rooms_changed(self):
+        """Drop the cached room list after classroom edits"""
+        with self._lock:
+            self._rooms = None
+
+    # Queries
+    def covers(self, booking_date):
+        """True if the engine has the bookings for this date"""
+        return self.index.covers(booking_date)
+
+    def day_bitmap(self, classroom_id, booking_date):
+        """Occupied slots of a room on a date (bookings and schedules)"""
+        return self.index.occupancy(classroom_id, date_to_ordinal(booking_date))
+
+    def is_free(self, classroom_id, booking_date, start_time, end_time):
+        """True if no slot of the range is occupied"""
+        mask = slot_mask(parse_time(start_time), parse_time(end_time))
+        return not self.day_bitmap(classroom_id, booking_date) & mask
+
+    def free_rooms(self, booking_date, start_time, end_time, room_type=None, min_capacity=None):
+        """
+        Rooms with nothing booked or scheduled during the range.
+
+        Returns:
+            list: Room tuples ordered by room number
+        """
+        mask = slot_mask(parse_time(start_time), parse_time(end_time))
+        rooms = [room for room in self.rooms()
+                 if (room_type is None or room.room_type == room_type)
+                 and (min_capacity is None or (room.capacity or 0) >= min_capacity)]
+        occupancy = self.index.occupancy_many([room.id for room in rooms], date_to_ordinal(booking_date))
+        return [room for room in rooms if not occupancy[room.id] & mask]
+
+    def free_ranges(self, classroom_id, booking_date, day_start, day_end):
+        """
+        Free ``(start_min, end_min)`` gaps of a room between two times.
+
+        Gap edges are slot aligned, so they are exact for times on
+        ``SLOT_MINUTES`` boundaries and conservative otherwise.
+        """
+        day_start, day_end = parse_time(day_start), parse_time(day_end)
+        bits = self.day_bitmap(classroom_id, booking_date)
+        first = -(-day_start // SLOT_MINUTES)
+        last = day_end // SLOT_MINUTES
+        ranges = []
+        slot = first
+        while slot < last:
+            if bits >> slot & 1:
+                slot += 1
+                continue
+            gap_start = slot
+            while slot < last and not bits >> slot & 1:
+                slot += 1
+            ranges.append((gap_start * SLOT_MINUTES, slot * SLOT_MINUTES))
+        return ranges
+
+
+# Shared process-wide engine
+availability = AvailabilityEngine()
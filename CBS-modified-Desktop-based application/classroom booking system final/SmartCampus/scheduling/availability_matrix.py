@@ -0,0 +1,224 @@
+"""
+Availability Matrix Module
+
+Multi-day, multi-room availability as a NumPy boolean array of shape
+rooms x days x slots, built straight from the database for any date
+window. Questions such as "rooms seating 40 that are free for 90 minutes
+on any weekday in the next three weeks" become array operations instead
+of one availability query per candidate slot. Classes are placed on
+their semester calendar dates (``schedule_occurrences``); schedules whose
+semester is not in the calendar fall back to every matching weekday, as
+in ``SCHEDULE_ON_DATE``.
+
+Example:
+    matrix = AvailabilityMatrix.build(days=21, min_capacity=40)
+    for slot in matrix.find_gaps(90)[:10]:
+        print(slot.room_number, slot.date, slot.start_time, slot.end_time)
+"""
+
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from database.db_setup import DatabaseManager
+from config import SLOT_MINUTES
+from utils.time_utils import parse_time, format_minutes, date_to_ordinal, ordinal_to_date
+
+
+class FreeSlot(namedtuple('FreeSlot', 'classroom_id room_number capacity date start_min end_min')):
+    """A free run of time in one room on one day"""
+
+    __slots__ = ()
+
+    @property
+    def start_time(self):
+        return format_minutes(self.start_min)
+
+    @property
+    def end_time(self):
+        return format_minutes(self.end_min)
+
+    @property
+    def duration(self):
+        return self.end_min - self.start_min
+
+
+class AvailabilityMatrix:
+    """Boolean occupancy cube over rooms, days and time slots"""
+
+    def __init__(self, rooms, day_ords, day_start, day_end, occupied, slot_minutes=SLOT_MINUTES):
+        self.rooms = rooms              # classroom rows: (id, room_number, room_type, capacity, building)
+        self.day_ords = day_ords        # np.ndarray of ordinal days
+        self.day_start = day_start      # minutes since midnight of slot 0
+        self.day_end = day_end
+        self.occupied = occupied        # bool array [room, day, slot]
+        self.slot_minutes = slot_minutes
+        self.room_ids = np.array([room[0] for room in rooms], dtype=np.int64)
+        self.capacities = np.array([room[3] or 0 for room in rooms], dtype=np.int64)
+
+    @staticmethod
+    def build(start_date=None, days=21, day_start='08:00', day_end='20:00',
+              room_type=None, min_capacity=None, weekdays_only=True, classroom_ids=None, db=None):
+        """
+        Build the matrix for ``days`` calendar days from ``start_date``.
+
+        Args:
+            start_date: first day (default today)
+            weekdays_only: skip Saturdays and Sundays
+            room_type/min_capacity/classroom_ids: restrict the rooms up front
+
+        Returns:
+            AvailabilityMatrix
+        """
+        db = db or DatabaseManager()
+        first = date_to_ordinal(start_date or date.today())
+        day_ords = np.arange(first, first + days, dtype=np.int64)
+        weekdays = (day_ords + 6) % 7
+        if weekdays_only:
+            keep = weekdays < 5
+            day_ords, weekdays = day_ords[keep], weekdays[keep]
+
+        query = 'SELECT id, room_number, room_type, capacity, building FROM classrooms WHERE status = 1'
+        params = []
+        if room_type:
+            query += ' AND room_type = ?'
+            params.append(room_type)
+        if min_capacity:
+            query += ' AND capacity >= ?'
+            params.append(min_capacity)
+        if classroom_ids is not None:
+            query += f" AND id IN ({', '.join('?' for _ in classroom_ids) or 'NULL'})"
+            params.extend(classroom_ids)
+        rooms = [tuple(row) for row in db.execute_query(query + ' ORDER BY room_number', tuple(params)) or []]
+
+        start_min, end_min = parse_time(day_start), parse_time(day_end)
+        n_slots = -(-(end_min - start_min) // SLOT_MINUTES)
+        matrix = AvailabilityMatrix(rooms, day_ords, start_min, end_min,
+                                    np.zeros((len(rooms), len(day_ords), n_slots), dtype=bool))
+        if not rooms or not len(day_ords):
+            return matrix
+
+        room_pos = {room[0]: i for i, room in enumerate(rooms)}
+        bookings = db.execute_query('''
+            SELECT classroom_id, date_ord, start_min, end_min FROM bookings
+            WHERE status IN (1, 2) AND date_ord BETWEEN ? AND ?
+            AND start_min < ? AND end_min > ?
+        ''', (int(day_ords[0]), int(day_ords[-1]), end_min, start_min)) or []
+        occurrences = db.execute_query('''
+            SELECT o.classroom_id, o.date_ord, o.start_min, o.end_min
+            FROM schedule_occurrences o
+            JOIN schedules s ON s.id = o.schedule_id
+            WHERE s.status = 1 AND o.date_ord BETWEEN ? AND ?
+            AND o.start_min < ? AND o.end_min > ?
+        ''', (int(day_ords[0]), int(day_ords[-1]), end_min, start_min)) or []
+        schedules = db.execute_query('''
+            SELECT s.classroom_id, s.weekday, s.start_min, s.end_min FROM schedules s
+            WHERE s.status = 1 AND s.start_min < ? AND s.end_min > ?
+            AND NOT EXISTS (SELECT 1 FROM semesters m WHERE m.name = s.semester)
+        ''', (end_min, start_min)) or []
+
+        day_pos = np.full(int(day_ords[-1] - day_ords[0]) + 1, -1, dtype=np.int64)
+        day_pos[day_ords - day_ords[0]] = np.arange(len(day_ords))
+
+        rows, cols, starts, ends = [], [], [], []
+        # Bookings and dated class occurrences both sit on an ordinal day
+        for dated in (bookings, occurrences):
+            b = np.array([r for r in dated if r[0] in room_pos], dtype=np.int64).reshape(-1, 4)
+            if len(b):
+                col = day_pos[b[:, 1] - day_ords[0]]
+                keep = col >= 0
+                rows.append(np.array([room_pos[c] for c in b[keep, 0]], dtype=np.int64))
+                cols.append(col[keep])
+                starts.append(b[keep, 2])
+                ends.append(b[keep, 3])
+        if schedules:
+            s = np.array([r for r in schedules if r[0] in room_pos], dtype=np.int64).reshape(-1, 4)
+            if len(s):
+                # Expand each undated weekly schedule onto every matching day
+                sched_idx, col = np.nonzero(s[:, 1][:, None] == weekdays[None, :])
+                rows.append(np.array([room_pos[c] for c in s[sched_idx, 0]], dtype=np.int64))
+                cols.append(col)
+                starts.append(s[sched_idx, 2])
+                ends.append(s[sched_idx, 3])
+
+        if rows:
+            matrix._fill(np.concatenate(rows), np.concatenate(cols),
+                         np.concatenate(starts), np.concatenate(ends))
+        return matrix
+
+    def _fill(self, rows, cols, starts, ends):
+        """Mark intervals occupied with a difference array and a cumsum"""
+        n_slots = self.occupied.shape[2]
+        first = np.clip((starts - self.day_start) // self.slot_minutes, 0, n_slots)
+        last = np.clip(-(-(ends - self.day_start) // self.slot_minutes), 0, n_slots)
+        diff = np.zeros(self.occupied.shape[:2] + (n_slots + 1,), dtype=np.int32)
+        np.add.at(diff, (rows, cols, first), 1)
+        np.add.at(diff, (rows, cols, last), -1)
+        self.occupied = np.cumsum(diff, axis=2)[:, :, :n_slots] > 0
+
+    def _slot(self, minutes, round_up=False):
+        offset = minutes - self.day_start
+        if round_up:
+            offset = -(-offset // self.slot_minutes)
+        else:
+            offset //= self.slot_minutes
+        return int(np.clip(offset, 0, self.occupied.shape[2]))
+
+    def free_at(self, start_time, end_time):
+        """
+        Rooms x days boolean array: free for the whole range.
+
+        Ranges outside the matrix window are clipped to it.
+        """
+        first = self._slot(parse_time(start_time))
+        last = self._slot(parse_time(end_time), round_up=True)
+        return ~self.occupied[:, :, first:last].any(axis=2)
+
+    def free_rooms_on(self, booking_date, start_time, end_time):
+        """Ids of rooms free for a range on one day of the window"""
+        day = np.searchsorted(self.day_ords, date_to_ordinal(booking_date))
+        if day >= len(self.day_ords) or self.day_ords[day] != date_to_ordinal(booking_date):
+            raise ValueError(f"{booking_date} is outside the matrix window")
+        return self.room_ids[self.free_at(start_time, end_time)[:, day]].tolist()
+
+    def find_gaps(self, duration_minutes, min_capacity=None, limit=None):
+        """
+        Every maximal free run at least ``duration_minutes`` long.
+
+        Results are ranked by date, then by the smallest room that fits
+        (least spare capacity), then by start time.
+
+        Returns:
+            list: FreeSlot tuples
+        """
+        need = -(-int(duration_minutes) // self.slot_minutes)
+        free = ~self.occupied
+        if min_capacity:
+            free &= (self.capacities >= min_capacity)[:, None, None]
+
+        # Run boundaries: +1 where a free run starts, -1 one past where it ends
+        padded = np.zeros(free.shape[:2] + (free.shape[2] + 2,), dtype=np.int8)
+        padded[:, :, 1:-1] = free
+        edges = np.diff(padded, axis=2)
+        room_s, day_s, run_start = np.nonzero(edges == 1)
+        run_end = np.nonzero(edges == -1)[2]
+        length = run_end - run_start
+        keep = length >= need
+        room_s, day_s, run_start, run_end = room_s[keep], day_s[keep], run_start[keep], run_end[keep]
+
+        spare = self.capacities[room_s] - (min_capacity or 0)
+        order = np.lexsort((run_start, spare, day_s))
+        if limit is not None:
+            order = order[:limit]
+
+        day_end = self.day_end
+        return [FreeSlot(int(self.room_ids[r]), self.rooms[r][1], int(self.capacities[r]),
+                         ordinal_to_date(int(self.day_ords[d])),
+                         self.day_start + int(s) * self.slot_minutes,
+                         min(day_end, self.day_start + int(e) * self.slot_minutes))
+                for r, d, s, e in zip(room_s[order], day_s[order], run_start[order], run_end[order])]
+
+    def dates(self):
+        """Dates covered by the matrix as 'YYYY-MM-DD' strings"""
+        return [ordinal_to_date(int(o)) for o in self.day_ords]
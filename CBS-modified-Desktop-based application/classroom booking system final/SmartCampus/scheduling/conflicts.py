@@ -0,0 +1,195 @@
+"""
+Conflict Engine Module
+
+One place that decides whether a room/time request collides with
+anything. One-off bookings and weekly schedules are checked together:
+a weekly schedule occupies its room on the dates it meets (its semester
+calendar occurrences, or every matching weekday when its semester is not
+in the calendar), so a booking on a Monday is checked against that
+Monday's classes and a schedule is checked against the bookings that
+fall on its weekday.
+"""
+
+from collections import namedtuple
+from datetime import date
+
+from database.db_setup import DatabaseManager
+from utils.time_utils import (parse_time, format_minutes, date_to_ordinal, ordinal_to_date,
+                              weekday_index, weekday_of_ordinal, WEEK_DAYS)
+from scheduling.interval_index import interval_index
+from scheduling.occurrences import SCHEDULE_ON_DATE
+
+
+class Conflict(namedtuple('Conflict', 'kind item_id classroom_id course_name when start_min end_min owner_id')):
+    """A booking or schedule that collides with a request"""
+
+    __slots__ = ()
+
+    @property
+    def start_time(self):
+        return format_minutes(self.start_min)
+
+    @property
+    def end_time(self):
+        return format_minutes(self.end_min)
+
+    def describe(self):
+        """One-line human readable description"""
+        label = 'Booking' if self.kind == 'booking' else 'Class'
+        return f"{label}: {self.course_name or 'Untitled'} ({self.when} {self.start_time} - {self.end_time})"
+
+
+class ConflictEngine:
+    """Conflict checks across bookings and weekly schedules"""
+
+    @staticmethod
+    def booking_conflicts(classroom_id, booking_date, start_time, end_time,
+                          exclude_booking_id=None, conn=None):
+        """
+        Everything occupying a room during a dated time range.
+
+        Args:
+            conn: optional open connection, e.g. inside a transaction
+
+        Returns:
+            list: Conflict tuples, bookings first, each ordered by start
+        """
+        date_ord = date_to_ordinal(booking_date)
+        start_min, end_min = parse_time(start_time), parse_time(end_time)
+        query = f'''
+            SELECT 'booking', id, classroom_id, course_name, booking_date, start_min, end_min, user_id
+            FROM bookings
+            WHERE classroom_id = ? AND date_ord = ? AND status IN (1, 2)
+            AND start_min < ? AND end_min > ? AND id != ?
+            UNION ALL
+            SELECT 'schedule', s.id, s.classroom_id, s.course_name, s.day_of_week, s.start_min, s.end_min,
+                   s.teacher_id
+            FROM schedules s
+            WHERE s.classroom_id = ? AND s.weekday = ? AND s.status = 1
+            AND s.start_min < ? AND s.end_min > ?
+            AND {SCHEDULE_ON_DATE.format(alias='s')}
+            ORDER BY 1, 6
+        '''
+        params = (classroom_id, date_ord, end_min, start_min, exclude_booking_id or -1,
+                  classroom_id, weekday_of_ordinal(date_ord), end_min, start_min, date_ord)
+        return ConflictEngine._run(query, params, conn)
+
+    @staticmethod
+    def approved_conflicts(classroom_id, booking_date, start_time, end_time,
+                           exclude_booking_id=None, conn=None):
+        """
+        Approved bookings and classes occupying a room during a dated range.
+
+        Pending requests are ignored: this is the check for approving a
+        request, where other pending requests for the slot are competitors
+        rather than conflicts.
+        """
+        date_ord = date_to_ordinal(booking_date)
+        start_min, end_min = parse_time(start_time), parse_time(end_time)
+        query = f'''
+            SELECT 'booking', id, classroom_id, course_name, booking_date, start_min, end_min, user_id
+            FROM bookings
+            WHERE classroom_id = ? AND date_ord = ? AND status = 1
+            AND start_min < ? AND end_min > ? AND id != ?
+            UNION ALL
+            SELECT 'schedule', s.id, s.classroom_id, s.course_name, s.day_of_week, s.start_min, s.end_min,
+                   s.teacher_id
+            FROM schedules s
+            WHERE s.classroom_id = ? AND s.weekday = ? AND s.status = 1
+            AND s.start_min < ? AND s.end_min > ?
+            AND {SCHEDULE_ON_DATE.format(alias='s')}
+            ORDER BY 1, 6
+        '''
+        params = (classroom_id, date_ord, end_min, start_min, exclude_booking_id or -1,
+                  classroom_id, weekday_of_ordinal(date_ord), end_min, start_min, date_ord)
+        return ConflictEngine._run(query, params, conn)
+
+    @staticmethod
+    def schedule_conflicts(teacher_id, classroom_id, day_of_week, start_time, end_time,
+                           exclude_schedule_id=None, from_date=None, conn=None):
+        """
+        Everything clashing with a weekly schedule slot.
+
+        Checks other schedules for the same room or teacher on that weekday,
+        and bookings in the room (or held by the teacher) on any date from
+        ``from_date`` (default today) that falls on that weekday.
+        """
+        weekday = weekday_index(day_of_week)
+        start_min, end_min = parse_time(start_time), parse_time(end_time)
+        from_ord = date_to_ordinal(from_date or date.today())
+        # First matching date in Python, then every 7th ordinal up to the
+        # last booked date, so date_ord is matched through the indexes
+        # instead of computing a weekday for every row
+        first_ord = from_ord + (weekday - weekday_of_ordinal(from_ord)) % 7
+        query = '''
+            WITH RECURSIVE weeks(date_ord) AS (
+                SELECT ? WHERE ? <= (SELECT MAX(date_ord) FROM bookings)
+                UNION ALL
+                SELECT date_ord + 7 FROM weeks
+                WHERE date_ord + 7 <= (SELECT MAX(date_ord) FROM bookings)
+            )
+            SELECT 'booking', id, classroom_id, course_name, booking_date, start_min, end_min, user_id
+            FROM bookings
+            WHERE classroom_id = ? AND date_ord IN (SELECT date_ord FROM weeks)
+            AND status IN (1, 2) AND start_min < ? AND end_min > ?
+            UNION
+            SELECT 'booking', id, classroom_id, course_name, booking_date, start_min, end_min, user_id
+            FROM bookings
+            WHERE user_id = ? AND date_ord IN (SELECT date_ord FROM weeks)
+            AND status IN (1, 2) AND start_min < ? AND end_min > ?
+            UNION ALL
+            SELECT 'schedule', id, classroom_id, course_name, day_of_week, start_min, end_min, teacher_id
+            FROM schedules
+            WHERE (classroom_id = ? OR teacher_id = ?) AND weekday = ? AND status = 1
+            AND start_min < ? AND end_min > ? AND id != ?
+            ORDER BY 1, 5, 6
+        '''
+        params = (first_ord, first_ord,
+                  classroom_id, end_min, start_min,
+                  teacher_id, end_min, start_min,
+                  classroom_id, teacher_id, weekday, end_min, start_min, exclude_schedule_id or -1)
+        return ConflictEngine._run(query, params, conn)
+
+    @staticmethod
+    def booking_conflicts_many(requests, conn=None):
+        """
+        Batch form of ``booking_conflicts`` served from the interval index.
+
+        The index is brought up to date with ``change_log`` once for the
+        batch; inside a transaction holding the write lock the answer is
+        exact. Dates the index does not hold (before the day it was
+        loaded) are checked in SQL instead.
+
+        Args:
+            requests: iterable of (classroom_id, date, start_time, end_time)
+            conn: optional open connection for the SQL checks
+
+        Returns:
+            list: one list of Conflict tuples per request
+        """
+        requests = list(requests)
+        covered = [interval_index.covers(booking_date) for _, booking_date, _, _ in requests]
+        hits = iter(interval_index.find_many(
+            [request for request, ok in zip(requests, covered) if ok]))
+        results = []
+        for request, ok in zip(requests, covered):
+            if ok:
+                date_ord = date_to_ordinal(request[1])
+                results.append([ConflictEngine._from_interval(hit, date_ord) for hit in next(hits)])
+            else:
+                results.append(ConflictEngine.booking_conflicts(*request, conn=conn))
+        return results
+
+    @staticmethod
+    def _from_interval(interval, date_ord):
+        when = ordinal_to_date(date_ord) if interval.kind == 'booking' else WEEK_DAYS[interval.day]
+        return Conflict(interval.kind, interval.item_id, interval.classroom_id, interval.label,
+                        when, interval.start_min, interval.end_min, interval.owner_id)
+
+    @staticmethod
+    def _run(query, params, conn=None):
+        if conn is not None:
+            rows = conn.execute(query, params).fetchall()
+        else:
+            rows = DatabaseManager().execute_query(query, params) or []
+        return [Conflict(*row) for row in rows]
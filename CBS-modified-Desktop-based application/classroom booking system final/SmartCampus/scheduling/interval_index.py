@@ -0,0 +1,442 @@
+"""
+Interval Index Module
+
+In-process index of occupied time ranges used for conflict detection.
+Active bookings are kept per (room, ordinal day). Weekly schedules
+follow the semester calendar like ``SCHEDULE_ON_DATE``: a schedule whose
+semester is in the calendar is kept per (room, ordinal day) for each of
+its ``schedule_occurrences``, and one whose semester is not is kept per
+(room, weekday). Each bucket holds its intervals sorted by start time
+together with a running maximum of end times, so an overlap query is a
+binary search plus a walk over the actual hits. Each bucket also keeps a
+slot occupancy bitmap (see ``utils.time_utils.slot_mask``) for
+availability scans. Buckets are plain sorted lists rather than a balanced
+tree: inserting or removing an interval costs O(n) in the size of its
+bucket, which is one room on one day and so holds tens of intervals at
+most.
+
+The index is loaded lazily from the database and kept current by the
+model write paths of this process. Writes by other processes are picked
+up from ``change_log``: every query first checks the journal sequence
+and re-reads the bookings that changed since (or the schedules and
+their occurrences, when any of those changed). Only dates from the day
+the index was loaded are held; see ``covers``.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import date
+import threading
+
+from database.db_setup import DatabaseManager
+from utils.time_utils import parse_time, date_to_ordinal, weekday_of_ordinal, slot_mask
+
+# kind is 'booking' or 'schedule'; day is the ordinal day for bookings
+# and the weekday index (0=Monday) for schedules
+Interval = namedtuple('Interval', 'kind item_id classroom_id day start_min end_min label owner_id')
+
+# Journal tables whose changes re-read every schedule and occurrence
+SCHEDULE_TABLES = ('schedules', 'semesters', 'holidays', 'schedule_occurrences')
+
+# Changed bookings re-read one by one up to this many; beyond it a full
+# reload is cheaper
+MAX_SYNC_BOOKINGS = 2000
+
+
+class _IntervalList:
+    """
+    Intervals of one bucket sorted by start, with prefix max of ends.
+
+    Queries are O(log n + hits). ``insert`` shifts the lists and
+    recomputes the prefix maximum from the insertion point, and
+    ``remove`` also rebuilds the bitmap, so both are O(n).
+    """
+
+    __slots__ = ('entries', 'starts', 'max_end', 'bits')
+
+    def __init__(self):
+        self.entries = []
+        self.starts = []
+        self.max_end = []
+        self.bits = 0
+
+    def insert(self, entry):
+        i = bisect_right(self.starts, entry.start_min)
+        self.entries.insert(i, entry)
+        self.starts.insert(i, entry.start_min)
+        self._rebuild_from(i)
+        self.bits |= slot_mask(entry.start_min, entry.end_min)
+
+    def remove(self, entry):
+        i = self.entries.index(entry)
+        del self.entries[i]
+        del self.starts[i]
+        self._rebuild_from(i)
+        self.bits = 0
+        for other in self.entries:
+            self.bits |= slot_mask(other.start_min, other.end_min)
+
+    def _rebuild_from(self, i):
+        running = self.max_end[i - 1] if i > 0 else -1
+        del self.max_end[i:]
+        for entry in self.entries[i:]:
+            running = max(running, entry.end_min)
+            self.max_end.append(running)
+
+    def any_overlap(self, start_min, end_min):
+        hi = bisect_left(self.starts, end_min)
+        return hi > 0 and self.max_end[hi - 1] > start_min
+
+    def overlapping(self, start_min, end_min):
+        # Entries [0, hi) start before end_min; walk back while some of
+        # them can still end after start_min
+        i = bisect_left(self.starts, end_min) - 1
+        found = []
+        while i >= 0 and self.max_end[i] > start_min:
+            entry = self.entries[i]
+            if entry.end_min > start_min:
+                found.append(entry)
+            i -= 1
+        found.reverse()
+        return found
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class IntervalIndex:
+    """Per room-day interval index over active bookings and schedules"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self.loaded = False
+        self.from_ord = None
+        self.seq = 0
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._bookings = {}   # (classroom_id, date_ord) -> _IntervalList
+        self._clear_schedules()
+        self._by_booking = {}   # booking id -> Interval
+
+    def _clear_schedules(self):
+        self._schedules = {}    # (classroom_id, weekday) -> _IntervalList, undated schedules
+        self._occurrences = {}  # (classroom_id, date_ord) -> _IntervalList, dated schedules
+        self._by_schedule = {}  # schedule id -> Interval of an undated schedule
+        self._dated = {}        # schedule id -> [(bucket key, Interval)] of a dated schedule
+
+    def _connect(self):
+        return self._db().get_connection()
+
+    def _db(self):
+        return DatabaseManager(self.db_path) if self.db_path else DatabaseManager()
+
+    # Loading
+    def load(self, from_date=None):
+        """(Re)load active bookings from ``from_date`` (default today) and schedules"""
+        from_ord = date_to_ordinal(from_date or date.today())
+        conn = self._connect()
+        try:
+            # One read transaction, so the data matches the journal sequence
+            conn.execute('BEGIN')
+            seq = self._current_seq(conn)
+            bookings = conn.execute('''
+                SELECT id, classroom_id, date_ord, start_min, end_min, course_name, user_id
+                FROM bookings
+                WHERE status IN (1, 2) AND date_ord >= ?
+            ''', (from_ord,)).fetchall()
+            schedules, occurrences = self._read_schedules(conn, from_ord)
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._clear()
+            for row in bookings:
+                self._insert('booking', *row)
+            self._load_schedules(schedules, occurrences)
+            self.from_ord = from_ord
+            self.seq = seq
+            self.loaded = True
+        return self
+
+    @staticmethod
+    def _current_seq(conn):
+        return conn.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+
+    @staticmethod
+    def _read_schedules(conn, from_ord):
+        """Active schedules (with whether their semester is dated) and their occurrences"""
+        schedules = conn.execute('''
+            SELECT s.id, s.classroom_id, s.weekday, s.start_min, s.end_min, s.course_name, s.teacher_id,
+                   EXISTS (SELECT 1 FROM semesters m WHERE m.name = s.semester)
+            FROM schedules s
+            WHERE s.status = 1
+        ''').fetchall()
+        occurrences = conn.execute('''
+            SELECT o.schedule_id, o.date_ord
+            FROM schedule_occurrences o
+            JOIN schedules s ON s.id = o.schedule_id
+            WHERE s.status = 1 AND o.date_ord >= ?
+        ''', (from_ord,)).fetchall()
+        return schedules, occurrences
+
+    def _load_schedules(self, schedules, occurrences):
+        self._clear_schedules()
+        dated = {}
+        for row in schedules:
+            if row[7]:
+                dated[row[0]] = tuple(row[:7])
+            else:
+                self._insert('schedule', *row[:7])
+        for schedule_id, date_ord in occurrences:
+            row = dated.get(schedule_id)
+            if row is None or row[2] is None or row[3] is None or row[4] is None:
+                continue
+            entry = Interval('schedule', *row)
+            key = (entry.classroom_id, date_ord)
+            self._occurrences.setdefault(key, _IntervalList()).insert(entry)
+            self._dated.setdefault(schedule_id, []).append((key, entry))
+
+    def ensure_loaded(self):
+        """Load the index, or bring it up to date with ``change_log``"""
+        if not self.loaded:
+            self.load()
+        else:
+            self.sync()
+        return self
+
+    def sync(self):
+        """
+        Apply changes other connections made since the index was read.
+
+        Reads the ``change_log`` entries after the index's sequence.
+        Changed bookings are re-read one by one, and any change to
+        schedules, semesters, holidays or occurrences re-reads all
+        schedules. A gap in the sequence (pruned journal) or a large
+        backlog reloads everything. Called while a transaction holds the
+        write lock, the index then matches the committed database exactly.
+        """
+        if not self.loaded:
+            return self.load()
+        conn = self._connect()
+        try:
+            with self._lock:
+                changes = conn.execute('SELECT seq, table_name, row_id FROM change_log WHERE seq > ? ORDER BY seq',
+                                       (self.seq,)).fetchall()
+                if not changes:
+                    return self
+                booking_ids, schedules_changed, expected = set(), False, self.seq + 1
+                for seq, table_name, row_id in changes:
+                    if seq != expected:
+                        break
+                    expected += 1
+                    if table_name == 'bookings':
+                        booking_ids.add(row_id)
+                    elif table_name in SCHEDULE_TABLES:
+                        schedules_changed = True
+                else:
+                    if len(booking_ids) <= MAX_SYNC_BOOKINGS:
+                        self._apply_changes(conn, booking_ids, schedules_changed)
+                        self.seq = changes[-1][0]
+                        return self
+        finally:
+            conn.close()
+        return self.load()
+
+    def _apply_changes(self, conn, booking_ids, schedules_changed):
+        booking_ids = sorted(i for i in booking_ids if i is not None)
+        for i in range(0, len(booking_ids), 500):
+            chunk = booking_ids[i:i + 500]
+            marks = ', '.join('?' for _ in chunk)
+            rows = conn.execute(f'''
+                SELECT id, classroom_id, date_ord, start_min, end_min, course_name, user_id
+                FROM bookings
+                WHERE id IN ({marks}) AND status IN (1, 2) AND date_ord >= ?
+            ''', (*chunk, self.from_ord)).fetchall()
+            active = set()
+            for row in rows:
+                self._insert('booking', *row)
+                active.add(row[0])
+            for booking_id in chunk:
+                if booking_id not in active:
+                    self._discard('booking', booking_id)
+        if schedules_changed:
+            self._load_schedules(*self._read_schedules(conn, self.from_ord))
+
+    def covers(self, booking_date):
+        """True if bookings on this date are held by the index"""
+        if not self.loaded:
+            self.load()
+        return date_to_ordinal(booking_date) >= self.from_ord
+
+    def _insert(self, kind, item_id, classroom_id, day, start_min, end_min, label=None, owner_id=None):
+        if day is None or start_min is None or end_min is None:
+            return
+        entry = Interval(kind, item_id, classroom_id, day, start_min, end_min, label, owner_id)
+        buckets, by_id = ((self._bookings, self._by_booking) if kind == 'booking'
+                          else (self._schedules, self._by_schedule))
+        old = by_id.pop(item_id, None)
+        if old is not None:
+            buckets[(old.classroom_id, old.day)].remove(old)
+        buckets.setdefault((classroom_id, day), _IntervalList()).insert(entry)
+        by_id[item_id] = entry
+
+    def _discard(self, kind, item_id):
+        buckets, by_id = ((self._bookings, self._by_booking) if kind == 'booking'
+                          else (self._schedules, self._by_schedule))
+        old = by_id.pop(item_id, None)
+        if old is not None:
+            bucket = buckets[(old.classroom_id, old.day)]
+            bucket.remove(old)
+            if not bucket:
+                del buckets[(old.classroom_id, old.day)]
+
+    # Write hooks
+    def add_booking(self, booking_id, classroom_id, date_ord, start_min, end_min, label=None, owner_id=None):
+        """Record an active booking (no-op until the index is loaded)"""
+        if self.loaded:
+            with self._lock:
+                self._insert('booking', booking_id, classroom_id, date_ord, start_min, end_min, label, owner_id)
+
+    def remove_booking(self, booking_id):
+        """Forget a booking that was cancelled, rejected or deleted"""
+        if self.loaded:
+            with self._lock:
+                self._discard('booking', booking_id)
+
+    def booking_changed(self, booking_id):
+        """Re-read one booking after an arbitrary update"""
+        if not self.loaded:
+            return
+        rows = self._db().execute_query('''
+            SELECT id, classroom_id, date_ord, start_min, end_min, course_name, user_id
+            FROM bookings WHERE id = ? AND status IN (1, 2)
+        ''', (booking_id,))
+        with self._lock:
+            if rows:
+                self._insert('booking', *rows[0])
+            else:
+                self._discard('booking', booking_id)
+
+    def schedule_changed(self, schedule_id):
+        """Re-read schedules after one was created, updated or removed"""
+        if self.loaded:
+            self.sync()
+
+    # Queries
+    def _schedule_buckets(self, classroom_id, date_ord):
+        """Buckets of the classes meeting in a room on a day: dated, then undated"""
+        buckets = []
+        bucket = self._occurrences.get((classroom_id, date_ord))
+        if bucket:
+            buckets.append(bucket)
+        bucket = self._schedules.get((classroom_id, weekday_of_ordinal(date_ord)))
+        if bucket:
+            buckets.append(bucket)
+        return buckets
+
+    def _find(self, classroom_id, date_ord, start_min, end_min, include_schedules):
+        found = []
+        bucket = self._bookings.get((classroom_id, date_ord))
+        if bucket:
+            found.extend(bucket.overlapping(start_min, end_min))
+        if include_schedules:
+            schedules = []
+            for bucket in self._schedule_buckets(classroom_id, date_ord):
+                schedules.extend(bucket.overlapping(start_min, end_min))
+            schedules.sort(key=lambda entry: entry.start_min)
+            found.extend(schedules)
+        return found
+
+    def find(self, classroom_id, booking_date, start_time, end_time, include_schedules=True):
+        """
+        Intervals in a room overlapping a time range on a date.
+
+        Returns:
+            list: Interval tuples, bookings first, each group by start time
+        """
+        self.ensure_loaded()
+        date_ord = date_to_ordinal(booking_date)
+        with self._lock:
+            return self._find(classroom_id, date_ord, parse_time(start_time), parse_time(end_time),
+                              include_schedules)
+
+    def is_free(self, classroom_id, booking_date, start_time, end_time, include_schedules=True):
+        """True if nothing in the room overlaps the range"""
+        self.ensure_loaded()
+        date_ord = date_to_ordinal(booking_date)
+        start_min, end_min = parse_time(start_time), parse_time(end_time)
+        with self._lock:
+            bucket = self._bookings.get((classroom_id, date_ord))
+            if bucket and bucket.any_overlap(start_min, end_min):
+                return False
+            if include_schedules:
+                for bucket in self._schedule_buckets(classroom_id, date_ord):
+                    if bucket.any_overlap(start_min, end_min):
+                        return False
+            return True
+
+    def find_many(self, requests, include_schedules=True):
+        """
+        Batch conflict lookup without a database round trip per request.
+
+        The index is synced with ``change_log`` once for the whole batch.
+        Dates before ``from_ord`` are not held; check ``covers`` first.
+
+        Args:
+            requests: iterable of (classroom_id, date, start_time, end_time)
+
+        Returns:
+            list: one list of overlapping Interval tuples per request
+        """
+        self.ensure_loaded()
+        with self._lock:
+            return [self._find(classroom_id, date_to_ordinal(booking_date), parse_time(start_time),
+                               parse_time(end_time), include_schedules)
+                    for classroom_id, booking_date, start_time, end_time in requests]
+
+    def occupancy(self, classroom_id, booking_date, include_schedules=True):
+        """Slot bitmap of everything occupying a room on a date"""
+        self.ensure_loaded()
+        date_ord = date_to_ordinal(booking_date)
+        with self._lock:
+            bucket = self._bookings.get((classroom_id, date_ord))
+            bits = bucket.bits if bucket else 0
+            if include_schedules:
+                for bucket in self._schedule_buckets(classroom_id, date_ord):
+                    bits |= bucket.bits
+            return bits
+
+    def occupancy_many(self, classroom_ids, booking_date, include_schedules=True):
+        """Slot bitmaps of several rooms on a date, with one ``change_log`` check"""
+        self.ensure_loaded()
+        date_ord = date_to_ordinal(booking_date)
+        with self._lock:
+            result = {}
+            for classroom_id in classroom_ids:
+                bucket = self._bookings.get((classroom_id, date_ord))
+                bits = bucket.bits if bucket else 0
+                if include_schedules:
+                    for bucket in self._schedule_buckets(classroom_id, date_ord):
+                        bits |= bucket.bits
+                result[classroom_id] = bits
+            return result
+
+    def intervals_on(self, classroom_id, booking_date, include_schedules=True):
+        """All intervals in a room on a date, bookings then schedules"""
+        self.ensure_loaded()
+        date_ord = date_to_ordinal(booking_date)
+        with self._lock:
+            found = list(self._bookings.get((classroom_id, date_ord), _IntervalList()).entries)
+            if include_schedules:
+                schedules = []
+                for bucket in self._schedule_buckets(classroom_id, date_ord):
+                    schedules.extend(bucket.entries)
+                schedules.sort(key=lambda entry: entry.start_min)
+                found.extend(schedules)
+            return found
+
+
+# Shared process-wide index
+interval_index = IntervalIndex()
@@ -0,0 +1,142 @@
+"""
+Schedule Occurrences Module
+
+Materializes weekly schedules into dated rows of ``schedule_occurrences``
+using the semester calendar: one row per date between the semester's
+start and end that falls on the schedule's weekday and is not a holiday.
+Date questions ("what is in room S-6 on 2026-11-03") then become indexed
+lookups instead of weekday arithmetic.
+
+Schedules whose semester is not in the calendar cannot be dated; they
+keep their old meaning of "every week on that day" and queries fall back
+to the weekday for them (see ``SCHEDULE_ON_DATE``).
+
+The table is derived data. Call ``ScheduleCalendar.refresh_schedule``
+after a schedule changes and ``refresh_semester`` after its semester or
+holidays change.
+"""
+
+from database.db_setup import DatabaseManager
+from utils.time_utils import date_to_ordinal, ordinal_to_date, weekday_of_ordinal
+
+# SQL condition: schedule row ``{alias}`` meets on the ordinal day bound
+# to the single placeholder. Use with str.format(alias=...).
+SCHEDULE_ON_DATE = '''(
+    NOT EXISTS (SELECT 1 FROM semesters m WHERE m.name = {alias}.semester)
+    OR EXISTS (SELECT 1 FROM schedule_occurrences o
+               WHERE o.schedule_id = {alias}.id AND o.date_ord = ?)
+)'''
+
+
+class ScheduleCalendar:
+    """Refresh and query dated schedule occurrences"""
+
+    @staticmethod
+    def refresh_schedule(schedule_id, conn=None):
+        """Regenerate the occurrences of one schedule"""
+        return ScheduleCalendar._refresh('s.id = ?', (schedule_id,),
+                                         'schedule_id = ?', (schedule_id,), conn)
+
+    @staticmethod
+    def refresh_semester(semester_name, conn=None):
+        """Regenerate the occurrences of every schedule in a semester"""
+        return ScheduleCalendar._refresh(
+            's.semester = ?', (semester_name,),
+            'schedule_id IN (SELECT id FROM schedules WHERE semester = ?)', (semester_name,), conn)
+
+    @staticmethod
+    def refresh_all(conn=None):
+        """Regenerate the whole table"""
+        return ScheduleCalendar._refresh('1 = 1', (), '1 = 1', (), conn)
+
+    @staticmethod
+    def _refresh(schedule_filter, schedule_params, delete_filter, delete_params, conn=None):
+        if conn is None:
+            try:
+                with DatabaseManager().transaction() as conn:
+                    return ScheduleCalendar._refresh(schedule_filter, schedule_params,
+                                                     delete_filter, delete_params, conn)
+            except Exception as e:
+                print(f"Refresh schedule occurrences error: {e}")
+                return 0
+
+        conn.execute(f'DELETE FROM schedule_occurrences WHERE {delete_filter}', delete_params)
+        # One journal entry per refresh rather than a trigger per occurrence row
+        conn.execute("INSERT INTO change_log (table_name, op) VALUES ('schedule_occurrences', 'refresh')")
+        schedules = conn.execute(f'''
+            SELECT s.id, s.classroom_id, s.teacher_id, s.weekday, s.start_min, s.end_min,
+                   m.id, m.start_ord, m.end_ord
+            FROM schedules s
+            JOIN semesters m ON m.name = s.semester
+            WHERE s.status = 1 AND s.weekday IS NOT NULL AND ({schedule_filter})
+        ''', schedule_params).fetchall()
+        if not schedules:
+            return 0
+
+        first = min(row[7] for row in schedules)
+        last = max(row[8] for row in schedules)
+        holidays = {}
+        for date_ord, semester_id in conn.execute(
+                'SELECT date_ord, semester_id FROM holidays WHERE date_ord BETWEEN ? AND ?',
+                (first, last)).fetchall():
+            holidays.setdefault(semester_id, set()).add(date_ord)
+        shared = holidays.get(None, set())
+
+        rows = []
+        for (schedule_id, classroom_id, teacher_id, weekday, start_min, end_min,
+             semester_id, start_ord, end_ord) in schedules:
+            skip = shared | holidays.get(semester_id, set())
+            day = start_ord + (weekday - weekday_of_ordinal(start_ord)) % 7
+            while day <= end_ord:
+                if day not in skip:
+                    rows.append((schedule_id, day, classroom_id, teacher_id, start_min, end_min))
+                day += 7
+        conn.executemany('''
+            INSERT INTO schedule_occurrences
+            (schedule_id, date_ord, classroom_id, teacher_id, start_min, end_min)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        return len(rows)
+
+    @staticmethod
+    def schedule_dates(schedule_id):
+        """Dates on which a schedule meets, as 'YYYY-MM-DD' strings"""
+        try:
+            results = DatabaseManager().execute_query(
+                'SELECT date_ord FROM schedule_occurrences WHERE schedule_id = ? ORDER BY date_ord',
+                (schedule_id,))
+            return [ordinal_to_date(row[0]) for row in results] if results else []
+        except Exception as e:
+            print(f"Get schedule dates error: {e}")
+            return []
+
+    @staticmethod
+    def room_day(classroom_id, booking_date):
+        """
+        Classes and active bookings in a room on a date, by start time.
+
+        Returns:
+            list: scheduling.conflicts.Conflict tuples
+        """
+        from scheduling.conflicts import Conflict
+        try:
+            date_ord = date_to_ordinal(booking_date)
+            query = f'''
+                SELECT 'schedule', s.id, s.classroom_id, s.course_name, ?, s.start_min, s.end_min, s.teacher_id
+                FROM schedules s
+                WHERE s.classroom_id = ? AND s.weekday = ? AND s.status = 1
+                AND {SCHEDULE_ON_DATE.format(alias='s')}
+                UNION ALL
+                SELECT 'booking', b.id, b.classroom_id, b.course_name, b.booking_date, b.start_min, b.end_min, b.user_id
+                FROM bookings b
+                WHERE b.classroom_id = ? AND b.date_ord = ? AND b.status IN (1, 2)
+                ORDER BY 6
+            '''
+            date_str = ordinal_to_date(date_ord)
+            results = DatabaseManager().execute_query(query, (
+                date_str, classroom_id, weekday_of_ordinal(date_ord), date_ord,
+                classroom_id, date_ord))
+            return [Conflict(*row) for row in results] if results else []
+        except Exception as e:
+            print(f"Get room day error: {e}")
+            return []
@@ -0,0 +1,71 @@
+"""
+Recurrence Module
+
+Expansion of recurring booking requests into dated occurrences.
+
+Example:
+    rule = RecurrenceRule('weekly', count=10, skip_dates=['2026-11-09'])
+    rule.occurrences('2026-10-19')   # 10 Mondays, 2026-11-09 skipped
+"""
+
+from config import RECURRENCE_MAX_OCCURRENCES
+from utils.time_utils import date_to_ordinal, ordinal_to_date
+
+# Frequency name -> days between occurrences
+FREQUENCIES = {
+    'weekly': 7,
+    'biweekly': 14,
+}
+
+
+class RecurrenceRule:
+    """A weekly or biweekly repeat ending on a date or after N occurrences"""
+
+    def __init__(self, frequency='weekly', until=None, count=None, skip_dates=()):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {frequency!r}")
+        if until is None and count is None:
+            raise ValueError("A recurrence needs an end date or a count")
+        if count is not None and count < 1:
+            raise ValueError("Occurrence count must be at least 1")
+        self.frequency = frequency
+        self.until = until
+        self.count = count
+        self.skip_dates = list(skip_dates)
+
+    def occurrences(self, start_date):
+        """
+        Dates of the series starting at ``start_date``.
+
+        Skipped dates do not count towards ``count``; the series is capped
+        at ``RECURRENCE_MAX_OCCURRENCES``.
+
+        Returns:
+            list: 'YYYY-MM-DD' strings in date order
+        """
+        step = FREQUENCIES[self.frequency]
+        day = date_to_ordinal(start_date)
+        last = date_to_ordinal(self.until) if self.until is not None else None
+        skip = {date_to_ordinal(d) for d in self.skip_dates}
+        limit = min(self.count or RECURRENCE_MAX_OCCURRENCES, RECURRENCE_MAX_OCCURRENCES)
+
+        dates = []
+        while len(dates) < limit and (last is None or day <= last):
+            if day not in skip:
+                dates.append(ordinal_to_date(day))
+            day += step
+        return dates
+
+    def describe(self):
+        """Short human readable form, stored with the series"""
+        text = 'Weekly' if self.frequency == 'weekly' else 'Every 2 weeks'
+        if self.count is not None:
+            text += f", {self.count} times"
+        if self.until is not None:
+            text += f", until {ordinal_to_date(date_to_ordinal(self.until))}"
+        if self.skip_dates:
+            text += ", skipping " + ", ".join(self.skip_dates)
+        return text
+
+    def __repr__(self):
+        return f"<RecurrenceRule({self.describe()})>"
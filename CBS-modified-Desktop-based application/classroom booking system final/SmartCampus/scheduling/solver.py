@@ -0,0 +1,352 @@
+"""
+Timetable Solver Module
+
+Assigns rooms and weekly slots to course sessions without clashes:
+no room or teacher is double booked and the sessions of one course fall
+on different days. Rooms must match the course's room type and seat its
+capacity.
+
+The solver works on per room/day and per teacher/day slot bitmaps
+(Python ints, one bit per ``SOLVER_SLOT_MINUTES``). A greedy pass places
+the most constrained sessions first in the smallest fitting room; a
+min-conflicts local search then repairs what is left by evicting the
+fewest already placed sessions. Sessions that still cannot be placed are
+reported with the reason.
+
+Example:
+    solver = TimetableSolver().load_rooms().block_existing()
+    result = solver.solve([Course('SE-613 DSA', teacher_id=3, duration=90, sessions=2,
+                                  room_type='Theory', capacity=40)])
+    result.save('Spring 2027')
+"""
+
+from collections import namedtuple, deque
+import random
+import time
+
+from database.db_setup import DatabaseManager
+from config import TIME_SLOTS, SOLVER_SLOT_MINUTES
+from utils.time_utils import parse_time, format_minutes, WEEK_DAYS
+from scheduling.interval_index import interval_index
+from scheduling.occurrences import ScheduleCalendar
+
+
+class Course(namedtuple('Course', 'name teacher_id duration sessions room_type capacity')):
+    """A course to timetable: ``sessions`` meetings of ``duration`` minutes a week"""
+
+    __slots__ = ()
+
+    def __new__(cls, name, teacher_id, duration, sessions=1, room_type=None, capacity=0):
+        return super().__new__(cls, name, teacher_id, duration, sessions, room_type, capacity)
+
+
+Placement = namedtuple('Placement', 'course classroom_id weekday start_min end_min')
+Unplaced = namedtuple('Unplaced', 'course session reason')
+
+
+class TimetableResult:
+    """Placements found by the solver and the sessions it could not place"""
+
+    def __init__(self, placements, unplaced, elapsed):
+        self.placements = placements
+        self.unplaced = unplaced
+        self.elapsed = elapsed
+
+    @property
+    def complete(self):
+        return not self.unplaced
+
+    def save(self, semester, status=1):
+        """
+        Insert every placement as a schedule in one transaction.
+
+        Returns:
+            list: ids of the created schedules
+        """
+        try:
+            ids = []
+            with DatabaseManager().transaction() as conn:
+                for p in self.placements:
+                    ids.append(conn.execute('''
+                        INSERT INTO schedules
+                        (teacher_id, classroom_id, course_name, day_of_week,
+                         start_time, end_time, semester, status,
+                         weekday, start_min, end_min)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (p.course.teacher_id, p.classroom_id, p.course.name, WEEK_DAYS[p.weekday],
+                          format_minutes(p.start_min), format_minutes(p.end_min), semester, status,
+                          p.weekday, p.start_min, p.end_min)).lastrowid)
+                ScheduleCalendar.refresh_semester(semester, conn)
+            for schedule_id in ids:
+                interval_index.schedule_changed(schedule_id)
+            return ids
+        except Exception as e:
+            print(f"Save timetable error: {e}")
+            return []
+
+    def __repr__(self):
+        return (f"<TimetableResult(placed={len(self.placements)}, unplaced={len(self.unplaced)}, "
+                f"{self.elapsed:.2f}s)>")
+
+
+class TimetableSolver:
+    """Greedy construction plus min-conflicts repair over slot bitmaps"""
+
+    def __init__(self, days=5, day_start=TIME_SLOTS[0], day_end=TIME_SLOTS[-1],
+                 slot_minutes=SOLVER_SLOT_MINUTES, time_limit=10.0, seed=0):
+        self.days = list(range(days))
+        self.day_start = parse_time(day_start)
+        self.slot = slot_minutes
+        self.n_slots = (parse_time(day_end) - self.day_start) // slot_minutes
+        self.full = (1 << self.n_slots) - 1
+        self.time_limit = time_limit
+        self.random = random.Random(seed)
+        self.rooms = []            # (id, room_type, capacity)
+        self.room_fixed = {}       # (room_id, day) -> bits taken by existing schedules
+        self.teacher_fixed = {}    # (teacher_id, day) -> bits
+
+    # Inputs
+    def load_rooms(self, db=None):
+        """Use every active classroom"""
+        db = db or DatabaseManager()
+        rows = db.execute_query('SELECT id, room_type, capacity FROM classrooms WHERE status = 1') or []
+        self.rooms = [(row[0], row[1], row[2] or 0) for row in rows]
+        return self
+
+    def add_room(self, classroom_id, room_type, capacity):
+        self.rooms.append((classroom_id, room_type, capacity or 0))
+        return self
+
+    def block(self, classroom_id, teacher_id, weekday, start_min, end_min):
+        """Mark a fixed commitment the solver must work around"""
+        bits = self._mask(start_min, end_min)
+        if not bits or weekday not in self.days:
+            return self
+        if classroom_id is not None:
+            key = (classroom_id, weekday)
+            self.room_fixed[key] = self.room_fixed.get(key, 0) | bits
+        if teacher_id is not None:
+            key = (teacher_id, weekday)
+            self.teacher_fixed[key] = self.teacher_fixed.get(key, 0) | bits
+        return self
+
+    def block_existing(self, semester=None, db=None):
+        """Treat active schedules (optionally of one semester) as fixed"""
+        db = db or DatabaseManager()
+        query = 'SELECT classroom_id, teacher_id, weekday, start_min, end_min FROM schedules WHERE status = 1'
+        params = ()
+        if semester is not None:
+            query += ' AND semester = ?'
+            params = (semester,)
+        for row in db.execute_query(query, params) or []:
+            if None not in (row[2], row[3], row[4]):
+                self.block(*row)
+        return self
+
+    def _mask(self, start_min, end_min):
+        first = max(0, (start_min - self.day_start) // self.slot)
+        last = min(self.n_slots, -(-(end_min - self.day_start) // self.slot))
+        return ((1 << (last - first)) - 1) << first if last > first else 0
+
+    # Solving
+    def solve(self, courses):
+        """
+        Timetable a list of Course tuples.
+
+        Returns:
+            TimetableResult
+        """
+        started = time.perf_counter()
+        deadline = started + self.time_limit
+        self._reset()
+
+        unplaced = []
+        for course_idx, course in enumerate(courses):
+            reason = self._check(course)
+            length = -(-course.duration // self.slot)
+            rooms = sorted((room for room in self.rooms
+                            if (course.room_type is None or room[1] == course.room_type)
+                            and room[2] >= (course.capacity or 0)),
+                           key=lambda room: room[2])
+            for n in range(course.sessions):
+                if reason:
+                    unplaced.append(Unplaced(course, n, reason))
+                    continue
+                self.sessions.append((course_idx, course, n, length, [room[0] for room in rooms]))
+
+        # Most constrained first: fewest rooms, then longest, then most sessions
+        order = sorted(range(len(self.sessions)),
+                       key=lambda sid: (len(self.sessions[sid][4]), -self.sessions[sid][3],
+                                        -self.sessions[sid][1].sessions))
+        queue = deque(sid for sid in order if not self._place_greedy(sid))
+        blocked = self._repair(queue, deadline)
+
+        for sid in blocked:
+            _, course, n, _, _ = self.sessions[sid]
+            unplaced.append(Unplaced(course, n, "teacher or rooms are taken by fixed commitments at every slot"))
+        if queue:
+            overloaded = self._overloaded()
+            for sid in queue:
+                _, course, n, _, _ = self.sessions[sid]
+                reason = (overloaded.get(('teacher', course.teacher_id))
+                          or overloaded.get(('room_type', course.room_type))
+                          or "no clash-free slot found within the search limit")
+                unplaced.append(Unplaced(course, n, reason))
+
+        placements = []
+        for sid, (room_id, day, pos) in sorted(self.placed.items()):
+            course = self.sessions[sid][1]
+            start = self.day_start + pos * self.slot
+            placements.append(Placement(course, room_id, day, start, start + course.duration))
+        placements.sort(key=lambda p: (p.weekday, p.start_min, p.classroom_id))
+        return TimetableResult(placements, unplaced, time.perf_counter() - started)
+
+    def _check(self, course):
+        """Reason a course can never be placed, or None"""
+        if course.duration <= 0 or course.sessions < 1:
+            return "duration and sessions must be positive"
+        if -(-course.duration // self.slot) > self.n_slots:
+            return "session is longer than the teaching day"
+        if course.sessions > len(self.days):
+            return f"needs {course.sessions} sessions but there are only {len(self.days)} teaching days"
+        if not any((course.room_type is None or room[1] == course.room_type) and room[2] >= (course.capacity or 0)
+                   for room in self.rooms):
+            kind = f"{course.room_type} room" if course.room_type else "room"
+            return f"no active {kind} seats {course.capacity}"
+        return None
+
+    def _overloaded(self):
+        """Teachers and room types whose weekly demand exceeds the free slots"""
+        demand = {}
+        for _, course, _, length, _ in self.sessions:
+            for key in (('teacher', course.teacher_id), ('room_type', course.room_type)):
+                demand[key] = demand.get(key, 0) + length
+
+        week = self.n_slots * len(self.days)
+        reasons = {}
+        for (kind, value), needed in demand.items():
+            if kind == 'teacher':
+                fixed = sum(bin(self.teacher_fixed.get((value, d), 0)).count('1') for d in self.days)
+                supply = week - fixed
+                label = f"teacher {value}"
+            else:
+                rooms = [room[0] for room in self.rooms if value is None or room[1] == value]
+                fixed = sum(bin(self.room_fixed.get((r, d), 0)).count('1') for r in rooms for d in self.days)
+                supply = week * len(rooms) - fixed
+                label = f"{value} rooms" if value else "rooms"
+            if needed > supply:
+                reasons[(kind, value)] = (f"{label} need {needed * self.slot} minutes a week "
+                                          f"but only {supply * self.slot} are free")
+        return reasons
+
+    def _reset(self):
+        self.sessions = []         # sid -> (course_idx, course, n, length, room ids)
+        self.placed = {}           # sid -> (room_id, day, pos)
+        self.room_bits = dict(self.room_fixed)
+        self.teacher_bits = dict(self.teacher_fixed)
+        self.room_sessions = {}    # (room_id, day) -> set of sids
+        self.teacher_sessions = {}
+        self.course_days = {}      # course_idx -> {day: sid}
+
+    def _windows(self, busy, length):
+        """Bitmap of start positions where ``length`` free slots fit"""
+        free = ~busy & self.full
+        fits = free
+        for shift in range(1, length):
+            fits &= free >> shift
+        return fits & ((1 << (self.n_slots - length + 1)) - 1)
+
+    def _place_greedy(self, sid):
+        course_idx, course, _, length, rooms = self.sessions[sid]
+        used = self.course_days.get(course_idx, {})
+        days = sorted((d for d in self.days if d not in used),
+                      key=lambda d: bin(self.teacher_bits.get((course.teacher_id, d), 0)).count('1'))
+        for day in days:
+            teacher = self.teacher_bits.get((course.teacher_id, day), 0)
+            for room_id in rooms:
+                fits = self._windows(self.room_bits.get((room_id, day), 0) | teacher, length)
+                if fits:
+                    self._assign(sid, room_id, day, (fits & -fits).bit_length() - 1)
+                    return True
+        return False
+
+    def _assign(self, sid, room_id, day, pos):
+        course_idx, course, _, length, _ = self.sessions[sid]
+        bits = ((1 << length) - 1) << pos
+        self.placed[sid] = (room_id, day, pos)
+        self.room_bits[(room_id, day)] = self.room_bits.get((room_id, day), 0) | bits
+        self.teacher_bits[(course.teacher_id, day)] = self.teacher_bits.get((course.teacher_id, day), 0) | bits
+        self.room_sessions.setdefault((room_id, day), set()).add(sid)
+        self.teacher_sessions.setdefault((course.teacher_id, day), set()).add(sid)
+        self.course_days.setdefault(course_idx, {})[day] = sid
+
+    def _unassign(self, sid):
+        course_idx, course, _, _, _ = self.sessions[sid]
+        room_id, day, _ = self.placed.pop(sid)
+        self.room_sessions[(room_id, day)].discard(sid)
+        self.teacher_sessions[(course.teacher_id, day)].discard(sid)
+        del self.course_days[course_idx][day]
+        self.room_bits[(room_id, day)] = self._rebuild(self.room_fixed.get((room_id, day), 0),
+                                                       self.room_sessions[(room_id, day)])
+        key = (course.teacher_id, day)
+        self.teacher_bits[key] = self._rebuild(self.teacher_fixed.get(key, 0), self.teacher_sessions[key])
+
+    def _rebuild(self, bits, sids):
+        for other in sids:
+            _, _, pos = self.placed[other]
+            bits |= ((1 << self.sessions[other][3]) - 1) << pos
+        return bits
+
+    def _overlapping(self, sids, pos, length):
+        found = set()
+        for other in sids:
+            other_pos = self.placed[other][2]
+            if other_pos < pos + length and pos < other_pos + self.sessions[other][3]:
+                found.add(other)
+        return found
+
+    def _repair(self, queue, deadline, max_steps=None):
+        """
+        Min-conflicts: place each pending session where it evicts the fewest others.
+
+        Sessions left in ``queue`` ran out of time or steps; the returned
+        list holds sessions with no slot free of fixed commitments at all.
+        """
+        max_steps = max_steps or 50 * (len(queue) + 1)
+        blocked = []
+        tabu = {}
+        step = 0
+        while queue and step < max_steps and time.perf_counter() < deadline:
+            step += 1
+            sid = queue.popleft()
+            course_idx, course, _, length, rooms = self.sessions[sid]
+            best, best_cost = [], None
+            for day in self.days:
+                teacher_fixed = self.teacher_fixed.get((course.teacher_id, day), 0)
+                teacher_sids = self.teacher_sessions.get((course.teacher_id, day), ())
+                sibling = self.course_days.get(course_idx, {}).get(day)
+                for room_id in rooms:
+                    fits = self._windows(self.room_fixed.get((room_id, day), 0) | teacher_fixed, length)
+                    room_sids = self.room_sessions.get((room_id, day), ())
+                    while fits:
+                        low = fits & -fits
+                        fits ^= low
+                        pos = low.bit_length() - 1
+                        evict = self._overlapping(room_sids, pos, length) | self._overlapping(teacher_sids, pos, length)
+                        if sibling is not None:
+                            evict.add(sibling)
+                        cost = len(evict) + sum(tabu.get(other, 0) > step for other in evict) * 10
+                        if best_cost is None or cost < best_cost:
+                            best, best_cost = [(room_id, day, pos, evict)], cost
+                        elif cost == best_cost:
+                            best.append((room_id, day, pos, evict))
+            if not best:
+                blocked.append(sid)
+                continue
+            room_id, day, pos, evict = self.random.choice(best)
+            for other in evict:
+                self._unassign(other)
+                queue.append(other)
+                tabu[other] = step + 10
+            self._assign(sid, room_id, day, pos)
+        return blocked
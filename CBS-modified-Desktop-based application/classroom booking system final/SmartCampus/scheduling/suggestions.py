@@ -0,0 +1,121 @@
+"""
+Suggestion Engine Module
+
+Alternatives offered when a booking request collides with something:
+the nearest free times in the same room and equivalent rooms (same type,
+at least the same capacity, same building first) free at the requested
+time. Equivalent rooms come from the availability bitmaps; free times
+over the ``SUGGESTION_DAYS_AHEAD`` look-ahead come from one
+``AvailabilityMatrix`` of the room, so the whole window is read in a
+single pass. The search stops at ``SUGGESTION_BUDGET_MS`` returning what
+it has so far.
+"""
+
+from collections import namedtuple
+import time
+
+from config import TIME_SLOTS, SUGGESTION_BUDGET_MS, SUGGESTION_DAYS_AHEAD
+from utils.time_utils import parse_time, format_minutes, date_to_ordinal, ordinal_to_date
+from scheduling.availability import availability
+from scheduling.availability_matrix import AvailabilityMatrix
+
+
+class Suggestion(namedtuple('Suggestion', 'classroom_id room_number building date start_min end_min')):
+    """A free room/time alternative to a rejected request"""
+
+    __slots__ = ()
+
+    @property
+    def start_time(self):
+        return format_minutes(self.start_min)
+
+    @property
+    def end_time(self):
+        return format_minutes(self.end_min)
+
+    def describe(self):
+        """One-line human readable description"""
+        return f"Room {self.room_number} ({self.building}) on {self.date}, {self.start_time} - {self.end_time}"
+
+
+Suggestions = namedtuple('Suggestions', 'times rooms complete')
+
+
+class SuggestionEngine:
+    """Nearest free slot and equivalent room search"""
+
+    def __init__(self, engine=None, budget_ms=SUGGESTION_BUDGET_MS,
+                 day_start=TIME_SLOTS[0], day_end=TIME_SLOTS[-1]):
+        self.engine = engine or availability
+        self.budget = budget_ms / 1000.0
+        self.day_start = parse_time(day_start)
+        self.day_end = parse_time(day_end)
+
+    def suggest(self, classroom_id, booking_date, start_time, end_time, max_times=3, max_rooms=5):
+        """
+        Alternatives for a request that could not be booked.
+
+        Returns:
+            Suggestions: ``times`` in the same room ordered by distance from
+            the requested start, ``rooms`` free at the requested time, and
+            ``complete`` False if the latency budget cut the search short
+        """
+        deadline = time.perf_counter() + self.budget
+        if not self.engine.covers(booking_date):
+            return Suggestions([], [], True)
+
+        rooms = {room.id: room for room in self.engine.rooms()}
+        room = rooms.get(classroom_id)
+        if room is None:
+            return Suggestions([], [], True)
+
+        start_min, end_min = parse_time(start_time), parse_time(end_time)
+        rooms_found = self._equivalent_rooms(room, booking_date, start_min, end_min, max_rooms)
+        complete = time.perf_counter() < deadline
+        times_found = []
+        if complete:
+            times_found, complete = self._nearest_times(room, booking_date, start_min, end_min,
+                                                        max_times, deadline)
+        return Suggestions(times_found, rooms_found, complete)
+
+    def _equivalent_rooms(self, room, booking_date, start_min, end_min, limit):
+        """Free rooms of the same type and size, same building first"""
+        date_str = ordinal_to_date(date_to_ordinal(booking_date))
+        candidates = [other for other in self.engine.free_rooms(
+                          booking_date, start_min, end_min, room.room_type, room.capacity)
+                      if other.id != room.id]
+        candidates.sort(key=lambda other: (other.building != room.building,
+                                           (other.capacity or 0) - (room.capacity or 0),
+                                           other.room_number))
+        return [Suggestion(other.id, other.room_number, other.building, date_str, start_min, end_min)
+                for other in candidates[:limit]]
+
+    def _nearest_times(self, room, booking_date, start_min, end_min, limit, deadline):
+        """Closest free starts in the same room, moving to later days if needed"""
+        duration = end_min - start_min
+        matrix = AvailabilityMatrix.build(date_to_ordinal(booking_date), days=SUGGESTION_DAYS_AHEAD + 1,
+                                          day_start=self.day_start, day_end=self.day_end,
+                                          weekdays_only=False, classroom_ids=[room.id])
+        gaps = {}
+        for gap in matrix.find_gaps(duration):
+            gaps.setdefault(gap.date, []).append(gap)
+        found = []
+        for date_str in matrix.dates():
+            if time.perf_counter() >= deadline:
+                return found, False
+            candidates = []
+            for gap in gaps.get(date_str, ()):
+                # Start as close to the requested start as the gap allows
+                best = min(max(start_min, gap.start_min), gap.end_min - duration)
+                candidates.append((abs(best - start_min), best))
+            candidates.sort()
+            found.extend(Suggestion(room.id, room.room_number, room.building, date_str, best, best + duration)
+                         for _, best in candidates[:limit - len(found)])
+            if len(found) >= limit:
+                break
+        return found, True
+
+
+def suggest_alternatives(classroom_id, booking_date, start_time, end_time):
+    """Suggestions for one request using the shared availability engine"""
+    return SuggestionEngine().suggest(classroom_id, booking_date, start_time, end_time)
@@ -0,0 +1,121 @@
+"""
+Reservation Stress Test
+
+Races many processes reserving the same room and time slot, to check
+that Booking.reserve() lets exactly one of them through. Every process
+points config.DB_PATH at a scratch database in a temporary directory
+before opening a connection, so smartcampus.db is not touched.
+
+Usage:
+    python stress_reserve.py                      # 16 processes x 64 attempts
+    python stress_reserve.py --processes 8 --attempts 200
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import config
+from database.db_setup import DatabaseManager
+from models.booking import Booking
+
+SLOT = ('09:00', '10:00')
+
+
+def setup_database(db_path):
+    """Create a scratch database with one user and one classroom"""
+    db = DatabaseManager(db_path)
+    with db.transaction() as conn:
+        user_id = conn.execute('''
+            INSERT INTO users (username, fullname, email, password, role)
+            VALUES ('stress', 'Stress Test', 'stress@example.com', '-', 2)
+        ''').lastrowid
+        classroom_id = conn.execute('''
+            INSERT INTO classrooms (room_number, room_type, building, floor, capacity)
+            VALUES ('STRESS-1', 'Theory', 'Test Block', 1, 40)
+        ''').lastrowid
+    return user_id, classroom_id
+
+
+def reserve_worker(db_path, user_id, classroom_id, booking_date, attempts, start, results):
+    """Try to reserve the slot ``attempts`` times; report (successes, errors)"""
+    # Models open DatabaseManager() on the default path
+    config.DB_PATH = db_path
+    successes = errors = 0
+    try:
+        start.wait()
+        for i in range(attempts):
+            booking = Booking(user_id, classroom_id, f"Stress {os.getpid()}-{i}", booking_date,
+                              SLOT[0], SLOT[1], "stress test", status=2)
+            success, conflicts = booking.reserve(created_by=user_id)
+            if success:
+                successes += 1
+            elif not conflicts:
+                # Refused without a clash: the transaction itself failed
+                errors += 1
+    except Exception as e:
+        print(f"Worker {os.getpid()} error: {e}")
+        errors += 1
+    finally:
+        # Always report, so the parent never waits on a dead worker
+        results.put((successes, errors))
+
+
+def run(processes, attempts):
+    """
+    Race the reservations and count the ones that went through.
+
+    Returns:
+        tuple: (successful reservations, failed transactions, bookings stored for the slot)
+    """
+    workdir = tempfile.mkdtemp(prefix='smartcampus_stress_')
+    try:
+        db_path = os.path.join(workdir, 'stress.db')
+        config.DB_PATH = db_path
+        user_id, classroom_id = setup_database(db_path)
+        booking_date = (date.today() + timedelta(days=30)).isoformat()
+
+        ctx = multiprocessing.get_context('spawn')
+        start, results = ctx.Event(), ctx.Queue()
+        workers = [ctx.Process(target=reserve_worker,
+                               args=(db_path, user_id, classroom_id, booking_date, attempts, start, results))
+                   for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        start.set()
+        counts = [results.get() for _ in workers]
+        successes = sum(s for s, _ in counts)
+        errors = sum(e for _, e in counts)
+        for worker in workers:
+            worker.join()
+
+        stored = DatabaseManager(db_path).execute_query(
+            'SELECT COUNT(*) FROM bookings WHERE classroom_id = ? AND booking_date = ? AND status IN (1, 2)',
+            (classroom_id, booking_date))[0][0]
+        return successes, errors, stored
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Race concurrent reservations of one slot")
+    parser.add_argument('--processes', type=int, default=16, help="competing processes (default 16)")
+    parser.add_argument('--attempts', type=int, default=64, help="reservations tried per process (default 64)")
+    args = parser.parse_args()
+
+    print(f"Racing {args.processes} processes x {args.attempts} reservations of one slot...")
+    successes, errors, stored = run(args.processes, args.attempts)
+    if successes == 1 and stored == 1 and not errors:
+        print(f"✓ Exactly one reservation succeeded out of {args.processes * args.attempts}")
+        return 0
+    print(f"✗ {successes} reservations succeeded, {stored} bookings stored, {errors} transactions failed; "
+          f"expected 1, 1 and 0")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
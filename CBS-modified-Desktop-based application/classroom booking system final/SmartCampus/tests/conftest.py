@@ -0,0 +1,73 @@
+"""
+Shared fixtures: every test runs against its own temporary database
+"""
+
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from database.db_setup import DatabaseManager
+from reports.cache import report_cache
+from scheduling.availability import availability
+from scheduling.interval_index import interval_index
+from utils.email_notification import EmailNotificationService
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A migrated database at a temporary DB_PATH"""
+    monkeypatch.setattr(config, 'DB_PATH', str(tmp_path / 'smartcampus.db'))
+    # Process-wide caches would otherwise carry rows over from the previous test
+    interval_index.loaded = False
+    interval_index._clear()
+    availability.rooms_changed()
+    report_cache.invalidate()
+    monkeypatch.setattr(EmailNotificationService, 'send_async', staticmethod(lambda send, *args: None))
+    return DatabaseManager()
+
+
+@pytest.fixture
+def student(db):
+    with db.transaction() as conn:
+        return conn.execute('''
+            INSERT INTO users (username, fullname, email, password, role)
+            VALUES ('student', 'Student One', 'student@example.com', '-', 3)
+        ''').lastrowid
+
+
+@pytest.fixture
+def other_student(db):
+    with db.transaction() as conn:
+        return conn.execute('''
+            INSERT INTO users (username, fullname, email, password, role)
+            VALUES ('student2', 'Student Two', 'student2@example.com', '-', 3)
+        ''').lastrowid
+
+
+@pytest.fixture
+def admin(db):
+    with db.transaction() as conn:
+        return conn.execute('''
+            INSERT INTO users (username, fullname, email, password, role)
+            VALUES ('staff', 'Staff Admin', 'staff@example.com', '-', 1)
+        ''').lastrowid
+
+
+@pytest.fixture
+def room(db):
+    with db.transaction() as conn:
+        return conn.execute('''
+            INSERT INTO classrooms (room_number, room_type, building, floor, capacity)
+            VALUES ('R101', 'Theory', 'Main', 1, 40)
+        ''').lastrowid
+
+
+@pytest.fixture
+def day():
+    """A future date, so waitlist promotion applies"""
+    return (date.today() + timedelta(days=14)).isoformat()
@@ -0,0 +1,111 @@
+from datetime import date
+
+import pytest
+
+from models.booking import Booking
+from models.schedule import Schedule
+from models.waitlist import Waitlist
+
+
+def _booking(user_id, room_id, day, start, end, course='Course'):
+    return Booking(user_id, room_id, course, day, start, end, 'test')
+
+
+def _status(db, booking_id):
+    return db.execute_query('SELECT status FROM bookings WHERE id = ?', (booking_id,))[0][0]
+
+
+# Booking.reserve
+def test_reserve_creates_pending_booking(db, student, room, day):
+    booking = _booking(student, room, day, '10:00', '11:00')
+    ok, conflicts = booking.reserve()
+    assert ok and conflicts == []
+    assert booking.id is not None
+    assert _status(db, booking.id) == 2
+
+
+def test_reserve_refuses_overlapping_booking(db, student, other_student, room, day):
+    first = _booking(student, room, day, '10:00', '11:00')
+    assert first.reserve()[0]
+
+    ok, conflicts = _booking(other_student, room, day, '10:30', '11:30').reserve()
+    assert not ok
+    assert [(c.kind, c.item_id) for c in conflicts] == [('booking', first.id)]
+    assert db.execute_query('SELECT COUNT(*) FROM bookings')[0][0] == 1
+
+
+def test_reserve_allows_adjacent_booking(db, student, other_student, room, day):
+    assert _booking(student, room, day, '10:00', '11:00').reserve()[0]
+    assert _booking(other_student, room, day, '11:00', '12:00').reserve()[0]
+
+
+def test_reserve_refuses_weekly_class(db, student, admin, room, day):
+    weekday = date.fromisoformat(day).strftime('%A')
+    schedule = Schedule(admin, room, 'Algebra', weekday, '09:00', '12:00')
+    assert schedule.create()
+
+    ok, conflicts = _booking(student, room, day, '10:00', '11:00').reserve()
+    assert not ok
+    assert [(c.kind, c.item_id) for c in conflicts] == [('schedule', schedule.id)]
+
+
+def test_reserve_ignores_cancelled_booking(db, student, other_student, admin, room, day):
+    first = _booking(student, room, day, '10:00', '11:00')
+    assert first.reserve()[0]
+    Booking.transition_many([first.id], 0, admin, 'not needed')
+
+    assert _booking(other_student, room, day, '10:00', '11:00').reserve()[0]
+
+
+# Booking.transition_many
+def test_transition_many_approves_pending(db, student, admin, room, day):
+    booking = _booking(student, room, day, '10:00', '11:00')
+    booking.reserve()
+
+    changed, skipped = Booking.transition_many([booking.id], 1, admin)
+    assert [b.id for b in changed] == [booking.id] and skipped == {}
+    assert _status(db, booking.id) == 1
+
+
+def test_transition_many_skips_disallowed_moves(db, student, admin, room, day):
+    booking = _booking(student, room, day, '10:00', '11:00')
+    booking.reserve()
+    Booking.transition_many([booking.id], 3, admin, 'no')
+
+    changed, skipped = Booking.transition_many([booking.id, 999], 1, admin)
+    assert changed == []
+    assert skipped == {booking.id: 'is rejected', 999: 'not found'}
+    assert _status(db, booking.id) == 3
+
+
+def test_transition_many_skips_approval_that_clashes(db, student, other_student, admin, room, day):
+    # Two pending requests for one slot, e.g. made before conflicts were checked
+    first = _booking(student, room, day, '10:00', '11:00')
+    second = _booking(other_student, room, day, '10:30', '11:30')
+    assert first.create() and second.create()
+
+    changed, skipped = Booking.transition_many([first.id, second.id], 1, admin)
+    assert [b.id for b in changed] == [first.id]
+    assert skipped[second.id].startswith('clashes with')
+    assert _status(db, first.id) == 1 and _status(db, second.id) == 2
+
+
+def test_transition_many_rejects_unknown_status(db):
+    with pytest.raises(ValueError):
+        Booking.transition_many([1], 5, None)
+
+
+def test_cancel_promotes_waitlist(db, student, other_student, admin, room, day):
+    booking = _booking(student, room, day, '10:00', '11:00')
+    booking.reserve()
+    entry = Waitlist(other_student, room, 'Course', day, '10:00', '11:00', 'test')
+    assert entry.join() == (True, None)
+
+    changed, skipped = Booking.transition_many([booking.id], 0, admin, 'room needed elsewhere')
+    assert [b.id for b in changed] == [booking.id] and skipped == {}
+
+    status, promoted_id = db.execute_query('SELECT status, booking_id FROM waitlist WHERE id = ?',
+                                           (entry.id,))[0]
+    assert status == 2
+    assert tuple(db.execute_query('SELECT user_id, status FROM bookings WHERE id = ?',
+                                  (promoted_id,))[0]) == (other_student, 2)
@@ -0,0 +1,85 @@
+import csv
+from datetime import date, timedelta
+
+from database.db_setup import ReadOnlyDatabase
+from models.booking import Booking
+from reports.scheduler import refresh_daily_summary, write_daily_summary_delta
+
+
+def _summary(db):
+    rows = db.execute_query('''
+        SELECT date_ord, classroom_id, status, bookings, minutes FROM daily_summary
+        ORDER BY date_ord, classroom_id, status
+    ''') or []
+    return [tuple(row) for row in rows]
+
+
+def _expected(db):
+    """daily_summary computed from scratch"""
+    rows = db.execute_query('''
+        SELECT date_ord, classroom_id, status, COUNT(*), SUM(end_min - start_min) FROM bookings
+        GROUP BY date_ord, classroom_id, status
+        ORDER BY date_ord, classroom_id, status
+    ''') or []
+    return [tuple(row) for row in rows]
+
+
+def _reserve(user_id, room_id, day, start, end):
+    booking = Booking(user_id, room_id, 'Course', day, start, end, 'test')
+    assert booking.reserve()[0]
+    return booking
+
+
+def test_first_refresh_builds_from_bookings(db, student, room, day):
+    _reserve(student, room, day, '09:00', '10:00')
+    _reserve(student, room, day, '10:00', '11:30')
+
+    refresh_daily_summary(db)
+    assert _summary(db) == _expected(db)
+    assert _summary(db) == [(date.fromisoformat(day).toordinal(), room, 2, 2, 150)]
+
+
+def test_refresh_applies_changes_since_last_run(db, student, admin, room, day):
+    other_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+    kept = _reserve(student, room, day, '09:00', '10:00')
+    moved = _reserve(student, room, day, '10:00', '11:00')
+    first_seq = refresh_daily_summary(db)
+
+    Booking.transition_many([kept.id], 1, admin)
+    with db.transaction() as conn:
+        conn.execute('UPDATE bookings SET booking_date = ?, date_ord = ? WHERE id = ?',
+                     (other_day, date.fromisoformat(other_day).toordinal(), moved.id))
+    _reserve(student, room, other_day, '13:00', '15:00')
+    seq = refresh_daily_summary(db)
+
+    assert seq > first_seq
+    assert _summary(db) == _expected(db)
+    assert refresh_daily_summary(db) == seq
+
+
+def test_refresh_drops_deleted_bookings(db, student, room, day):
+    booking = _reserve(student, room, day, '09:00', '10:00')
+    refresh_daily_summary(db)
+
+    with db.transaction() as conn:
+        conn.execute('DELETE FROM bookings WHERE id = ?', (booking.id,))
+    refresh_daily_summary(db)
+    assert _summary(db) == []
+
+
+def test_delta_lists_only_changed_days(db, student, room, day, tmp_path):
+    other_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+    _reserve(student, room, day, '09:00', '10:00')
+    first_seq = refresh_daily_summary(db)
+    _reserve(student, room, other_day, '09:00', '10:00')
+    seq = refresh_daily_summary(db)
+
+    reader = ReadOnlyDatabase()
+    try:
+        path = write_daily_summary_delta(reader, str(tmp_path / 'delta.csv'), first_seq, seq)
+    finally:
+        reader.close()
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['date', 'room', 'status', 'bookings', 'hours']
+    assert rows[1:] == [[other_day, 'R101', 'Pending', '1', '1.0']]
@@ -0,0 +1,41 @@
+import pytest
+
+from utils.time_utils import parse_time, normalize_time
+
+
+def test_parse_time_is_24_hour_by_default():
+    assert parse_time('07:00') == 7 * 60
+    assert parse_time('7:05') == 7 * 60 + 5
+    assert parse_time('13:30:00') == 13 * 60 + 30
+    assert parse_time('24:00') == 24 * 60
+
+
+def test_parse_time_legacy_reads_early_hours_as_afternoon():
+    assert parse_time('07:00', legacy=True) == 19 * 60
+    assert parse_time('01:30', legacy=True) == 13 * 60 + 30
+    # The campus day start and later are unchanged
+    assert parse_time('08:00', legacy=True) == 8 * 60
+    assert parse_time('00:00', legacy=True) == 0
+
+
+def test_parse_time_accepts_suffixes():
+    assert parse_time('1:30 PM') == 13 * 60 + 30
+    assert parse_time('12:00 am') == 0
+    assert parse_time('12:15 PM') == 12 * 60 + 15
+    # A suffix wins over the legacy guess
+    assert parse_time('7:00 AM', legacy=True) == 7 * 60
+
+
+def test_parse_time_passes_minutes_through():
+    assert parse_time(540) == 540
+
+
+@pytest.mark.parametrize('value', [None, '', 'noon', '25:00', '24:30', '10:60', '13:00 PM', -1, 24 * 60 + 1])
+def test_parse_time_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_time(value)
+
+
+def test_normalize_time_follows_parse_time():
+    assert normalize_time('7:00') == '07:00'
+    assert normalize_time('7:00', legacy=True) == '19:00'
@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+from models.booking import Booking
+from models.waitlist import Waitlist
+
+
+def _entry(user_id, room_id, day, start='10:00', end='11:00'):
+    return Waitlist(user_id, room_id, 'Course', day, start, end, 'test')
+
+
+def _occupy(user_id, room_id, day, start='10:00', end='11:00'):
+    booking = Booking(user_id, room_id, 'Course', day, start, end, 'test')
+    assert booking.reserve()[0]
+    return booking
+
+
+def _cancel(db, booking_id):
+    with db.transaction() as conn:
+        conn.execute('UPDATE bookings SET status = 0 WHERE id = ?', (booking_id,))
+
+
+def test_join_refuses_free_slot(db, student, room, day):
+    joined, reason = _entry(student, room, day).join()
+    assert not joined and 'free' in reason
+
+
+def test_join_refuses_duplicate(db, student, other_student, room, day):
+    _occupy(student, room, day)
+    assert _entry(other_student, room, day).join() == (True, None)
+
+    joined, reason = _entry(other_student, room, day).join()
+    assert not joined and 'already' in reason
+    assert db.execute_query('SELECT COUNT(*) FROM waitlist')[0][0] == 1
+
+
+def test_promote_books_first_fitting_entry(db, student, other_student, admin, room, day):
+    booking = _occupy(student, room, day)
+    first = _entry(other_student, room, day)
+    second = _entry(admin, room, day)
+    assert first.join()[0] and second.join()[0]
+    _cancel(db, booking.id)
+
+    with db.transaction() as conn:
+        promoted = Waitlist.promote(room, day, conn)
+    assert [(b.user_id, b.status) for b in promoted] == [(other_student, 2)]
+    rows = db.execute_query('SELECT id, status FROM waitlist ORDER BY id')
+    assert [tuple(row) for row in rows] == [(first.id, 2), (second.id, 1)]
+
+
+def test_promote_keeps_entries_that_still_clash(db, student, other_student, room, day):
+    _occupy(student, room, day, '10:00', '11:00')
+    freed = _occupy(student, room, day, '11:00', '12:00')
+    entry = _entry(other_student, room, day, '10:30', '11:30')
+    assert entry.join()[0]
+    _cancel(db, freed.id)
+
+    with db.transaction() as conn:
+        assert Waitlist.promote(room, day, conn) == []
+    assert db.execute_query('SELECT status FROM waitlist WHERE id = ?', (entry.id,))[0][0] == 1
+
+
+def test_promote_skips_past_dates(db, student, other_student, room):
+    day = (date.today() - timedelta(days=1)).isoformat()
+    booking = Booking(student, room, 'Course', day, '10:00', '11:00', 'test')
+    assert booking.create()
+    with db.transaction() as conn:
+        conn.execute('''
+            INSERT INTO waitlist (user_id, classroom_id, booking_date, start_time, end_time,
+                                  date_ord, start_min, end_min)
+            VALUES (?, ?, ?, '10:00', '11:00', ?, 600, 660)
+        ''', (other_student, room, day, date.fromisoformat(day).toordinal()))
+    _cancel(db, booking.id)
+
+    with db.transaction() as conn:
+        assert Waitlist.promote(room, day, conn) == []
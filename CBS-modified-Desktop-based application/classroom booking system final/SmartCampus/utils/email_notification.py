@@ -8,6 +8,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import os
+import threading
 
 
 class EmailNotificationService:
@@ -368,7 +369,215 @@ class EmailNotificationService:
             return False
     
     @staticmethod
-    def _send_email(recipient_email, subject, html_body):
+    def send_waitlist_promotion_email(booking, user):
+        """
+        Send email notification when a waitlist entry becomes a booking
+        
+        Args:
+            booking: Booking object created from the waitlist entry
+            user: User object with email address
+        """
+        try:
+            if not user.email:
+                print(f"Warning: User {user.username} has no email address")
+                return False
+            
+            subject = f"Waitlist Slot Available - {booking.course_name}"
+            
+            # Create HTML email body
+            html_body = f"""
+            <html>
+                <body style="font-family: Segoe UI, Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 8px;">
+                        <h2 style="color: #0891B2; text-align: center;">Waitlist Notification</h2>
+                        
+                        <p>Dear <strong>{user.fullname}</strong>,</p>
+                        
+                        <p>A room you were waiting for has become free and a booking request was
+                        <span style="color: #0891B2; font-weight: bold;">SUBMITTED</span> for you.</p>
+                        
+                        <div style="background-color: #ecfeff; padding: 20px; border-radius: 5px; margin: 20px 0;">
+                            <h3 style="color: #0891B2; margin-top: 0;">Booking Details:</h3>
+                            <table style="width: 100%; border-collapse: collapse;">
+                                <tr>
+                                    <td style="padding: 8px; font-weight: bold; width: 40%;">Booking ID:</td>
+                                    <td style="padding: 8px;">{booking.id}</td>
+                                </tr>
+                                <tr style="background-color: #cffafe;">
+                                    <td style="padding: 8px; font-weight: bold;">Course Name:</td>
+                                    <td style="padding: 8px;">{booking.course_name}</td>
+                                </tr>
+                                <tr>
+                                    <td style="padding: 8px; font-weight: bold;">Date:</td>
+                                    <td style="padding: 8px;">{booking.booking_date}</td>
+                                </tr>
+                                <tr style="background-color: #cffafe;">
+                                    <td style="padding: 8px; font-weight: bold;">Time Slot:</td>
+                                    <td style="padding: 8px;">{booking.start_time} - {booking.end_time}</td>
+                                </tr>
+                                <tr>
+                                    <td style="padding: 8px; font-weight: bold;">Status:</td>
+                                    <td style="padding: 8px; color: #F59E0B; font-weight: bold;">⏳ Pending Approval</td>
+                                </tr>
+                            </table>
+                        </div>
+                        
+                        <p>If you no longer need the room, please cancel the booking from My Bookings.</p>
+                        
+                        <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
+                        
+                        <p style="color: #999; font-size: 12px; text-align: center;">
+                            Fatima Jinnah Women University<br>
+                            Smart Campus Resource Management System<br>
+                            Sent on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+                        </p>
+                    </div>
+                </body>
+            </html>
+            """
+            
+            return EmailNotificationService._send_email(user.email, subject, html_body)
+        
+        except Exception as e:
+            print(f"Error sending waitlist email: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    @staticmethod
+    def send_status_updates(updates, reason=""):
+        """
+        Send booking status changes grouped by recipient
+        
+        Each user gets one email listing all of their changed bookings, and
+        all emails go out over a single SMTP connection.
+        
+        Args:
+            updates: list of (Booking, User) pairs; booking.status is the new status
+            reason: Reason shown with rejections and cancellations (optional)
+            
+        Returns:
+            int: number of emails sent
+        """
+        groups = {}
+        for booking, user in updates:
+            if not user or not user.email:
+                print(f"Warning: User {getattr(user, 'username', None)} has no email address")
+                continue
+            groups.setdefault(user.email, (user, []))[1].append(booking)
+        if not groups:
+            return 0
+        
+        sent = 0
+        try:
+            with EmailNotificationService._connect() as server:
+                for email, (user, bookings) in groups.items():
+                    subject, html_body = EmailNotificationService._status_digest(user, bookings, reason)
+                    if EmailNotificationService._send_email(email, subject, html_body, server=server):
+                        sent += 1
+        except Exception as e:
+            print(f"✗ Failed to send status updates: {e}")
+        return sent
+    
+    @staticmethod
+    def send_async(send, *args):
+        """
+        Run one of the send methods on a background thread
+        
+        Returns:
+            threading.Thread: the started thread
+        """
+        thread = threading.Thread(target=send, args=args, name="email-notification")
+        thread.start()
+        return thread
+    
+    @staticmethod
+    def _status_digest(user, bookings, reason=""):
+        """Subject and HTML body listing several booking status changes"""
+        from models.classroom import Classroom
+        rooms = {}
+        for booking in bookings:
+            if booking.classroom_id not in rooms:
+                classroom = Classroom.get_classroom_by_id(booking.classroom_id)
+                rooms[booking.classroom_id] = classroom.room_number if classroom else booking.classroom_id
+        status_colors = {0: ("Cancelled", "#7C3AED"), 1: ("Approved", "#059669"),
+                         2: ("Pending", "#F59E0B"), 3: ("Rejected", "#DC2626")}
+        if len(bookings) == 1:
+            subject = f"Booking {status_colors.get(bookings[0].status, ('Updated',))[0]} - {bookings[0].course_name}"
+        else:
+            subject = f"{len(bookings)} Booking Updates"
+        
+        rows = []
+        for booking in bookings:
+            label, color = status_colors.get(booking.status, ("Updated", "#333"))
+            rows.append(f"""
+                                <tr>
+                                    <td style="padding: 8px;">{booking.id}</td>
+                                    <td style="padding: 8px;">{booking.course_name}</td>
+                                    <td style="padding: 8px;">{rooms[booking.classroom_id]}</td>
+                                    <td style="padding: 8px;">{booking.booking_date}</td>
+                                    <td style="padding: 8px;">{booking.start_time} - {booking.end_time}</td>
+                                    <td style="padding: 8px; color: {color}; font-weight: bold;">{label}</td>
+                                </tr>""")
+        
+        html_body = f"""
+            <html>
+                <body style="font-family: Segoe UI, Arial, sans-serif; line-height: 1.6; color: #333;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 1px solid #ddd; border-radius: 8px;">
+                        <h2 style="color: #2563EB; text-align: center;">Booking Status Update</h2>
+                        
+                        <p>Dear <strong>{user.fullname}</strong>,</p>
+                        
+                        <p>The status of the following classroom bookings has changed.</p>
+                        
+                        <div style="background-color: #eff6ff; padding: 20px; border-radius: 5px; margin: 20px 0;">
+                            <table style="width: 100%; border-collapse: collapse;">
+                                <tr style="background-color: #dbeafe; font-weight: bold;">
+                                    <td style="padding: 8px;">ID</td>
+                                    <td style="padding: 8px;">Course</td>
+                                    <td style="padding: 8px;">Room</td>
+                                    <td style="padding: 8px;">Date</td>
+                                    <td style="padding: 8px;">Time</td>
+                                    <td style="padding: 8px;">Status</td>
+                                </tr>{''.join(rows)}
+                            </table>
+                        </div>
+                        
+                        {f'<div style="background-color: #fef3c7; padding: 15px; border-radius: 5px; margin: 15px 0; border-left: 4px solid #F59E0B;"><strong>Reason:</strong> {reason}</div>' if reason else ''}
+                        
+                        <p style="color: #666; font-size: 14px;">
+                            <strong>Need assistance?</strong><br>
+                            Contact us at: <strong>hajrasarwar11@gmail.com</strong><br>
+                            Phone: <strong>03273456789</strong>
+                        </p>
+                        
+                        <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
+                        
+                        <p style="color: #999; font-size: 12px; text-align: center;">
+                            Fatima Jinnah Women University<br>
+                            Smart Campus Resource Management System<br>
+                            Sent on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+                        </p>
+                    </div>
+                </body>
+            </html>
+            """
+        return subject, html_body
+    
+    @staticmethod
+    def _connect():
+        """Open and log in to the SMTP server"""
+        server = smtplib.SMTP(EmailNotificationService.SMTP_SERVER, EmailNotificationService.SMTP_PORT)
+        try:
+            server.starttls()
+            server.login(EmailNotificationService.SENDER_EMAIL, EmailNotificationService.SENDER_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    @staticmethod
+    def _send_email(recipient_email, subject, html_body, server=None):
         """
         Internal method to send email via Gmail SMTP
         
@@ -376,6 +585,7 @@ class EmailNotificationService:
             recipient_email: Recipient's email address
             subject: Email subject
             html_body: Email body in HTML format
+            server: Open SMTP connection to reuse (optional)
             
         Returns:
             bool: True if email sent successfully, False otherwise
@@ -392,10 +602,11 @@ class EmailNotificationService:
             message.attach(html_part)
             
             # Send email via Gmail SMTP
-            with smtplib.SMTP(EmailNotificationService.SMTP_SERVER, EmailNotificationService.SMTP_PORT) as server:
-                server.starttls()
-                server.login(EmailNotificationService.SENDER_EMAIL, EmailNotificationService.SENDER_PASSWORD)
+            if server is not None:
                 server.sendmail(EmailNotificationService.SENDER_EMAIL, recipient_email, message.as_string())
+            else:
+                with EmailNotificationService._connect() as server:
+                    server.sendmail(EmailNotificationService.SENDER_EMAIL, recipient_email, message.as_string())
             
             print(f"✓ Email sent successfully to {recipient_email}")
             return True
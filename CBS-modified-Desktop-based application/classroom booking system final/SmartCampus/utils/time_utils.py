@@ -0,0 +1,122 @@
+"""
+Time Utilities Module
+
+Canonical integer representation for booking and schedule times:
+times are minutes since midnight and dates are proleptic Gregorian
+ordinal days (``date.toordinal()``). Integers compare correctly, can be
+indexed, and make overlap tests plain range comparisons.
+"""
+
+from datetime import date, datetime
+import re
+
+from config import CAMPUS_DAY_START_HOUR, SLOT_MINUTES
+
+WEEK_DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+_TIME_PATTERN = re.compile(r'^\s*(\d{1,2})[:.](\d{2})(?::\d{2})?\s*([AaPp][Mm])?\s*$')
+
+
+def parse_time(value, legacy=False):
+    """
+    Parse a time into minutes since midnight.
+
+    Accepts 24-hour 'HH:MM', 'H:MM' and 'HH:MM:SS', and 12-hour forms
+    with a suffix such as '1:30 PM'. With ``legacy=True`` (old rows and
+    the imported timetable, written on a 12-hour clock without a suffix)
+    hours before the campus day start ('01:00', '02:30') are read as
+    afternoon times.
+
+    Raises:
+        ValueError: if the value is not a recognisable time
+    """
+    if isinstance(value, int):
+        if not 0 <= value <= 24 * 60:
+            raise ValueError(f"Minutes out of range: {value}")
+        return value
+    if value is None:
+        raise ValueError("Time is required")
+
+    match = _TIME_PATTERN.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid time: {value!r}")
+
+    hour, minute, suffix = int(match.group(1)), int(match.group(2)), match.group(3)
+    if minute > 59:
+        raise ValueError(f"Invalid time: {value!r}")
+
+    if suffix:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid time: {value!r}")
+        hour = hour % 12 + (12 if suffix.lower() == 'pm' else 0)
+    elif hour > 24 or (hour == 24 and minute):
+        raise ValueError(f"Invalid time: {value!r}")
+    elif legacy and 0 < hour < CAMPUS_DAY_START_HOUR:
+        hour += 12
+
+    return hour * 60 + minute
+
+
+def format_minutes(minutes):
+    """Format minutes since midnight as 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def normalize_time(value, legacy=False):
+    """Return the canonical 24-hour 'HH:MM' form of a time"""
+    return format_minutes(parse_time(value, legacy))
+
+
+def date_to_ordinal(value):
+    """Convert a 'YYYY-MM-DD' string, date or datetime to an ordinal day"""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return datetime.strptime(str(value).strip()[:10], '%Y-%m-%d').date().toordinal()
+
+
+def ordinal_to_date(ordinal):
+    """Convert an ordinal day back to a 'YYYY-MM-DD' string"""
+    return date.fromordinal(ordinal).strftime('%Y-%m-%d')
+
+
+def weekday_of_ordinal(ordinal):
+    """Weekday index (0=Monday) of an ordinal day"""
+    return (ordinal + 6) % 7
+
+
+def weekday_index(day_name):
+    """Weekday index (0=Monday) of a day name such as 'Monday'"""
+    try:
+        return WEEK_DAYS.index(str(day_name).strip().capitalize())
+    except ValueError:
+        raise ValueError(f"Invalid day of week: {day_name!r}")
+
+
+def time_range(start_time, end_time):
+    """
+    Parse a start/end pair into ``(start_min, end_min)``.
+
+    Raises:
+        ValueError: if either time is invalid or the range is empty
+    """
+    start_min, end_min = parse_time(start_time), parse_time(end_time)
+    if end_min <= start_min:
+        raise ValueError(f"End time must be after start time ({start_time} - {end_time})")
+    return start_min, end_min
+
+
+def slot_mask(start_min, end_min, slot_minutes=SLOT_MINUTES):
+    """
+    Bitmap of the slots touched by ``[start_min, end_min)``.
+
+    Bit ``i`` covers minutes ``[i * slot_minutes, (i + 1) * slot_minutes)``.
+    """
+    first = start_min // slot_minutes
+    last = -(-end_min // slot_minutes)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
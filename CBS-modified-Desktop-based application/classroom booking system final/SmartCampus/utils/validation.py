@@ -4,6 +4,7 @@ Validation Utilities
 
 import re
 from datetime import datetime
+from utils.time_utils import parse_time
 
 class Validator:
     @staticmethod
@@ -53,7 +54,7 @@ class Validator:
     def validate_time(time_str):
         """Validate time format (HH:MM)"""
         try:
-            datetime.strptime(time_str, '%H:%M')
+            parse_time(time_str)
             return True, "Valid"
         except ValueError:
             return False, "Invalid time format (use HH:MM)"
@@ -62,8 +63,8 @@ class Validator:
     def validate_time_range(start_time, end_time):
         """Validate that end_time is after start_time"""
         try:
-            start = datetime.strptime(start_time, '%H:%M')
-            end = datetime.strptime(end_time, '%H:%M')
+            start = parse_time(start_time)
+            end = parse_time(end_time)
             if end > start:
                 return True, "Valid"
             return False, "End time must be after start time"
@@ -7,6 +7,9 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import QWidget, QVBoxLayout
 from PyQt5.QtCore import Qt
 import os
+from reports.utilization import UtilizationCube, WEEKDAY_NAMES
+from reports.trends import bucket_bookings
+from utils.time_utils import WEEK_DAYS
 
 
 class MatplotlibCanvas(QWidget):
@@ -89,6 +92,25 @@ class MatplotlibCanvas(QWidget):
         except Exception as e:
             print(f"Line chart error: {e}")
     
+    def plot_utilization_heatmap(self, ratios, hours, title='Room Utilization by Hour'):
+        """Plot a weekdays x hours utilization array as a heatmap"""
+        try:
+            self.figure.clear()
+            ax = self.figure.add_subplot(111)
+            
+            image = ax.imshow(ratios * 100, aspect='auto', cmap='YlOrRd', vmin=0, vmax=100)
+            ax.set_yticks(range(len(ratios)))
+            ax.set_yticklabels(WEEKDAY_NAMES[:len(ratios)])
+            ax.set_xticks(range(len(hours)))
+            ax.set_xticklabels([f"{h:02d}:00" for h in hours], rotation=45)
+            ax.set_title(title, fontsize=14, fontweight='bold')
+            self.figure.colorbar(image, ax=ax, label='Utilization (%)')
+            
+            self.figure.tight_layout()
+            self.canvas.draw()
+        except Exception as e:
+            print(f"Heatmap error: {e}")
+    
     def plot_teacher_workload(self, teacher_data):
         """Plot teacher workload as horizontal bar chart"""
         try:
@@ -130,32 +152,29 @@ class VisualizationHelper:
         return {k: v for k, v in status_counts.items() if v > 0}
     
     @staticmethod
-    def get_room_utilization(classrooms, bookings):
-        """Calculate room utilization percentage"""
-        room_usage = {}
-        
-        for classroom in classrooms:
-            total_time_slots = 40  # Assuming 8 hours per day, 5 days = 40 slots
-            used_slots = len([b for b in bookings if b.classroom_id == classroom.id])
-            utilization = min(100, (used_slots / total_time_slots) * 100)
-            room_usage[classroom.room_number] = utilization
-        
-        return room_usage
+    def get_booking_status_counts(summary):
+        """Booking status data from a ReportGenerator summary"""
+        status_map = {0: "Cancelled", 1: "Approved", 2: "Pending", 3: "Rejected"}
+        by_status = summary['by_status']
+        return {text: by_status[status] for status, text in status_map.items() if by_status.get(status)}
     
     @staticmethod
-    def get_bookings_by_day(bookings):
-        """Group bookings by day of week"""
-        days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
-        day_counts = {day: 0 for day in days}
+    def get_room_utilization(cube=None):
+        """
+        Calculate room utilization percentage (Mon-Fri, campus hours)
         
-        # For now, distribute bookings randomly across days
-        # In production, you'd use actual booking dates
-        if bookings:
-            per_day = len(bookings) // 5
-            for i, day in enumerate(days):
-                day_counts[day] = per_day + (1 if i < len(bookings) % 5 else 0)
-        
-        return day_counts
+        Args:
+            cube: reports.utilization.UtilizationCube (default: last four weeks)
+        """
+        if cube is None:
+            cube = UtilizationCube.build()
+        return cube.room_utilization()
+    
+    @staticmethod
+    def get_bookings_by_day(start_date=None, end_date=None):
+        """Group bookings in a window (default last four weeks) by day of week, Mon-Fri"""
+        by_weekday = bucket_bookings(start_date, end_date, by='weekday').as_dict()
+        return {day: by_weekday[day] for day in WEEK_DAYS[:5]}
     
     @staticmethod
     def get_teacher_workload(teachers, schedules):